@@ -23,13 +23,58 @@ mkdir -p dist/assets/audio/bgm
 mkdir -p dist/assets/audio/sfx
 
 cp assets/models/*.glb dist/assets/models/
-# Include backup unrigged models (texture source for rigged models)
-mkdir -p dist/assets/models/_backup_unrigged
-cp assets/models/_backup_unrigged/*.glb dist/assets/models/_backup_unrigged/ 2>/dev/null || true
+# Compressed copies (tools/optimize_models.py): only the variant of the manifest's shipped codec
+if [ -f assets/models/optimized/models.json ]; then
+    MODEL_CODEC=$(sed -n 's/^ *"codec": *"\([a-z]*\)".*/\1/p' assets/models/optimized/models.json)
+    mkdir -p dist/assets/models/optimized
+    cp assets/models/optimized/models.json dist/assets/models/optimized/
+    cp -r "assets/models/optimized/$MODEL_CODEC" dist/assets/models/optimized/
+fi
 cp assets/textures/*.png dist/assets/textures/
 cp assets/textures/effects/*.png dist/assets/textures/effects/ 2>/dev/null || true
-cp assets/ui/icon_*.png dist/assets/ui/ 2>/dev/null || true
+# Premultiplied copies (tools/unmatte_effects.py) replace their black-matted grid masters
+if [ -d assets/textures/effects/premultiplied ]; then
+    cp -r assets/textures/effects/premultiplied dist/assets/textures/effects/
+    for sheet in assets/textures/effects/premultiplied/fx_*_sheet.png; do
+        rm -f "dist/assets/textures/effects/$(basename "$sheet")"
+    done
+fi
+# Trimmed/repacked effect sheets (tools/pack_effect_sheets.py)
+if [ -f assets/textures/effects/packed/sheets.json ]; then
+    cp -r assets/textures/effects/packed dist/assets/textures/effects/
+fi
+# Flipbook motion vectors (tools/flipbook_motion.py)
+if [ -f assets/textures/effects/motion/motion.json ]; then
+    cp -r assets/textures/effects/motion dist/assets/textures/effects/
+fi
+# Low/medium texture tiers (tools/texture_tiers.py); TextureTiers picks one per device
+if [ -f assets/textures/tiers/manifest.json ]; then
+    cp -r assets/textures/tiers dist/assets/textures/
+fi
+# KTX2 (tools/compile_textures.py); loaded instead of the PNGs when listed in the manifest
+if [ -f assets/textures/ktx2_manifest.json ]; then
+    cp assets/textures/ktx2_manifest.json assets/textures/*.ktx2 dist/assets/textures/ 2>/dev/null || true
+    cp assets/textures/effects/*.ktx2 dist/assets/textures/effects/ 2>/dev/null || true
+fi
+# Skill icons: display-sized variants (tools/resize_icons.py) replace the 1024px masters
+if [ -f assets/ui/icons/manifest.json ]; then
+    cp -r assets/ui/icons dist/assets/ui/
+else
+    cp assets/ui/icon_*.png dist/assets/ui/ 2>/dev/null || true
+fi
 cp assets/ui/chara_*.png dist/assets/ui/ 2>/dev/null || true
+# Nine-slice UI frames (tools/nine_slice.py)
+if [ -f assets/ui/nineslice/nineslice.json ]; then
+    cp -r assets/ui/nineslice dist/assets/ui/
+fi
+# Blurred placeholders shown while textures stream (tools/build_placeholders.py)
+cp assets/placeholders.json dist/assets/ 2>/dev/null || true
+# WebP/AVIF variants (tools/encode_images.py); the PNGs above stay as fallback
+if [ -f assets/image_variants.json ]; then
+    cp assets/image_variants.json dist/assets/
+    cp assets/textures/bg_*.webp assets/textures/bg_*.avif dist/assets/textures/ 2>/dev/null || true
+    cp assets/ui/chara_*.webp assets/ui/chara_*.avif dist/assets/ui/ 2>/dev/null || true
+fi
 cp assets/audio/bgm/*.mp3 dist/assets/audio/bgm/ 2>/dev/null || true
 cp assets/audio/sfx/*.mp3 dist/assets/audio/sfx/ 2>/dev/null || true
 
@@ -17,6 +17,10 @@ import { Fighter } from './entities/Fighter.js';
 import { Mage } from './entities/Mage.js';
 import { MathUtils } from './utils/MathUtils.js';
 import { ModelLoader } from './utils/ModelLoader.js';
+import { ImageVariants } from './utils/ImageVariants.js';
+import { KTX2Textures } from './utils/KTX2Textures.js';
+import { TextureTiers } from './utils/TextureTiers.js';
+import { Placeholders } from './utils/Placeholders.js';
 
 class Game {
     constructor() {
@@ -100,6 +104,13 @@ class Game {
 
         // Load game data
         await this._loadGameData();
+        await Promise.all([
+            SkillSystem.loadIconManifest(),
+            ImageVariants.load(),
+            KTX2Textures.init(this.renderer),
+            TextureTiers.init(this.renderer),
+            Placeholders.load(),
+        ]);
 
         // Preload 3D models (GLB)
         const loadingBar = document.getElementById('loading-bar');
@@ -110,9 +121,9 @@ class Game {
             if (loadingText) loadingText.textContent = `Loading models... ${loaded}/${total}`;
         });
 
-        // Preload effect textures (non-blocking, missing textures fallback to geometry)
-        if (loadingText) loadingText.textContent = 'Loading effects...';
-        await EffectManager.preloadTextures();
+        // Preload effect textures (non-blocking: static effects show placeholders,
+        // sheets fall back to geometry until they arrive)
+        EffectManager.preloadTextures();
 
         // Hide loading screen
         const loadingScreen = document.getElementById('loading-screen');
@@ -227,7 +238,7 @@ class Game {
             if (skillId) {
                 const skillData = this.getSkillData(skillId);
                 if (skillData) {
-                    this.ui.setSkillSlotIcon(i, skillData.name, SkillSystem.getIconPath(skillData.icon));
+                    this.ui.setSkillSlotIcon(i, skillData.name, SkillSystem.getIconBackground(skillData.icon));
                 }
             }
         }
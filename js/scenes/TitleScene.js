@@ -1,5 +1,7 @@
 // Dragon Nest Lite - Title Scene
 import * as THREE from 'three';
+import { ImageVariants } from '../utils/ImageVariants.js';
+import { Placeholders } from '../utils/Placeholders.js';
 
 export class TitleScene {
     constructor(game) {
@@ -60,6 +62,11 @@ export class TitleScene {
     }
 
     _createTitleUI() {
+        // Blurred placeholder behind each portrait until the full image draws over it
+        const lqip = (path) => {
+            const uri = Placeholders.uri(path);
+            return uri ? `background: url('${uri}') center / cover;` : '';
+        };
         this.titleUI = document.createElement('div');
         this.titleUI.id = 'title-screen';
         this.titleUI.innerHTML = `
@@ -74,12 +81,12 @@ export class TitleScene {
                     <h2>Choose Your Class</h2>
                     <div id="char-options">
                         <div class="char-option" data-class="warrior">
-                            <div class="char-icon"><img src="assets/ui/chara_mia.png" alt="Warrior" onerror="this.style.display='none'"></div>
+                            <div class="char-icon"><img src="${ImageVariants.resolve('assets/ui/chara_mia.png')}" style="${lqip('assets/ui/chara_mia.png')}" onload="this.style.background=''" alt="Warrior" onerror="this.style.display='none'"></div>
                             <h3>Warrior</h3>
                             <p>Melee fighter. Swords and brute strength.</p>
                         </div>
                         <div class="char-option" data-class="sorceress">
-                            <div class="char-icon"><img src="assets/ui/chara_haru.png" alt="Sorceress" onerror="this.style.display='none'"></div>
+                            <div class="char-icon"><img src="${ImageVariants.resolve('assets/ui/chara_haru.png')}" style="${lqip('assets/ui/chara_haru.png')}" onload="this.style.background=''" alt="Sorceress" onerror="this.style.display='none'"></div>
                             <h3>Sorceress</h3>
                             <p>Magic user. Fire, ice, and gravity.</p>
                         </div>
@@ -1,5 +1,8 @@
 // Dragon Nest Lite - Effect Manager (Particles, Skill VFX, Hit Effects)
 import * as THREE from 'three';
+import { KTX2Textures } from '../utils/KTX2Textures.js';
+import { TextureTiers } from '../utils/TextureTiers.js';
+import { Placeholders } from '../utils/Placeholders.js';
 
 // Static effect texture paths
 const FX_TEXTURES = {
@@ -19,16 +22,23 @@ const FX_TEXTURES = {
     ground_impact:  'assets/textures/effects/fx_ground_impact.png',
 };
 
-// Sprite sheet definitions (4x4 grids, 16 frames each, black background)
+// Sprite sheet definitions (4x4 grids, 16 frames each)
+// premultiplied: copy un-matted from black by tools/unmatte_effects.py (over blending);
+// otherwise the sheet is the opaque grid master on black and drawn additively
 const FX_SPRITE_SHEETS = {
-    fire_explosion_sheet:  { path: 'assets/textures/effects/fx_fire_explosion_sheet.png', cols: 4, rows: 4, frames: 16 },
-    hit_spark_sheet:       { path: 'assets/textures/effects/fx_hit_spark_sheet.png', cols: 4, rows: 4, frames: 16 },
-    ice_explosion_sheet:   { path: 'assets/textures/effects/fx_ice_explosion_sheet.png', cols: 4, rows: 4, frames: 16 },
+    fire_explosion_sheet:  { path: 'assets/textures/effects/premultiplied/fx_fire_explosion_sheet.png', cols: 4, rows: 4, frames: 16, premultiplied: true },
+    hit_spark_sheet:       { path: 'assets/textures/effects/premultiplied/fx_hit_spark_sheet.png', cols: 4, rows: 4, frames: 16, premultiplied: true },
+    ice_explosion_sheet:   { path: 'assets/textures/effects/premultiplied/fx_ice_explosion_sheet.png', cols: 4, rows: 4, frames: 16, premultiplied: true },
     dark_explosion_sheet:  { path: 'assets/textures/effects/fx_dark_explosion_sheet.png', cols: 4, rows: 4, frames: 16 },
-    slash_arc_sheet:       { path: 'assets/textures/effects/fx_slash_arc_sheet.png', cols: 4, rows: 4, frames: 16 },
-    ground_impact_sheet:   { path: 'assets/textures/effects/fx_ground_impact_sheet.png', cols: 4, rows: 4, frames: 16 },
+    slash_arc_sheet:       { path: 'assets/textures/effects/premultiplied/fx_slash_arc_sheet.png', cols: 4, rows: 4, frames: 16, premultiplied: true },
+    ground_impact_sheet:   { path: 'assets/textures/effects/premultiplied/fx_ground_impact_sheet.png', cols: 4, rows: 4, frames: 16, premultiplied: true },
 };
 
+// Trimmed/repacked sheets from tools/pack_effect_sheets.py, keyed by the path above
+const PACKED_SHEETS_PATH = 'assets/textures/effects/packed/sheets.json';
+// Flipbook motion vectors from tools/flipbook_motion.py, keyed by the path above
+const SHEET_MOTION_PATH = 'assets/textures/effects/motion/motion.json';
+
 // Map static texture keys to their sprite sheet upgrades
 const SHEET_UPGRADES = {
     fire_explosion: 'fire_explosion_sheet',
@@ -43,6 +53,11 @@ export class EffectManager {
     // Shared texture cache
     static _texCache = new Map();
     static _texLoaded = false;
+    // Sheet key -> packed layout { image, width, height, frames[] }
+    static _sheetLayouts = new Map();
+    // Sheet key -> { texture, maxDisplacement, cols, rows } for blended playback
+    static _sheetMotion = new Map();
+    static _stillFlow = null;
 
     constructor(game) {
         this.game = game;
@@ -54,38 +69,76 @@ export class EffectManager {
      * Preload all effect textures and sprite sheets. Call once at startup.
      */
     static async preloadTextures() {
-        const loader = new THREE.TextureLoader();
-
-        // Load static textures
+        // Load static textures at the device's tier (KTX2 when compiled, else PNG)
+        // Placeholders are cached first and upgraded in place, so effects spawned
+        // meanwhile show a blurred version instead of falling back to geometry.
         const staticPromises = Object.entries(FX_TEXTURES).map(([key, path]) => {
-            return new Promise(resolve => {
-                loader.load(path, tex => {
-                    tex.colorSpace = THREE.SRGBColorSpace;
-                    EffectManager._texCache.set(key, tex);
-                    resolve();
-                }, undefined, () => resolve());
-            });
+            const placeholder = Placeholders.texture(path);
+            if (placeholder) EffectManager._texCache.set(key, placeholder);
+            return KTX2Textures.load(path, TextureTiers.tierFor(path), TextureTiers.resolve(path)).then(tex => {
+                tex.colorSpace = THREE.SRGBColorSpace;
+                if (placeholder) Placeholders.upgrade(placeholder, tex);
+                else EffectManager._texCache.set(key, tex);
+            }, () => {});
         });
 
-        // Load sprite sheet textures
+        // Load sprite sheet textures (packed layout when available, else the grid sheet)
+        const loadJson = async (path) => {
+            try {
+                const res = await fetch(path);
+                return res.ok ? await res.json() : {};
+            } catch (e) {
+                return {}; // Not built yet
+            }
+        };
+        const [packed, motion] = await Promise.all([loadJson(PACKED_SHEETS_PATH), loadJson(SHEET_MOTION_PATH)]);
         const sheetPromises = Object.entries(FX_SPRITE_SHEETS).map(([key, def]) => {
-            return new Promise(resolve => {
-                loader.load(def.path, tex => {
-                    tex.colorSpace = THREE.SRGBColorSpace;
-                    tex.minFilter = THREE.LinearFilter;
-                    tex.magFilter = THREE.LinearFilter;
-                    EffectManager._texCache.set(key, tex);
-                    resolve();
-                }, undefined, () => resolve());
-            });
+            const layout = packed[def.path];
+            // Layout rects are normalized by the master size, so any tier fits
+            const image = layout ? layout.image : def.path;
+            return KTX2Textures.load(image, TextureTiers.tierFor(image), TextureTiers.resolve(image)).then(tex => {
+                tex.colorSpace = THREE.SRGBColorSpace;
+                tex.minFilter = THREE.LinearFilter;
+                tex.magFilter = THREE.LinearFilter;
+                EffectManager._texCache.set(key, tex);
+                if (layout) EffectManager._sheetLayouts.set(key, layout);
+            }, () => {});
         });
 
-        await Promise.all([...staticPromises, ...sheetPromises]);
+        // Motion vectors (linear data); sheets listed without an image are cross-faded only
+        const motionPromises = Object.entries(FX_SPRITE_SHEETS).map(async ([key, def]) => {
+            const entry = motion[def.path];
+            if (!entry) return;
+            let texture = EffectManager._stillFlowTexture();
+            let maxDisplacement = 0;
+            if (entry.image) {
+                try {
+                    texture = await new THREE.TextureLoader().loadAsync(entry.image);
+                    texture.minFilter = THREE.LinearFilter;
+                    texture.generateMipmaps = false;
+                    maxDisplacement = entry.maxDisplacement;
+                } catch (e) {
+                    console.warn(`[EffectManager] Failed to load motion vectors: ${entry.image}`);
+                }
+            }
+            EffectManager._sheetMotion.set(key, { texture, maxDisplacement, cols: entry.cols, rows: entry.rows });
+        });
+
+        await Promise.all([...staticPromises, ...sheetPromises, ...motionPromises]);
         EffectManager._texLoaded = true;
         const totalDefs = Object.keys(FX_TEXTURES).length + Object.keys(FX_SPRITE_SHEETS).length;
         console.log(`[EffectManager] Loaded ${EffectManager._texCache.size}/${totalDefs} effect textures`);
     }
 
+    /** 1x1 flow texture encoding zero motion (cross-fade without warping) */
+    static _stillFlowTexture() {
+        if (!EffectManager._stillFlow) {
+            EffectManager._stillFlow = new THREE.DataTexture(new Uint8Array([128, 128, 0, 255]), 1, 1);
+            EffectManager._stillFlow.needsUpdate = true;
+        }
+        return EffectManager._stillFlow;
+    }
+
     /** Get a cached effect texture or null */
     _getTex(key) {
         return EffectManager._texCache.get(key) || null;
@@ -143,24 +196,174 @@ export class EffectManager {
         const sprite = new THREE.Sprite(mat);
         sprite.scale.set(size, size, 1);
 
+        const motion = EffectManager._sheetMotion.get(sheetKey) || null;
         const sheetInfo = {
             texture: tex,
             cols: sheetDef.cols,
             rows: sheetDef.rows,
             frames: sheetDef.frames,
+            sprite,
+            layout: EffectManager._sheetLayouts.get(sheetKey) || null,
+            motion,
+            frameScale: null, // packed/blended frames: quad size relative to the grid cell
+            uniforms: motion ? {
+                uFlow: { value: motion.texture },
+                uFlowCell: { value: new THREE.Vector4() },
+                uMaxDisp: { value: motion.maxDisplacement },
+                uQuad: { value: new THREE.Vector4(0, 0, 1, 1) },
+                uBoxA: { value: new THREE.Vector4() },
+                uRectA: { value: new THREE.Vector4() },
+                uBoxB: { value: new THREE.Vector4() },
+                uRectB: { value: new THREE.Vector4() },
+                uBlend: { value: 0 },
+            } : null,
         };
+
+        if (sheetDef.premultiplied) {
+            // Texels already hold rgb * alpha: blend with (ONE, 1 - srcAlpha); the
+            // shader scales rgb by opacity so fades dim the emission too
+            // (three's premultipliedAlpha would multiply by the texel alpha again)
+            mat.blending = THREE.CustomBlending;
+            mat.blendSrc = THREE.OneFactor;
+            mat.blendDst = THREE.OneMinusSrcAlphaFactor;
+            mat.fog = false;
+        }
+        if (sheetDef.premultiplied || motion) {
+            mat.onBeforeCompile = (shader) => {
+                if (motion) {
+                    // Frame blending: the quad spans both frames in cell space; each
+                    // frame is warped along the flow towards the other and cross-faded
+                    Object.assign(shader.uniforms, sheetInfo.uniforms);
+                    shader.fragmentShader = shader.fragmentShader
+                        .replace('#include <common>', `#include <common>
+uniform sampler2D uFlow;
+uniform vec4 uFlowCell, uQuad, uBoxA, uRectA, uBoxB, uRectB;
+uniform float uMaxDisp, uBlend;
+vec4 flipbookSample(vec4 box, vec4 rect, vec2 c) {
+    if (box.z <= 0.0) return vec4(0.0);
+    vec2 local = (c - box.xy) / box.zw;
+    if (any(lessThan(local, vec2(0.0))) || any(greaterThan(local, vec2(1.0)))) return vec4(0.0);
+    return texture2D(map, rect.xy + local * rect.zw);
+}`)
+                        .replace('#include <map_fragment>', `
+vec2 fbCell = uQuad.xy + vMapUv * uQuad.zw;
+vec2 fbFlow = (texture2D(uFlow, uFlowCell.xy + clamp(fbCell, 0.0, 1.0) * uFlowCell.zw).rg * 2.0 - 1.0) * uMaxDisp;
+diffuseColor *= mix(flipbookSample(uBoxA, uRectA, fbCell - uBlend * fbFlow),
+                    flipbookSample(uBoxB, uRectB, fbCell + (1.0 - uBlend) * fbFlow), uBlend);`);
+                }
+                if (sheetDef.premultiplied) {
+                    shader.fragmentShader = shader.fragmentShader.replace(
+                        '#include <fog_fragment>',
+                        '#include <fog_fragment>\n\tgl_FragColor.rgb *= opacity;'
+                    );
+                }
+            };
+            mat.customProgramCacheKey = () => `fx-sheet-${!!sheetDef.premultiplied}-${!!motion}`;
+        }
+
+        if (motion) {
+            // UVs come from the uniforms; the quad's own UVs span the blended area
+            tex.repeat.set(1, 1);
+            tex.offset.set(0, 0);
+        }
+        if (sheetInfo.layout || motion) {
+            this._updateSpriteFrame(sheetInfo, 0);
+            this._scaleEffectSprite(sprite, sheetInfo, size);
+        }
         return { sprite, sheetInfo };
     }
 
+    /**
+     * Frame placement in cell space: { box, uv } as [x, y, w, h] (y up), or null if empty.
+     * box is the frame's quad within its grid cell, uv its rect in the sheet texture.
+     */
+    _frameRect(sheetInfo, frameIndex) {
+        const { cols, rows, layout } = sheetInfo;
+        if (!layout) {
+            const col = frameIndex % cols;
+            const row = Math.floor(frameIndex / cols);
+            return { box: [0, 0, 1, 1], uv: [col / cols, 1 - (row + 1) / rows, 1 / cols, 1 / rows] };
+        }
+        const frame = layout.frames[frameIndex];
+        if (!frame) return null;
+        const [w, h] = frame.scale;
+        return {
+            box: [0.5 - frame.pivot[0] * w, 0.5 - frame.pivot[1] * h, w, h],
+            uv: [frame.x / layout.width, 1 - (frame.y + frame.h) / layout.height,
+                frame.w / layout.width, frame.h / layout.height],
+        };
+    }
+
     /**
      * Update sprite sheet frame based on normalized time (0-1).
      */
     _updateSpriteFrame(sheetInfo, normalizedTime) {
-        const { texture, cols, rows, frames } = sheetInfo;
+        const { texture, frames, sprite } = sheetInfo;
+        if (sheetInfo.motion) {
+            this._updateBlendedFrame(sheetInfo, normalizedTime);
+            return;
+        }
         const frameIndex = Math.min(Math.floor(normalizedTime * frames), frames - 1);
-        const col = frameIndex % cols;
-        const row = Math.floor(frameIndex / cols);
-        texture.offset.set(col / cols, 1 - (row + 1) / rows);
+        const rect = this._frameRect(sheetInfo, frameIndex);
+        sprite.visible = !!rect;
+        if (!rect) return;
+        texture.repeat.set(rect.uv[2], rect.uv[3]);
+        texture.offset.set(rect.uv[0], rect.uv[1]);
+        if (sheetInfo.layout) {
+            // Packed frame: quad shrunk to the crop, pivot on the old cell centre
+            const [x, y, w, h] = rect.box;
+            sprite.center.set((0.5 - x) / w, (0.5 - y) / h);
+            sheetInfo.frameScale = [w, h];
+        }
+    }
+
+    /**
+     * Blend between the two frames around normalizedTime along the sheet's motion vectors.
+     */
+    _updateBlendedFrame(sheetInfo, normalizedTime) {
+        const { frames, sprite, motion, uniforms } = sheetInfo;
+        const position = Math.min(Math.max(normalizedTime, 0), 1) * (frames - 1);
+        const index = Math.min(Math.floor(position), frames - 1);
+        const next = Math.min(index + 1, frames - 1);
+        const a = this._frameRect(sheetInfo, index);
+        const b = this._frameRect(sheetInfo, next);
+        sprite.visible = !!(a || b);
+        if (!sprite.visible) return;
+
+        // Quad covers both frames plus the largest warp, clamped to the cell
+        const boxes = [a, b].filter(Boolean).map(r => r.box);
+        const pad = motion.maxDisplacement;
+        const x0 = Math.max(0, Math.min(...boxes.map(r => r[0])) - pad);
+        const y0 = Math.max(0, Math.min(...boxes.map(r => r[1])) - pad);
+        const x1 = Math.min(1, Math.max(...boxes.map(r => r[0] + r[2])) + pad);
+        const y1 = Math.min(1, Math.max(...boxes.map(r => r[1] + r[3])) + pad);
+
+        const empty = [0, 0, 0, 0];
+        uniforms.uQuad.value.set(x0, y0, x1 - x0, y1 - y0);
+        uniforms.uBoxA.value.set(...(a ? a.box : empty));
+        uniforms.uRectA.value.set(...(a ? a.uv : empty));
+        uniforms.uBoxB.value.set(...(b ? b.box : empty));
+        uniforms.uRectB.value.set(...(b ? b.uv : empty));
+        uniforms.uBlend.value = position - index;
+        const col = index % motion.cols;
+        const row = Math.floor(index / motion.cols);
+        uniforms.uFlowCell.value.set(col / motion.cols, 1 - (row + 1) / motion.rows,
+            1 / motion.cols, 1 / motion.rows);
+
+        sprite.center.set((0.5 - x0) / (x1 - x0), (0.5 - y0) / (y1 - y0));
+        sheetInfo.frameScale = [x1 - x0, y1 - y0];
+    }
+
+    /**
+     * Set an effect sprite's size; packed or blended sheet frames scale their quad to the frame.
+     */
+    _scaleEffectSprite(sprite, sheetInfo, size) {
+        const frameScale = sheetInfo?.frameScale;
+        if (frameScale) {
+            sprite.scale.set(size * frameScale[0], size * frameScale[1], 1);
+        } else {
+            sprite.scale.setScalar(size);
+        }
     }
 
     /**
@@ -256,7 +459,7 @@ export class EffectManager {
                 update: (dt, e) => {
                     const t = e.elapsed / 0.35;
                     if (sheetInfo) this._updateSpriteFrame(sheetInfo, t);
-                    sprite.scale.setScalar(2.5 * scale * (1 + t * 1.5));
+                    this._scaleEffectSprite(sprite, sheetInfo, 2.5 * scale * (1 + t * 1.5));
                     sprite.material.opacity = 0.9 * (1 - t);
                 }
             });
@@ -344,7 +547,7 @@ export class EffectManager {
                 update: (dt, e) => {
                     const t = e.elapsed / 0.5;
                     if (sheetInfo) this._updateSpriteFrame(sheetInfo, t);
-                    impactSprite.scale.setScalar(radius * 2 * (0.3 + t * 1.2));
+                    this._scaleEffectSprite(impactSprite, sheetInfo, radius * 2 * (0.3 + t * 1.2));
                     impactSprite.material.opacity = 0.7 * (1 - t);
                 }
             });
@@ -387,7 +590,7 @@ export class EffectManager {
                 update: (dt, e) => {
                     const t = e.elapsed / 0.35;
                     if (sheetInfo) this._updateSpriteFrame(sheetInfo, t);
-                    sprite.scale.setScalar(2.5 * scale * (0.3 + t * 1.5));
+                    this._scaleEffectSprite(sprite, sheetInfo, 2.5 * scale * (0.3 + t * 1.5));
                     sprite.material.opacity = 0.9 * (1 - t * t);
                 }
             });
@@ -438,7 +641,7 @@ export class EffectManager {
                 update: (dt, e) => {
                     const t = e.elapsed / 0.25;
                     if (sheetInfo) this._updateSpriteFrame(sheetInfo, t);
-                    sprite.scale.setScalar(1.5 * (0.5 + t * 1.5));
+                    this._scaleEffectSprite(sprite, sheetInfo, 1.5 * (0.5 + t * 1.5));
                     sprite.material.opacity = 0.9 * (1 - t);
                 }
             });
@@ -546,7 +749,7 @@ export class EffectManager {
                 update: (dt, e) => {
                     const t = e.elapsed / 0.5;
                     if (sheetInfo) this._updateSpriteFrame(sheetInfo, t);
-                    sprite.scale.setScalar(radius * 2.5 * (0.3 + t * 1.2));
+                    this._scaleEffectSprite(sprite, sheetInfo, radius * 2.5 * (0.3 + t * 1.2));
                     sprite.material.opacity = 0.9 * (1 - t * t);
                     if (!sheetInfo) sprite.material.rotation += dt * 2;
                     light.intensity = 5 * (1 - t);
@@ -611,7 +814,7 @@ export class EffectManager {
                 update: (dt, e) => {
                     const t = e.elapsed / 0.6;
                     if (sheetInfo) this._updateSpriteFrame(sheetInfo, t);
-                    burstSprite.scale.setScalar(radius * 3 * (0.4 + t * 0.8));
+                    this._scaleEffectSprite(burstSprite, sheetInfo, radius * 3 * (0.4 + t * 0.8));
                     burstSprite.material.opacity = 0.85 * (1 - t);
                     if (!sheetInfo) burstSprite.material.rotation += dt;
                 }
@@ -1,7 +1,18 @@
 // Dragon Nest Lite - Skill System (Skill Tree UI + Logic + Equip)
 import { CONFIG } from '../config.js';
+import { ImageVariants } from '../utils/ImageVariants.js';
+
+// Display-sized icon variants written by tools/resize_icons.py
+const ICON_MANIFEST_PATH = 'assets/ui/icons/manifest.json';
+// Skill icon sprite sheets written by tools/build_icon_atlas.py
+const ICON_ATLAS_PATH = 'assets/ui/icons/atlas/atlas.json';
 
 export class SkillSystem {
+    // { sizes: [64, 128, 256], path: '.../{size}/{name}.png', icons: Set } or null
+    static _iconManifest = null;
+    // Sprite map keyed by skills.json icon id, or null
+    static _iconAtlas = null;
+
     constructor(game) {
         this.game = game;
         this.isOpen = false;
@@ -10,13 +21,64 @@ export class SkillSystem {
         this.equipSlotIndex = -1;
     }
 
+    /**
+     * Load the icon variant manifest and sprite atlas. Call once at startup;
+     * without them icons fall back to one full-size master per skill.
+     */
+    static async loadIconManifest() {
+        const loadJson = async (path) => {
+            try {
+                const res = await fetch(path);
+                return res.ok ? await res.json() : null;
+            } catch (e) {
+                return null; // Not built yet
+            }
+        };
+        const [manifest, atlas] = await Promise.all([loadJson(ICON_MANIFEST_PATH), loadJson(ICON_ATLAS_PATH)]);
+        if (manifest) SkillSystem._iconManifest = { ...manifest, icons: new Set(manifest.icons) };
+        if (atlas) SkillSystem._iconAtlas = atlas;
+    }
+
+    /** Smallest available size covering displaySize CSS px at the current devicePixelRatio. */
+    static _pickIconSize(sizes, displaySize) {
+        const needed = displaySize * (window.devicePixelRatio || 1);
+        return sizes.find(s => s >= needed) ?? sizes[sizes.length - 1];
+    }
+
+    /**
+     * CSS background for a skill icon: { image, size, position }.
+     * Uses the shared atlas sheet (WebP/AVIF when encoded) when the icon is packed
+     * in it (one request for the whole skill tree), otherwise the single-icon
+     * image from getIconPath().
+     */
+    static getIconBackground(iconName, displaySize = 52) {
+        if (!iconName) return null;
+        const atlas = SkillSystem._iconAtlas;
+        const entry = atlas?.icons[iconName];
+        if (entry) {
+            const size = SkillSystem._pickIconSize(atlas.sizes, displaySize);
+            return {
+                image: `url('${ImageVariants.resolve(atlas.sheets[size][entry.sheet])}')`,
+                size: atlas.backgroundSize,
+                position: entry.position,
+            };
+        }
+        return { image: `url('${SkillSystem.getIconPath(iconName, displaySize)}')`, size: 'cover', position: 'center' };
+    }
+
     /**
      * Resolve skill icon name to asset path.
      * Strips class-specialization prefixes (sm_, mc_, el_, fu_) to match actual filenames.
+     * Picks the smallest variant covering displaySize CSS px at the current devicePixelRatio.
      */
-    static getIconPath(iconName) {
+    static getIconPath(iconName, displaySize = 52) {
         if (!iconName) return '';
         const stripped = iconName.replace(/^icon_(sm|mc|el|fu)_/, 'icon_');
+        const manifest = SkillSystem._iconManifest;
+        if (manifest && manifest.icons.has(stripped)) {
+            const size = SkillSystem._pickIconSize(manifest.sizes, displaySize);
+            return manifest.path.replace('{size}', size).replace('{name}', stripped);
+        }
         return `assets/ui/${stripped}.png`;
     }
 
@@ -280,10 +342,10 @@ export class SkillSystem {
             el.classList.add('equipable');
         }
 
-        const iconPath = SkillSystem.getIconPath(skill.icon);
+        const iconBg = SkillSystem.getIconBackground(skill.icon, 40);
         el.innerHTML = `
-            <div class="st-skill-icon" title="${skill.name}" style="${iconPath ? `background-image:url('${iconPath}');background-size:cover;background-position:center;` : ''}">
-                ${isUltimate && !iconPath ? '&#9733;' : ''}
+            <div class="st-skill-icon" title="${skill.name}" style="${iconBg ? `background-image:${iconBg.image};background-size:${iconBg.size};background-position:${iconBg.position};background-repeat:no-repeat;` : ''}">
+                ${isUltimate && !iconBg ? '&#9733;' : ''}
                 ${isEquipped ? '<span class="equip-badge">E</span>' : ''}
             </div>
             <div class="st-skill-info">
@@ -358,7 +420,7 @@ export class SkillSystem {
         }
 
         player.equippedSkills[slotIndex] = skill.id;
-        this.game.ui.setSkillSlotIcon(slotIndex, skill.name, SkillSystem.getIconPath(skill.icon));
+        this.game.ui.setSkillSlotIcon(slotIndex, skill.name, SkillSystem.getIconBackground(skill.icon));
         this._renderSkillTree();
     }
 
@@ -373,7 +435,7 @@ export class SkillSystem {
         }
 
         player.equippedSkills[this.equipSlotIndex] = skill.id;
-        this.game.ui.setSkillSlotIcon(this.equipSlotIndex, skill.name, SkillSystem.getIconPath(skill.icon));
+        this.game.ui.setSkillSlotIcon(this.equipSlotIndex, skill.name, SkillSystem.getIconBackground(skill.icon));
         this.game.audio.playSFX('sfx_equip');
         this.exitEquipMode();
     }
@@ -220,15 +220,17 @@ export class UIManager {
         }
     }
 
-    setSkillSlotIcon(slotIndex, skillName, iconPath = '') {
+    // iconBg: { image, size, position } from SkillSystem.getIconBackground(), or null to clear
+    setSkillSlotIcon(slotIndex, skillName, iconBg = null) {
         const slots = document.querySelectorAll('.skill-slot');
         const slot = slots[slotIndex];
         if (slot) {
             slot.setAttribute('data-skill-name', skillName || '');
-            if (iconPath) {
-                slot.style.backgroundImage = `url('${iconPath}')`;
-                slot.style.backgroundSize = 'cover';
-                slot.style.backgroundPosition = 'center';
+            if (iconBg) {
+                slot.style.backgroundImage = iconBg.image;
+                slot.style.backgroundSize = iconBg.size;
+                slot.style.backgroundPosition = iconBg.position;
+                slot.style.backgroundRepeat = 'no-repeat';
             } else {
                 slot.style.backgroundImage = '';
             }
@@ -0,0 +1,52 @@
+// Dragon Nest Lite - Image Variants (WebP/AVIF with PNG fallback)
+// Reads assets/image_variants.json written by tools/encode_images.py and
+// resolves PNG paths to the smallest encoded variant this browser can decode.
+
+const MANIFEST_PATH = 'assets/image_variants.json';
+
+// 1x1 probes; a format counts as supported once its probe decodes
+const FORMAT_PROBES = {
+    avif: 'data:image/avif;base64,AAAAIGZ0eXBhdmlmAAAAAGF2aWZtaWYxbWlhZk1BMUIAAADrbWV0YQAAAAAAAAAhaGRscgAAAAAAAAAAcGljdAAAAAAAAAAAAAAAAAAAAAAOcGl0bQAAAAAAAQAAAB5pbG9jAAAAAEQAAAEAAQAAAAEAAAETAAAAIQAAAChpaW5mAAAAAAABAAAAGmluZmUCAAAAAAEAAGF2MDFDb2xvcgAAAABqaXBycAAAAEtpcGNvAAAAFGlzcGUAAAAAAAAAAQAAAAEAAAAQcGl4aQAAAAADCAgIAAAADGF2MUOBAAwAAAAAE2NvbHJuY2x4AAEADQAGgAAAABdpcG1hAAAAAAAAAAEAAQQBAoMEAAAAKW1kYXQSAAoIGAAGiAhoNCAyExlHh4Yhh5555oAAAJBAyRxhQr4=',
+    webp: 'data:image/webp;base64,UklGRhoAAABXRUJQVlA4TA0AAAAvAAAAEAcQERGIiP4HAA==',
+};
+
+export class ImageVariants {
+    // Master PNG path -> { variants: { webp|avif: { path, bytes, ... } }, tiers: { medium|low: { variants } } }
+    static _images = null;
+    static _supported = new Set();
+
+    /**
+     * Load the variant manifest and probe format support. Call once at startup;
+     * without it resolve() returns PNG paths unchanged.
+     */
+    static async load() {
+        const probe = (format, src) => new Promise((resolve) => {
+            const img = new Image();
+            img.onload = () => resolve(img.width > 0 ? format : null);
+            img.onerror = () => resolve(null);
+            img.src = src;
+        });
+        const [manifest, ...formats] = await Promise.all([
+            fetch(MANIFEST_PATH).then(res => (res.ok ? res.json() : null)).catch(() => null),
+            ...Object.entries(FORMAT_PROBES).map(([format, src]) => probe(format, src)),
+        ]);
+        ImageVariants._supported = new Set(formats.filter(Boolean));
+        if (manifest) ImageVariants._images = manifest.images;
+    }
+
+    /**
+     * Smallest supported encoded variant of a master PNG path at a
+     * TextureTiers tier, or fallback (defaults to the PNG itself).
+     */
+    static resolve(pngPath, tier = 'high', fallback = pngPath) {
+        const entry = ImageVariants._images?.[pngPath];
+        const variants = tier === 'high' ? entry?.variants : entry?.tiers?.[tier]?.variants;
+        if (!variants) return fallback;
+        let best = null;
+        for (const [format, variant] of Object.entries(variants)) {
+            if (!ImageVariants._supported.has(format)) continue;
+            if (!best || variant.bytes < best.bytes) best = variant;
+        }
+        return best ? best.path : fallback;
+    }
+}
@@ -0,0 +1,53 @@
+// Dragon Nest Lite - KTX2 Textures (GPU-compressed with PNG fallback)
+// Reads assets/textures/ktx2_manifest.json written by tools/compile_textures.py.
+// Listed textures load as Basis Universal KTX2 and are transcoded to the GPU's
+// native block format; everything else loads as a regular image texture.
+import * as THREE from 'three';
+import { KTX2Loader } from 'three/addons/loaders/KTX2Loader.js';
+
+const MANIFEST_PATH = 'assets/textures/ktx2_manifest.json';
+const TRANSCODER_PATH = 'https://cdn.jsdelivr.net/npm/three@0.168.0/examples/jsm/libs/basis/';
+
+export class KTX2Textures {
+    // Master PNG path -> { path, encoding, mipmaps, bytes, tiers: { medium|low: { path, bytes } } }
+    static _entries = null;
+    static _ktx2Loader = null;
+    static _imageLoader = new THREE.TextureLoader();
+
+    /**
+     * Load the manifest and set up the transcoder for this renderer.
+     * Call once at startup; without it load() always uses the PNG.
+     */
+    static async init(renderer) {
+        let manifest = null;
+        try {
+            const res = await fetch(MANIFEST_PATH);
+            if (res.ok) manifest = await res.json();
+        } catch (e) {
+            // Not built yet
+        }
+        if (!manifest) return;
+        KTX2Textures._entries = manifest.textures;
+        KTX2Textures._ktx2Loader = new KTX2Loader()
+            .setTranscoderPath(TRANSCODER_PATH)
+            .detectSupport(renderer);
+    }
+
+    /**
+     * Load the texture for a master PNG path at a TextureTiers tier: the
+     * tier's KTX2 when compiled (the master's KTX2 when only that one is,
+     * so lower tiers keep GPU compression), otherwise imagePath (defaults
+     * to the master PNG).
+     */
+    static async load(masterPath, tier = 'high', imagePath = masterPath) {
+        const entry = KTX2Textures._entries?.[masterPath];
+        if (entry) {
+            try {
+                return await KTX2Textures._ktx2Loader.loadAsync(entry.tiers?.[tier]?.path ?? entry.path);
+            } catch (e) {
+                console.warn(`[KTX2Textures] Falling back to image for ${masterPath}`);
+            }
+        }
+        return KTX2Textures._imageLoader.loadAsync(imagePath);
+    }
+}
@@ -1,8 +1,14 @@
 // Dragon Nest Lite - Model Loader (GLB preloading + Placeholder fallback)
 import * as THREE from 'three';
 import { GLTFLoader } from 'three/addons/loaders/GLTFLoader.js';
+import { DRACOLoader } from 'three/addons/loaders/DRACOLoader.js';
 import * as SkeletonUtils from 'three/addons/utils/SkeletonUtils.js';
+import { MeshoptDecoder } from 'three/addons/libs/meshopt_decoder.module.js';
 import { CONFIG } from '../config.js';
+import { ImageVariants } from './ImageVariants.js';
+import { KTX2Textures } from './KTX2Textures.js';
+import { TextureTiers } from './TextureTiers.js';
+import { Placeholders } from './Placeholders.js';
 
 // Model definitions: type -> { path, targetHeight }
 const CHARACTER_MODELS = {
@@ -40,13 +46,23 @@ const TEXTURE_DEFS = {
     'bg_dungeon':    'assets/textures/bg_dungeon.png',
 };
 
+// Compressed copies (tools/optimize_models.py); the manifest's codec says which variant ships
+const OPTIMIZED_MANIFEST = 'assets/models/optimized/models.json';
+const DRACO_DECODER_PATH = 'https://cdn.jsdelivr.net/npm/three@0.168.0/examples/jsm/libs/draco/gltf/';
+
 export class ModelLoader {
     // Shared cache: key -> { scene, animations, naturalHeight }
     static _cache = new Map();
     static _textureCache = new Map();
+    // key -> clones handed out by getTexture() while the key still shows its placeholder
+    static _placeholderClones = new Map();
     static _loader = null;
-    static _textureLoader = null;
     static _preloaded = false;
+    // Source GLB path -> optimized copy path
+    static _optimized = null;
+    // Source GLB path -> { min, max } of its optimized copy, which is already
+    // centred, scaled to targetHeight and material-fixed (tools/normalize_models.py)
+    static _bounds = null;
 
     constructor() {
         this.loader = new GLTFLoader();
@@ -57,16 +73,44 @@ export class ModelLoader {
     static _getLoader() {
         if (!ModelLoader._loader) {
             ModelLoader._loader = new GLTFLoader();
+            ModelLoader._loader.setMeshoptDecoder(MeshoptDecoder);
+            // The Draco decoder is only fetched when a Draco-compressed file is parsed
+            ModelLoader._loader.setDRACOLoader(new DRACOLoader().setDecoderPath(DRACO_DECODER_PATH));
         }
         return ModelLoader._loader;
     }
 
+    /** Load the optimized-copy manifest; without it the source GLBs are loaded. */
+    static async _loadOptimizedManifest() {
+        try {
+            const res = await fetch(OPTIMIZED_MANIFEST);
+            if (!res.ok) return;
+            const manifest = await res.json();
+            ModelLoader._optimized = {};
+            ModelLoader._bounds = {};
+            for (const [src, entry] of Object.entries(manifest.models)) {
+                const variant = entry[manifest.codec];
+                if (!variant) continue;
+                ModelLoader._optimized[src] = variant.path;
+                if (entry.bounds) ModelLoader._bounds[src] = entry.bounds;
+            }
+        } catch (e) {
+            // Not built yet
+        }
+    }
+
+    /** Path to download for a source GLB: its optimized copy if one was built. */
+    static _resolvePath(path) {
+        return ModelLoader._optimized?.[path] ?? path;
+    }
+
     /**
      * Preload all GLB models. Call once at startup.
      * Returns a progress callback-style promise.
      */
     static async preloadAll(onProgress) {
         const loader = ModelLoader._getLoader();
+        await ModelLoader._loadOptimizedManifest();
         const allPaths = new Set();
 
         // Collect character model paths
@@ -90,36 +134,14 @@ export class ModelLoader {
         const loadOne = async (path) => {
             try {
                 const gltf = await new Promise((resolve, reject) => {
-                    loader.load(path, resolve, undefined, reject);
+                    loader.load(ModelLoader._resolvePath(path), resolve, undefined, reject);
                 });
 
-                // Compute bounding box for natural height
-                const box = new THREE.Box3().setFromObject(gltf.scene);
-                const size = box.getSize(new THREE.Vector3());
-                const naturalHeight = size.y;
-
-                // Center the model at bottom (y=0)
-                const center = box.getCenter(new THREE.Vector3());
-                gltf.scene.position.set(-center.x, -box.min.y, -center.z);
-
-                // Enable shadows and fix material settings for all meshes
-                gltf.scene.traverse(child => {
-                    if (child.isMesh) {
-                        child.castShadow = true;
-                        child.receiveShadow = true;
-                        // Fix PBR materials from Meshy: reduce metalness to avoid
-                        // dark/grey appearance without environment maps
-                        const mats = Array.isArray(child.material) ? child.material : [child.material];
-                        for (const mat of mats) {
-                            if (mat.isMeshStandardMaterial) {
-                                if (mat.metalness > 0.3) mat.metalness = 0.1;
-                                if (mat.roughness < 0.3) mat.roughness = 0.5;
-                                // Ensure texture colorSpace is correct
-                                if (mat.map) mat.map.colorSpace = THREE.SRGBColorSpace;
-                            }
-                        }
-                    }
-                });
+                const bounds = ModelLoader._bounds?.[path];
+                const naturalHeight = bounds
+                    ? bounds.max[1] - bounds.min[1]
+                    : ModelLoader._normalizeScene(gltf.scene);
+                await ModelLoader._buildLods(gltf, naturalHeight);
 
                 ModelLoader._cache.set(path, {
                     scene: gltf.scene,
@@ -143,71 +165,101 @@ export class ModelLoader {
             await Promise.all(batch.map(loadOne));
         }
 
-        // Preload textures
-        if (!ModelLoader._textureLoader) {
-            ModelLoader._textureLoader = new THREE.TextureLoader();
-        }
-        for (const [key, texPath] of Object.entries(TEXTURE_DEFS)) {
+        // Preload textures at the device's tier (KTX2 when compiled, else WebP/AVIF/PNG).
+        // Textures with a placeholder don't block: it is cached now and upgraded in place.
+        const loadTexture = async (key, masterPath) => {
+            // Both manifests are keyed by master path; the tier picks the entry's variant
+            const tier = TextureTiers.tierFor(masterPath);
+            const texPath = ImageVariants.resolve(masterPath, tier, TextureTiers.resolve(masterPath));
             try {
-                const tex = await new Promise((resolve, reject) => {
-                    ModelLoader._textureLoader.load(texPath, resolve, undefined, reject);
-                });
+                const tex = await KTX2Textures.load(masterPath, tier, texPath);
                 tex.wrapS = THREE.RepeatWrapping;
                 tex.wrapT = THREE.RepeatWrapping;
                 tex.colorSpace = THREE.SRGBColorSpace;
-                ModelLoader._textureCache.set(key, tex);
+                const placeholder = ModelLoader._textureCache.get(key);
+                if (!placeholder) {
+                    ModelLoader._textureCache.set(key, tex);
+                    return;
+                }
+                Placeholders.upgrade(placeholder, tex);
+                for (const clone of ModelLoader._placeholderClones.get(key) || []) {
+                    Placeholders.upgrade(clone, tex);
+                }
+                ModelLoader._placeholderClones.delete(key);
             } catch (e) {
                 console.warn(`[ModelLoader] Failed to load texture: ${texPath}`);
             }
+        };
+        for (const [key, masterPath] of Object.entries(TEXTURE_DEFS)) {
+            const placeholder = Placeholders.texture(masterPath);
+            if (placeholder) {
+                placeholder.wrapS = THREE.RepeatWrapping;
+                placeholder.wrapT = THREE.RepeatWrapping;
+                ModelLoader._textureCache.set(key, placeholder);
+                ModelLoader._placeholderClones.set(key, []);
+                loadTexture(key, masterPath);
+            } else {
+                await loadTexture(key, masterPath);
+            }
         }
 
-        // Restore textures for rigged models from unrigged backups
-        const TEXTURE_RESTORE_MAP = {
-            'assets/models/fighter.glb': 'assets/models/_backup_unrigged/fighter.glb',
-            'assets/models/mage.glb': 'assets/models/_backup_unrigged/mage.glb',
-            'assets/models/enemy_goblin.glb': 'assets/models/_backup_unrigged/enemy_goblin.glb',
-        };
+        ModelLoader._preloaded = true;
+        console.log(`[ModelLoader] Preload complete: ${ModelLoader._cache.size}/${total} models, ${ModelLoader._textureCache.size} textures loaded`);
+    }
 
-        for (const [riggedPath, unriggedPath] of Object.entries(TEXTURE_RESTORE_MAP)) {
-            const riggedEntry = ModelLoader._cache.get(riggedPath);
-            if (!riggedEntry) continue;
+    /**
+     * Centre a source GLB at the bottom (y=0) and fix its materials; returns
+     * its height. Optimized copies have this baked in.
+     */
+    static _normalizeScene(scene) {
+        // Compute bounding box for natural height
+        const box = new THREE.Box3().setFromObject(scene);
+        const size = box.getSize(new THREE.Vector3());
 
-            try {
-                const unriggedGltf = await new Promise((resolve, reject) => {
-                    loader.load(unriggedPath, resolve, undefined, reject);
-                });
+        // Center the model at bottom (y=0)
+        const center = box.getCenter(new THREE.Vector3());
+        scene.position.set(-center.x, -box.min.y, -center.z);
 
-                // Collect textured materials from the unrigged model
-                const unriggedMaterials = [];
-                unriggedGltf.scene.traverse(child => {
-                    if (child.isMesh && child.material) {
-                        const mat = child.material;
-                        if (mat.map || mat.normalMap || mat.emissiveMap || mat.roughnessMap) {
-                            unriggedMaterials.push(mat);
-                        }
+        scene.traverse(child => {
+            if (child.isMesh) {
+                // Fix PBR materials from Meshy: reduce metalness to avoid
+                // dark/grey appearance without environment maps
+                const mats = Array.isArray(child.material) ? child.material : [child.material];
+                for (const mat of mats) {
+                    if (mat.isMeshStandardMaterial) {
+                        if (mat.metalness > 0.3) mat.metalness = 0.1;
+                        if (mat.roughness < 0.3) mat.roughness = 0.5;
+                        // Ensure texture colorSpace is correct
+                        if (mat.map) mat.map.colorSpace = THREE.SRGBColorSpace;
                     }
-                });
-
-                if (unriggedMaterials.length > 0) {
-                    // Apply textured materials to rigged model meshes
-                    let matIndex = 0;
-                    riggedEntry.scene.traverse(child => {
-                        if (child.isMesh || child.isSkinnedMesh) {
-                            const sourceMat = unriggedMaterials[matIndex % unriggedMaterials.length];
-                            child.material = sourceMat.clone();
-                            child.material.skinning = true;
-                            matIndex++;
-                        }
-                    });
-                    console.log(`[ModelLoader] Restored textures for ${riggedPath} from ${unriggedMaterials.length} materials`);
                 }
-            } catch (e) {
-                console.warn(`[ModelLoader] Could not restore textures for ${riggedPath}:`, e.message || e);
             }
-        }
+        });
+        return size.y;
+    }
 
-        ModelLoader._preloaded = true;
-        console.log(`[ModelLoader] Preload complete: ${ModelLoader._cache.size}/${total} models, ${ModelLoader._textureCache.size} textures loaded`);
+    /**
+     * Replace every node carrying MSFT_lod (tools/model_lods.py) with a
+     * THREE.LOD of it and its lower levels. Each level's screen coverage
+     * becomes a camera distance for a model `height` tall at the game's FOV.
+     */
+    static async _buildLods(gltf, height) {
+        const { json } = gltf.parser;
+        const tanHalfFov = Math.tan(THREE.MathUtils.degToRad(CONFIG.CAMERA_FOV) / 2);
+        const jobs = (json.nodes || []).map(async (nodeDef, index) => {
+            const ids = nodeDef.extensions?.MSFT_lod?.ids;
+            const coverage = nodeDef.extras?.MSFT_screencoverage;
+            if (!ids || !coverage) return;
+            const [base, ...levels] = await Promise.all(
+                [index, ...ids].map(id => gltf.parser.getDependency('node', id)));
+            if (!base.parent) return;
+            const lod = new THREE.LOD();
+            base.parent.add(lod);
+            lod.addLevel(base, 0);
+            // Level i + 1 takes over where the model shrinks below coverage[i] of the screen height
+            levels.forEach((level, i) => lod.addLevel(level, height / (2 * coverage[i] * tanHalfFov)));
+        });
+        await Promise.all(jobs);
     }
 
     /**
@@ -222,6 +274,7 @@ export class ModelLoader {
         const clone = tex.clone();
         clone.needsUpdate = true;
         clone.repeat.set(repeatX, repeatY);
+        ModelLoader._placeholderClones.get(key)?.push(clone);
         return clone;
     }
 
@@ -246,8 +299,20 @@ export class ModelLoader {
             ? SkeletonUtils.clone(cached.scene)
             : cached.scene.clone();
 
-        // Deep clone materials to avoid shared state issues
+        // Scale to target height (guard against zero-height models)
+        const safeHeight = Math.max(cached.naturalHeight, 0.01);
+        const scale = (targetHeight / safeHeight) * extraScale;
+
+        // Deep clone materials to avoid shared state issues; enable shadows
         clone.traverse(child => {
+            if (child.isMesh) {
+                child.castShadow = true;
+                child.receiveShadow = true;
+            }
+            // LOD distances were set for the cached height
+            if (child.isLOD) {
+                for (const level of child.levels) level.distance *= scale;
+            }
             if (child.isMesh && child.material) {
                 if (Array.isArray(child.material)) {
                     child.material = child.material.map(m => m.clone());
@@ -257,9 +322,6 @@ export class ModelLoader {
             }
         });
 
-        // Scale to target height (guard against zero-height models)
-        const safeHeight = Math.max(cached.naturalHeight, 0.01);
-        const scale = (targetHeight / safeHeight) * extraScale;
         clone.scale.set(scale, scale, scale);
         // Also need to rescale the position offset
         clone.position.multiplyScalar(scale);
@@ -534,6 +596,10 @@ export class ModelLoader {
                 child.castShadow = true;
                 child.receiveShadow = true;
             }
+            // LOD distances were set for the cached height
+            if (child.isLOD) {
+                for (const level of child.levels) level.distance *= scale;
+            }
         });
 
         return group;
@@ -707,6 +773,10 @@ export class ModelLoader {
                 child.castShadow = true;
                 child.receiveShadow = true;
             }
+            // LOD distances were set for the cached height
+            if (child.isLOD) {
+                for (const level of child.levels) level.distance *= scale;
+            }
         });
 
         return group;
@@ -0,0 +1,65 @@
+// Dragon Nest Lite - Placeholders (tiny blurred stand-ins while images stream)
+// Reads assets/placeholders.json written by tools/build_placeholders.py.
+// Each entry is a <=16px data URI; bilinear upscaling of it is the blur.
+import * as THREE from 'three';
+
+const MANIFEST_PATH = 'assets/placeholders.json';
+
+export class Placeholders {
+    // PNG path -> { width, height, uri }
+    static _images = null;
+
+    /** Load the manifest. Call once at startup; without it nothing has a placeholder. */
+    static async load() {
+        try {
+            const res = await fetch(MANIFEST_PATH);
+            if (res.ok) Placeholders._images = (await res.json()).images;
+        } catch (e) {
+            // Not built yet
+        }
+    }
+
+    /** data: URI of the placeholder for a PNG path, or null. */
+    static uri(pngPath) {
+        return Placeholders._images?.[pngPath]?.uri ?? null;
+    }
+
+    /**
+     * Texture showing the placeholder for a PNG path, or null. The image
+     * decodes asynchronously (data URI, no network); upgrade() later turns
+     * the same object into the full texture.
+     */
+    static texture(pngPath) {
+        const uri = Placeholders.uri(pngPath);
+        if (!uri) return null;
+        const tex = new THREE.Texture();
+        tex.colorSpace = THREE.SRGBColorSpace;
+        const img = new Image();
+        img.onload = () => {
+            // Skip if the full texture already replaced it
+            if (!tex.userData.upgraded) {
+                tex.image = img;
+                tex.needsUpdate = true;
+            }
+        };
+        img.src = uri;
+        return tex;
+    }
+
+    /**
+     * Swap the full texture's data into a placeholder in place, so materials
+     * already using it pick it up. Wrapping and repeat of the target are kept.
+     */
+    static upgrade(target, full) {
+        const repeat = target.repeat.clone();
+        const { wrapS, wrapT } = target;
+        target.copy(full);
+        target.repeat.copy(repeat);
+        target.wrapS = wrapS;
+        target.wrapT = wrapT;
+        // KTX2 results are CompressedTextures; the renderer checks this flag
+        if (full.isCompressedTexture) target.isCompressedTexture = true;
+        target.userData.upgraded = true;
+        target.needsUpdate = true;
+    }
+}
@@ -0,0 +1,61 @@
+// Dragon Nest Lite - Texture Tiers (device-dependent texture resolution)
+// Reads assets/textures/tiers/manifest.json written by tools/texture_tiers.py.
+// A capability probe at startup picks one tier (high = 1024px masters,
+// medium = 1/2, low = 1/4) and resolve() maps master paths to that tier.
+
+const MANIFEST_PATH = 'assets/textures/tiers/manifest.json';
+const TIER_ORDER = ['low', 'medium', 'high'];
+
+// Software rasterizers: always low
+const SOFTWARE_RENDERERS = /swiftshader|llvmpipe|softpipe|basic render|microsoft basic/i;
+
+export class TextureTiers {
+    static tier = 'high';
+    // Master PNG path -> { high, medium, low }
+    static _textures = null;
+
+    /**
+     * Load the manifest and pick a tier for this device. Call once at startup;
+     * without it resolve() returns master paths unchanged.
+     * A ?tier=low|medium|high URL parameter overrides the probe.
+     */
+    static async init(renderer) {
+        let manifest = null;
+        try {
+            const res = await fetch(MANIFEST_PATH);
+            if (res.ok) manifest = await res.json();
+        } catch (e) {
+            // Not built yet
+        }
+        if (!manifest) return;
+        TextureTiers._textures = manifest.textures;
+
+        const override = new URLSearchParams(window.location.search).get('tier');
+        TextureTiers.tier = TIER_ORDER.includes(override) ? override : TextureTiers._probe(renderer);
+        console.log(`[TextureTiers] Using ${TextureTiers.tier} textures`);
+    }
+
+    /** Pick a tier from GPU limits, memory, cores and the renderer string. */
+    static _probe(renderer) {
+        const gl = renderer.getContext();
+        const debugInfo = gl.getExtension('WEBGL_debug_renderer_info');
+        const gpu = debugInfo ? gl.getParameter(debugInfo.UNMASKED_RENDERER_WEBGL) : '';
+        const maxSize = renderer.capabilities.maxTextureSize;
+        const memory = navigator.deviceMemory ?? 8;          // GB, Chromium only
+        const cores = navigator.hardwareConcurrency ?? 4;
+
+        if (SOFTWARE_RENDERERS.test(gpu) || maxSize < 2048 || memory <= 2 || cores <= 2) return 'low';
+        if (maxSize < 8192 || memory <= 4 || cores <= 4) return 'medium';
+        return 'high';
+    }
+
+    /** Tier resolve() serves for a master texture: the selected one, or high when it has no tiers. */
+    static tierFor(path) {
+        return TextureTiers._textures?.[path] ? TextureTiers.tier : 'high';
+    }
+
+    /** Path of a master texture at the selected tier, or the path unchanged. */
+    static resolve(path) {
+        return TextureTiers._textures?.[path]?.[TextureTiers.tier] ?? path;
+    }
+}
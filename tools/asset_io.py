@@ -0,0 +1,163 @@
+"""
+Dragon Nest Lite - Asset File I/O Helpers
+
+Every generator skips outputs that already exist, so a half-written file left
+by a crash or Ctrl+C would be trusted forever. All writes here go to a
+temporary file in the destination directory and are renamed over the final
+path with os.replace(), which is atomic on the same filesystem: the final
+path either holds the previous content or the complete new one.
+
+Response payloads are written straight from their buffer (memoryview, no
+copies); pixels are decoded only when something actually needs them.
+"""
+
+import io
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG IHDR colour types that carry an alpha channel (grey+alpha, RGBA)
+PNG_ALPHA_COLOR_TYPES = (4, 6)
+
+# Output suffix -> MIME type that can be written to it without re-encoding
+SUFFIX_MIME_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".mp3": "audio/mpeg",
+}
+
+
+# ---------------------------------------------------------------------------
+# Atomic writes
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def open_atomic(path: Path):
+    """
+    Open a temporary binary file that replaces ``path`` on a clean exit.
+
+    On any exception the temporary file is removed and ``path`` is untouched.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_bytes_atomic(path: Path, data) -> int:
+    """Write a bytes-like object to ``path`` atomically without copying it.
+
+    Returns:
+        Number of bytes written.
+    """
+    view = memoryview(data)
+    with open_atomic(path) as f:
+        f.write(view)
+    return view.nbytes
+
+
+def save_image_atomic(img, path: Path, fmt: str = "PNG", **params) -> None:
+    """Encode a PIL image and write it to ``path`` atomically."""
+    with open_atomic(path) as f:
+        img.save(f, fmt, **params)
+
+
+def write_stream_atomic(path: Path, chunks) -> int:
+    """Write an iterable of byte chunks (e.g. ``response.iter_content()``) atomically.
+
+    Returns:
+        Number of bytes written.
+    """
+    total = 0
+    with open_atomic(path) as f:
+        for chunk in chunks:
+            if chunk:
+                f.write(chunk)
+                total += len(chunk)
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Payload sniffing and lazy decoding
+# ---------------------------------------------------------------------------
+
+def mime_matches_path(mime_type: Optional[str], path: Path) -> bool:
+    """True if a payload of ``mime_type`` can be written to ``path`` as-is."""
+    return bool(mime_type) and SUFFIX_MIME_TYPES.get(Path(path).suffix.lower()) == mime_type
+
+
+def png_has_alpha(data) -> Optional[bool]:
+    """
+    Read the colour type from a PNG header without decoding any pixels.
+
+    Returns:
+        True/False for a PNG, or None if ``data`` is not a PNG. A tRNS chunk
+        (palette/colour-key transparency) is not detected.
+    """
+    view = memoryview(data)
+    if view.nbytes < 33 or bytes(view[:8]) != PNG_SIGNATURE or bytes(view[12:16]) != b"IHDR":
+        return None
+    color_type = view[25]
+    return color_type in PNG_ALPHA_COLOR_TYPES
+
+
+class LazyImage:
+    """Raw image bytes plus their MIME type; pixels are decoded on first access."""
+
+    def __init__(self, data, mime_type: Optional[str] = None):
+        self.data = data
+        self.mime_type = mime_type
+        self._image = None
+
+    @classmethod
+    def from_blob(cls, blob) -> "LazyImage":
+        """Wrap a Gemini ``inline_data`` blob (``.data`` / ``.mime_type``)."""
+        return cls(blob.data, blob.mime_type)
+
+    @property
+    def decoded(self) -> bool:
+        return self._image is not None
+
+    @property
+    def image(self):
+        """The decoded PIL image (decoded once, then cached)."""
+        if self._image is None:
+            from PIL import Image
+            self._image = Image.open(io.BytesIO(self.data))
+            self._image.load()
+        return self._image
+
+    def save(self, path: Path, fmt: str = "PNG", mode: Optional[str] = None) -> bool:
+        """
+        Write the image to ``path`` atomically.
+
+        The original bytes are written unchanged when their MIME type already
+        matches the target suffix and no mode conversion is requested;
+        otherwise the image is decoded and re-encoded.
+
+        Returns:
+            True if the payload was written without re-encoding.
+        """
+        if mode is None and mime_matches_path(self.mime_type, path):
+            write_bytes_atomic(path, self.data)
+            return True
+        img = self.image if mode is None else self.image.convert(mode)
+        save_image_atomic(img, path, fmt)
+        return False
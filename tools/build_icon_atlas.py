@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Dragon Nest Lite - Skill Icon Atlas Builder
+===========================================
+
+Packs every icon referenced by js/data/skills.json into one sprite sheet per
+display size, so opening the skill tree costs one request and one decode
+instead of 56. Icons are laid out on the same grid at every size (padding
+scales with the cell), so one set of percentage background positions works
+for all sheets:
+
+  assets/ui/icons/atlas/skills_64_0.png     (and _128_, _256_)
+  assets/ui/icons/atlas/atlas.json          sprite map keyed by skills.json icon id
+
+SkillSystem.getIconBackground() reads atlas.json. The sheets are too
+detailed to palettize (PSNR stays below quantize_ui.py's 40 dB), so
+encode_images.py gives them WebP/AVIF variants, which the game picks
+through ImageVariants.
+
+Each cell is padded with copies of the icon's edge pixels so bilinear
+sampling at fractional scales never picks up a neighbour. Sources are the
+resize_icons.py variants (built on the fly when missing).
+
+Usage:
+  python build_icon_atlas.py
+  python build_icon_atlas.py --sizes 64 128
+
+Requires:
+  pip install Pillow numpy
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:
+    print("ERROR: Required packages not installed.")
+    print("Run: pip install Pillow numpy")
+    sys.exit(1)
+
+from asset_io import save_image_atomic, write_bytes_atomic
+from resize_icons import ICON_SIZES, UI_DIR, ICON_VARIANTS_DIR, downscale, variant_path
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SKILLS_JSON = PROJECT_ROOT / "js" / "data" / "skills.json"
+ATLAS_DIR = ICON_VARIANTS_DIR / "atlas"
+ATLAS_JSON = ATLAS_DIR / "atlas.json"
+
+PADDING_RATIO = 1 / 32     # edge padding per side, as a fraction of the cell (2/4/8 px)
+MAX_SHEET_SIZE = 4096      # split into several sheets beyond this (at the largest size)
+
+# Same rule as SkillSystem.getIconPath(): specialization prefixes are not in filenames
+SPEC_PREFIX = re.compile(r"^icon_(sm|mc|el|fu)_")
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def skill_icon_ids() -> list[str]:
+    """Icon ids referenced by skills.json, in file order, without duplicates."""
+    text = SKILLS_JSON.read_text(encoding="utf-8")
+    return list(dict.fromkeys(re.findall(r'"icon"\s*:\s*"([^"]+)"', text)))
+
+
+def icon_file_stem(icon_id: str) -> str:
+    return SPEC_PREFIX.sub("icon_", icon_id)
+
+
+def load_cell(stem: str, size: int) -> Image.Image:
+    """The ``size`` px variant of an icon, resized from the master if not built yet."""
+    path = variant_path(stem, size)
+    if path.exists():
+        with Image.open(path) as img:
+            return img.convert("RGBA")
+    with Image.open(UI_DIR / f"{stem}.png") as img:
+        return downscale(img, size).convert("RGBA")
+
+
+def pad_edges(cell: Image.Image, pad: int) -> np.ndarray:
+    """Extrude the outermost pixels of a cell into its padding."""
+    return np.pad(np.asarray(cell), ((pad, pad), (pad, pad), (0, 0)), mode="edge")
+
+
+def percent(value: float) -> str:
+    return f"{value:.4f}".rstrip("0").rstrip(".") + "%"
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def plan_layout(count: int, largest: int):
+    """
+    Grid shared by every size: (cols, rows, icons_per_sheet).
+
+    The sheet limit is checked at the largest size; smaller sizes reuse the
+    same grid so percentage positions stay identical.
+    """
+    pitch = largest + 2 * round(largest * PADDING_RATIO)
+    per_side = max(1, MAX_SHEET_SIZE // pitch)
+    per_sheet = min(count, per_side * per_side)
+    cols = math.ceil(math.sqrt(per_sheet))
+    rows = math.ceil(per_sheet / cols)
+    return cols, rows, cols * rows
+
+
+def build_icon_atlas(sizes=ICON_SIZES) -> dict:
+    """Write atlas sheets for every size plus atlas.json.
+
+    Returns:
+        The sprite map written to atlas.json.
+    """
+    sizes = sorted(sizes)
+    icon_ids = skill_icon_ids()
+    present = []
+    for icon_id in icon_ids:
+        if (UI_DIR / f"{icon_file_stem(icon_id)}.png").exists():
+            present.append(icon_id)
+        else:
+            print(f"  [MISSING] {icon_id} -> assets/ui/{icon_file_stem(icon_id)}.png not found")
+
+    cols, rows, per_sheet = plan_layout(len(present), sizes[-1])
+    sheet_count = math.ceil(len(present) / per_sheet) if present else 0
+    pad_cells = 1 + 2 * PADDING_RATIO  # pitch in units of the icon size
+
+    sprite_map = {
+        "sizes": sizes,
+        "grid": {"cols": cols, "rows": rows},
+        "padding": {str(size): round(size * PADDING_RATIO) for size in sizes},
+        # Element-relative CSS values, identical for every size
+        "backgroundSize": f"{percent(cols * pad_cells * 100)} {percent(rows * pad_cells * 100)}",
+        "sheets": {},
+        "icons": {},
+    }
+
+    for index, icon_id in enumerate(present):
+        sheet, slot = divmod(index, per_sheet)
+        row, col = divmod(slot, cols)
+        # background-position p% aligns the element's p% point with the sheet's
+        x = (col * pad_cells + PADDING_RATIO) / (cols * pad_cells - 1)
+        y = (row * pad_cells + PADDING_RATIO) / (rows * pad_cells - 1)
+        sprite_map["icons"][icon_id] = {
+            "file": icon_file_stem(icon_id),
+            "sheet": sheet,
+            "col": col,
+            "row": row,
+            "position": f"{percent(x * 100)} {percent(y * 100)}",
+        }
+
+    for size in sizes:
+        pad = round(size * PADDING_RATIO)
+        pitch = size + 2 * pad
+        paths = []
+        for sheet in range(sheet_count):
+            canvas = np.zeros((rows * pitch, cols * pitch, 4), dtype=np.uint8)
+            for icon_id, entry in sprite_map["icons"].items():
+                if entry["sheet"] != sheet:
+                    continue
+                y0, x0 = entry["row"] * pitch, entry["col"] * pitch
+                canvas[y0:y0 + pitch, x0:x0 + pitch] = pad_edges(load_cell(entry["file"], size), pad)
+            path = ATLAS_DIR / f"skills_{size}_{sheet}.png"
+            save_image_atomic(Image.fromarray(canvas, "RGBA"), path, optimize=True)
+            paths.append(path.relative_to(PROJECT_ROOT).as_posix())
+            print(f"  [ATLAS] {path.name} ({cols * pitch}x{rows * pitch}, "
+                  f"{path.stat().st_size / 1024:.0f} KB)")
+        sprite_map["sheets"][str(size)] = paths
+
+    write_bytes_atomic(ATLAS_JSON, (json.dumps(sprite_map, indent=2) + "\n").encode("utf-8"))
+    return sprite_map
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack skill icons into sprite sheets")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(ICON_SIZES),
+                        help=f"Atlas cell sizes in px (default: {' '.join(map(str, ICON_SIZES))})")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  Skill Icon Atlas")
+    print("=" * 60)
+    sprite_map = build_icon_atlas(args.sizes)
+    sheets = len(sprite_map["sheets"].get(str(sprite_map["sizes"][0]), []))
+    print(f"\n  Icons packed: {len(sprite_map['icons'])}/{len(skill_icon_ids())}"
+          f"  ({sheets} sheet(s) per size)")
+    print(f"  Sprite map: {ATLAS_JSON.relative_to(PROJECT_ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
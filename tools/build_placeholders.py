@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Dragon Nest Lite - Low-Quality Image Placeholders
+=================================================
+
+The loading screen waits for every ground texture and backdrop to download
+and decode before anything is drawn. This stage writes a tiny blurred
+stand-in for each texture, UI image and character portrait into one JSON
+manifest, so the game can draw the placeholder at once and swap the full
+image in when it has streamed:
+
+  assets/placeholders.json
+    { maxSize, images: { png_path: { width, height, uri } } }
+
+``uri`` is a data: URI of a PNG at most MAX_SIZE px on its long side,
+downsampled in linear light (texture_tiers.downsample); bilinear upscaling
+of that thumbnail is the blur. width/height are the source size.
+Effect sprite sheets are not included: a thumbnail of a flipbook is not a
+usable frame, and EffectManager already falls back to geometry until they
+arrive.
+
+Usage:
+  python build_placeholders.py
+  python build_placeholders.py --max-size 24
+
+Requires:
+  pip install Pillow numpy
+"""
+
+import argparse
+import base64
+import fnmatch
+import io
+import json
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:
+    print("ERROR: Required packages not installed.")
+    print("Run: pip install Pillow numpy")
+    sys.exit(1)
+
+from asset_io import write_bytes_atomic
+from texture_tiers import TILING_GLOBS, downsample
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ASSETS_DIR = PROJECT_ROOT / "assets"
+MANIFEST_PATH = ASSETS_DIR / "placeholders.json"
+
+# (subdir under assets, glob)
+SOURCE_GLOBS = [
+    ("textures", "tex_*.png"),
+    ("textures", "bg_*.png"),
+    ("textures/effects", "fx_*.png"),
+    ("ui", "ui_*.png"),
+    ("ui", "bg_*.png"),
+    ("ui", "chara_*.png"),
+]
+EXCLUDE_GLOBS = ["fx_*_sheet.png"]
+
+MAX_SIZE = 16
+
+
+# ---------------------------------------------------------------------------
+# Placeholders
+# ---------------------------------------------------------------------------
+
+def source_images() -> list[Path]:
+    paths = []
+    for subdir, pattern in SOURCE_GLOBS:
+        paths += [p for p in sorted((ASSETS_DIR / subdir).glob(pattern))
+                  if not any(fnmatch.fnmatch(p.name, g) for g in EXCLUDE_GLOBS)]
+    return paths
+
+
+def placeholder(path: Path, max_size: int = MAX_SIZE) -> dict:
+    """Manifest entry with a data URI thumbnail of ``path``."""
+    with Image.open(path) as img:
+        mode = "RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB"
+        pixels = np.asarray(img.convert(mode))
+    h, w = pixels.shape[:2]
+    scale = max_size / max(w, h)
+    tiling = any(fnmatch.fnmatch(path.name, g) for g in TILING_GLOBS)
+    small = downsample(pixels, scale, tiling=tiling, premultiplied=False)
+
+    buf = io.BytesIO()
+    Image.fromarray(small, mode).save(buf, format="PNG", optimize=True)
+    return {
+        "width": w,
+        "height": h,
+        "uri": "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode("ascii"),
+    }
+
+
+def build_placeholders(max_size: int = MAX_SIZE) -> dict:
+    """Write assets/placeholders.json for every source image; returns the manifest."""
+    images = {}
+    for path in source_images():
+        entry = placeholder(path, max_size)
+        images[path.relative_to(PROJECT_ROOT).as_posix()] = entry
+        print(f"  [LQIP] {path.relative_to(ASSETS_DIR).as_posix()}: {len(entry['uri'])} chars")
+    manifest = {"maxSize": max_size, "images": images}
+    write_bytes_atomic(MANIFEST_PATH, (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Build tiny blurred placeholders for textures and UI art")
+    parser.add_argument("--max-size", type=int, default=MAX_SIZE,
+                        help=f"Long side of each placeholder in px (default {MAX_SIZE})")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  Image Placeholders")
+    print("=" * 60)
+    manifest = build_placeholders(args.max_size)
+    total = MANIFEST_PATH.stat().st_size
+    print(f"\n  Images: {len(manifest['images'])}  Manifest: {MANIFEST_PATH.relative_to(PROJECT_ROOT)} "
+          f"({total / 1024:.1f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
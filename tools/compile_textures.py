@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Dragon Nest Lite - KTX2 Texture Compiler
+========================================
+
+The ground textures (tex_*.png) and effect textures (effects/fx_*.png) are
+1024px PNGs that the browser decodes to RGBA8 and uploads uncompressed:
+4 MB each, 5.3 MB with mipmaps. This stage compiles them to KTX2 with Basis
+Universal supercompression, which three.js' KTX2Loader transcodes straight
+to the GPU's native block format (BC7/ASTC/ETC2, 0.5-1 byte per pixel):
+
+  tex_*   -> UASTC + Zstandard, mipmapped   (tiling detail stays sharp)
+  fx_*    -> ETC1S, mipmapped               (soft gradients, smallest files)
+  *_sheet -> ETC1S, no mipmaps              (mips bleed across frame cells;
+             premultiplied/ and packed/ sheets included)
+
+Outputs sit next to each PNG (tex_grass.ktx2) and are listed in
+assets/textures/ktx2_manifest.json, keyed by the PNG path the game already
+uses. The medium/low reductions from texture_tiers.py are compiled the same
+way (tiers/<tier>/tex_grass.ktx2) and listed under their master's entry as
+``tiers``, so every tier keeps GPU compression. js/utils/KTX2Textures.js
+loads the KTX2 for the device's tier when the manifest lists it and falls
+back to the PNG otherwise. Images are Y-flipped at encode time so
+UVs and sprite-sheet offsets match the PNG path (compressed textures cannot
+be flipped on upload).
+
+Usage:
+  python compile_textures.py              # Compile missing / outdated textures
+  python compile_textures.py --force      # Recompile everything
+  python compile_textures.py --dry-run    # Show the encoder commands only
+
+Requires:
+  KTX-Software 4.x (toktx) or basisu on PATH
+    https://github.com/KhronosGroup/KTX-Software/releases
+    https://github.com/BinomialLLC/basis_universal/releases
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from asset_io import write_bytes_atomic
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TEXTURES_DIR = PROJECT_ROOT / "assets" / "textures"
+MANIFEST_PATH = TEXTURES_DIR / "ktx2_manifest.json"
+TIERS_MANIFEST_PATH = TEXTURES_DIR / "tiers" / "manifest.json"   # tools/texture_tiers.py
+
+# (glob under assets/textures, encoding, mipmaps); first match wins
+TEXTURE_RULES = [
+    ("effects/packed/fx_*_sheet.png", "etc1s", False),
+    ("effects/premultiplied/fx_*_sheet.png", "etc1s", False),
+    ("effects/fx_*_sheet.png", "etc1s", False),
+    ("effects/fx_*.png", "etc1s", True),
+    ("tex_*.png", "uastc", True),
+]
+
+UASTC_LEVEL = 2          # 0 fastest .. 4 slowest/best
+UASTC_ZSTD_LEVEL = 18    # Zstandard supercompression on top of UASTC
+ETC1S_QUALITY = 192      # 1..255
+ETC1S_EFFORT = 2         # basisu -comp_level / toktx --clevel (0..5)
+
+# Approximate GPU bytes per pixel after transcoding (mip chain adds 1/3)
+VRAM_BYTES_PER_PIXEL = {"uastc": 1.0, "etc1s": 1.0, "rgba8": 4.0}
+
+
+# ---------------------------------------------------------------------------
+# Encoders
+# ---------------------------------------------------------------------------
+
+def find_encoder():
+    """('toktx' | 'basisu', path) for the first encoder on PATH, or None."""
+    for name in ("toktx", "basisu"):
+        path = shutil.which(name)
+        if path:
+            return name, path
+    return None
+
+
+def toktx_command(exe, src: Path, dst: Path, encoding: str, mipmaps: bool) -> list[str]:
+    cmd = [exe, "--t2", "--assign_oetf", "srgb", "--lower_left_maps_to_s0t0"]
+    if encoding == "uastc":
+        cmd += ["--encode", "uastc", "--uastc_quality", str(UASTC_LEVEL), "--zcmp", str(UASTC_ZSTD_LEVEL)]
+    else:
+        cmd += ["--encode", "etc1s", "--qlevel", str(ETC1S_QUALITY), "--clevel", str(ETC1S_EFFORT)]
+    if mipmaps:
+        cmd.append("--genmipmap")
+    return cmd + [str(dst), str(src)]
+
+
+def basisu_command(exe, src: Path, dst: Path, encoding: str, mipmaps: bool) -> list[str]:
+    # basisu writes sRGB by default and Zstandard-compresses UASTC KTX2 output
+    cmd = [exe, "-ktx2", "-y_flip"]
+    if encoding == "uastc":
+        cmd += ["-uastc", "-uastc_level", str(UASTC_LEVEL)]
+    else:
+        cmd += ["-q", str(ETC1S_QUALITY), "-comp_level", str(ETC1S_EFFORT)]
+    if mipmaps:
+        cmd.append("-mipmap")
+    return cmd + ["-output_file", str(dst), str(src)]
+
+
+ENCODER_COMMANDS = {"toktx": toktx_command, "basisu": basisu_command}
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def collect_textures() -> list[tuple[Path, str, bool]]:
+    """(png, encoding, mipmaps) for every texture covered by TEXTURE_RULES."""
+    seen = {}
+    for pattern, encoding, mipmaps in TEXTURE_RULES:
+        for path in sorted(TEXTURES_DIR.glob(pattern)):
+            seen.setdefault(path, (encoding, mipmaps))
+    return [(path, *rule) for path, rule in seen.items()]
+
+
+def png_dimensions(path: Path) -> tuple[int, int]:
+    with open(path, "rb") as f:
+        header = f.read(24)
+    return int.from_bytes(header[16:20], "big"), int.from_bytes(header[20:24], "big")
+
+
+def vram_bytes(width: int, height: int, kind: str, mipmaps: bool) -> float:
+    return width * height * VRAM_BYTES_PER_PIXEL[kind] * (4 / 3 if mipmaps else 1)
+
+
+def load_tier_paths() -> dict:
+    """Master PNG path -> {tier: PNG path} from texture_tiers.py's manifest ({} when not built)."""
+    if TIERS_MANIFEST_PATH.exists():
+        return json.loads(TIERS_MANIFEST_PATH.read_text(encoding="utf-8"))["textures"]
+    return {}
+
+
+def load_manifest() -> dict:
+    if MANIFEST_PATH.exists():
+        return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    return {"textures": {}}
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile textures to KTX2 (Basis Universal)")
+    parser.add_argument("--force", action="store_true", help="Recompile textures that are up to date")
+    parser.add_argument("--dry-run", action="store_true", help="Print encoder commands without running them")
+    args = parser.parse_args()
+
+    encoder = find_encoder()
+    if not encoder:
+        print("ERROR: no KTX2 encoder found. Install KTX-Software (toktx) or basisu and put it on PATH.")
+        return 1
+    name, exe = encoder
+    build_command = ENCODER_COMMANDS[name]
+
+    textures = collect_textures()
+    manifest = load_manifest()
+    manifest["encoder"] = name
+    print("=" * 60)
+    print(f"  KTX2 Textures ({name}, {len(textures)} inputs)")
+    print("=" * 60)
+
+    tier_paths = load_tier_paths()
+    failed = 0
+    png_total = ktx_total = vram_before = vram_after = 0
+    for src, encoding, mipmaps in textures:
+        key = src.relative_to(PROJECT_ROOT).as_posix()
+        # The master, then its texture_tiers.py reductions (compiled the same way)
+        inputs = [("high", src)] + [(tier, PROJECT_ROOT / path) for tier, path in tier_paths.get(key, {}).items()
+                                    if tier != "high" and (PROJECT_ROOT / path).exists()]
+        compiled = {}
+        for tier, png in inputs:
+            dst = png.with_suffix(".ktx2")
+            if args.dry_run:
+                print("  " + " ".join(build_command(exe, png, dst, encoding, mipmaps)))
+                continue
+
+            listed = key in manifest["textures"] and (
+                tier == "high" or tier in manifest["textures"][key].get("tiers", {}))
+            if not args.force and dst.exists() and dst.stat().st_mtime >= png.stat().st_mtime and listed:
+                print(f"  [SKIP] {dst.relative_to(TEXTURES_DIR).as_posix()}")
+            else:
+                # Encoders write in place; build a temp file and swap it in so an
+                # interrupted run never leaves a truncated .ktx2 behind
+                tmp = dst.with_name(dst.stem + ".tmp.ktx2")
+                result = subprocess.run(build_command(exe, png, tmp, encoding, mipmaps),
+                                        capture_output=True, text=True)
+                if result.returncode != 0 or not tmp.exists():
+                    tmp.unlink(missing_ok=True)
+                    print(f"  [FAILED] {png.name}: {(result.stderr or result.stdout).strip()[-300:]}")
+                    failed += 1
+                    continue
+                tmp.replace(dst)
+                print(f"  [OK] {dst.relative_to(TEXTURES_DIR).as_posix()} ({encoding}"
+                      f"{', mips' if mipmaps else ''}, {dst.stat().st_size / 1024:.0f} KB)")
+            compiled[tier] = dst
+
+        if "high" not in compiled:
+            continue
+        dst = compiled.pop("high")
+        width, height = png_dimensions(src)
+        manifest["textures"][key] = {
+            "path": dst.relative_to(PROJECT_ROOT).as_posix(),
+            "encoding": encoding,
+            "mipmaps": mipmaps,
+            "bytes": dst.stat().st_size,
+            "tiers": {tier: {"path": path.relative_to(PROJECT_ROOT).as_posix(), "bytes": path.stat().st_size}
+                      for tier, path in compiled.items()},
+        }
+        png_total += src.stat().st_size
+        ktx_total += dst.stat().st_size
+        vram_before += vram_bytes(width, height, "rgba8", mipmaps)
+        vram_after += vram_bytes(width, height, encoding, mipmaps)
+
+    if args.dry_run:
+        return 0
+    write_bytes_atomic(MANIFEST_PATH, (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+
+    print("\n" + "=" * 60)
+    print("  KTX2 SUMMARY")
+    print("=" * 60)
+    print(f"  Download: {png_total / 1_000_000:.1f} MB PNG -> {ktx_total / 1_000_000:.1f} MB KTX2")
+    print(f"  VRAM (approx.): {vram_before / 1_000_000:.0f} MB RGBA8 -> {vram_after / 1_000_000:.0f} MB compressed")
+    print(f"  Manifest: {MANIFEST_PATH.relative_to(PROJECT_ROOT)}")
+    if failed:
+        print(f"  Failed: {failed}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Dragon Nest Lite - Quality-Targeted WebP/AVIF Encoder
+=====================================================
+
+UI art and backgrounds ship as lossless 1-2 MB PNGs. For each image this
+stage binary-searches the WebP and AVIF quality setting for the lowest one
+whose decoded result still reaches a target SSIM against the PNG, writes
+that variant next to the PNG (which stays as the fallback), and records the
+choice in assets/image_variants.json. Images with medium/low reductions from
+texture_tiers.py get those encoded too, listed under the master's entry as
+``tiers``. js/utils/ImageVariants.js reads the manifest (keyed by master
+path) and serves the best format the browser supports at the device's tier.
+
+SSIM is computed on luma over 8x8 windows (alpha images: composited on grey,
+with the alpha channel scored separately and the lower score used). Encoders
+are Pillow's built-in WebP/AVIF plugins.
+
+Usage:
+  python encode_images.py                       # Default set (UI art, icon atlas, bg_* textures)
+  python encode_images.py --target 0.99         # Stricter quality target
+  python encode_images.py --formats webp        # WebP only
+  python encode_images.py assets/ui/chara_mia.png
+  python encode_images.py --force               # Re-search images already in the manifest
+
+Requires:
+  pip install Pillow numpy       (Pillow >= 11.3 for AVIF)
+"""
+
+import argparse
+import io
+import json
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image, features
+except ImportError:
+    print("ERROR: Required packages not installed.")
+    print("Run: pip install Pillow numpy")
+    sys.exit(1)
+
+from asset_io import write_bytes_atomic
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ASSETS_DIR = PROJECT_ROOT / "assets"
+MANIFEST_PATH = ASSETS_DIR / "image_variants.json"
+TIERS_MANIFEST_PATH = ASSETS_DIR / "textures" / "tiers" / "manifest.json"   # tools/texture_tiers.py
+
+# Default inputs: UI art (single icons have their own pipeline), the skill
+# icon atlas sheets (build_icon_atlas.py) and background textures
+DEFAULT_GLOBS = [
+    ("ui", "*.png"),
+    ("ui/icons/atlas", "skills_*.png"),
+    ("textures", "bg_*.png"),
+]
+EXCLUDE_PREFIXES = ("icon_",)
+
+SSIM_TARGET = 0.98
+SSIM_WINDOW = 8
+QUALITY_RANGE = (10, 100)
+
+# Per-format Pillow save options; quality is added by the search
+FORMATS = {
+    "webp": {"format": "WEBP", "params": {"method": 6}},
+    "avif": {"format": "AVIF", "params": {"speed": 6}},
+}
+
+
+# ---------------------------------------------------------------------------
+# SSIM
+# ---------------------------------------------------------------------------
+
+def _box_mean(a: np.ndarray, w: int) -> np.ndarray:
+    """Mean over every w x w window (valid positions only), via an integral image."""
+    s = np.pad(a, ((1, 0), (1, 0))).cumsum(0).cumsum(1)
+    return (s[w:, w:] - s[:-w, w:] - s[w:, :-w] + s[:-w, :-w]) / (w * w)
+
+
+def ssim(a: np.ndarray, b: np.ndarray, w: int = SSIM_WINDOW) -> float:
+    """Mean SSIM of two single-channel float arrays in [0, 255]."""
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    mu_a, mu_b = _box_mean(a, w), _box_mean(b, w)
+    var_a = _box_mean(a * a, w) - mu_a ** 2
+    var_b = _box_mean(b * b, w) - mu_b ** 2
+    cov = _box_mean(a * b, w) - mu_a * mu_b
+    num = (2 * mu_a * mu_b + c1) * (2 * cov + c2)
+    den = (mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2)
+    return float((num / den).mean())
+
+
+def _planes(img: Image.Image):
+    """(luma, alpha or None) as float64 arrays; RGBA is composited on mid-grey."""
+    if "A" in img.getbands():
+        rgba = img.convert("RGBA")
+        grey = Image.new("RGBA", rgba.size, (128, 128, 128, 255))
+        luma = Image.alpha_composite(grey, rgba).convert("L")
+        return np.asarray(luma, dtype=np.float64), np.asarray(rgba.getchannel("A"), dtype=np.float64)
+    return np.asarray(img.convert("L"), dtype=np.float64), None
+
+
+def score(reference, candidate: Image.Image) -> float:
+    """SSIM of ``candidate`` against precomputed reference planes."""
+    ref_luma, ref_alpha = reference
+    luma, alpha = _planes(candidate)
+    value = ssim(ref_luma, luma)
+    if ref_alpha is not None:
+        value = min(value, ssim(ref_alpha, alpha if alpha is not None else np.full_like(ref_alpha, 255)))
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+def encode(img: Image.Image, fmt: str, quality: int) -> bytes:
+    spec = FORMATS[fmt]
+    buf = io.BytesIO()
+    img.save(buf, spec["format"], quality=quality, **spec["params"])
+    return buf.getvalue()
+
+
+def search_quality(img: Image.Image, reference, fmt: str, target: float):
+    """
+    Binary-search the lowest quality whose SSIM reaches ``target``.
+
+    Assumes SSIM rises with quality (true in practice for both codecs).
+
+    Returns:
+        (quality, ssim, data) or None if even the top quality misses the target.
+    """
+    lo, hi = QUALITY_RANGE
+    best = None
+    while lo <= hi:
+        quality = (lo + hi) // 2
+        data = encode(img, fmt, quality)
+        with Image.open(io.BytesIO(data)) as decoded:
+            value = score(reference, decoded)
+        if value >= target:
+            best = (quality, value, data)
+            hi = quality - 1
+        else:
+            lo = quality + 1
+    return best
+
+
+def default_inputs() -> list[Path]:
+    paths = []
+    for subdir, pattern in DEFAULT_GLOBS:
+        paths += [p for p in sorted((ASSETS_DIR / subdir).glob(pattern))
+                  if not p.name.startswith(EXCLUDE_PREFIXES)]
+    return paths
+
+
+def load_manifest() -> dict:
+    if MANIFEST_PATH.exists():
+        return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    return {"target_ssim": SSIM_TARGET, "images": {}}
+
+
+def encode_image(path: Path, formats, target: float) -> dict:
+    """Search every format for one PNG and write the passing variants next to it."""
+    with Image.open(path) as img:
+        img.load()
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+    reference = _planes(img)
+
+    entry = {"png_bytes": path.stat().st_size, "variants": {}}
+    for fmt in formats:
+        result = search_quality(img, reference, fmt, target)
+        if result is None:
+            print(f"  [{fmt.upper():4s}] no quality reaches SSIM {target}; keeping PNG only")
+            continue
+        quality, value, data = result
+        out = path.with_suffix(f".{fmt}")
+        write_bytes_atomic(out, data)
+        entry["variants"][fmt] = {
+            "path": out.relative_to(PROJECT_ROOT).as_posix(),
+            "quality": quality,
+            "ssim": round(value, 4),
+            "bytes": len(data),
+        }
+        print(f"  [{fmt.upper():4s}] q={quality:3d}  SSIM {value:.4f}  "
+              f"{len(data) / 1024:7.1f} KB ({len(data) / entry['png_bytes']:.1%} of PNG)")
+    if entry["variants"]:
+        entry["smallest"] = min(entry["variants"], key=lambda f: entry["variants"][f]["bytes"])
+    return entry
+
+
+def encode_tiers(key: str, entry: dict, old: dict, formats, target: float, force: bool) -> None:
+    """
+    Encode the texture_tiers.py reductions of one image into ``entry["tiers"]``.
+
+    The game looks variants up by master path and picks the tier's entry,
+    so a device on the low tier still gets WebP/AVIF instead of the tier PNG.
+    """
+    tiers = {}
+    for tier, rel in load_tier_paths().get(key, {}).items():
+        path = PROJECT_ROOT / rel
+        if tier == "high" or not path.exists():
+            continue
+        previous = ((old or {}).get("tiers") or {}).get(tier)
+        if previous and not force and set(formats) <= set(previous["variants"]) \
+                and previous.get("png_bytes") == path.stat().st_size:
+            tiers[tier] = previous
+            continue
+        print(f"  [{tier}] {rel}")
+        tiers[tier] = encode_image(path, formats, target)
+    if tiers:
+        entry["tiers"] = tiers
+
+
+def load_tier_paths() -> dict:
+    """Master PNG path -> {tier: PNG path} from texture_tiers.py's manifest ({} when not built)."""
+    if TIERS_MANIFEST_PATH.exists():
+        return json.loads(TIERS_MANIFEST_PATH.read_text(encoding="utf-8"))["textures"]
+    return {}
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode PNGs to WebP/AVIF at a target SSIM")
+    parser.add_argument("images", nargs="*", help="PNG files (default: UI art + bg_* textures)")
+    parser.add_argument("--target", type=float, default=SSIM_TARGET, help=f"SSIM target (default {SSIM_TARGET})")
+    parser.add_argument("--formats", nargs="+", choices=list(FORMATS), default=list(FORMATS))
+    parser.add_argument("--force", action="store_true", help="Re-encode images already in the manifest")
+    args = parser.parse_args()
+
+    formats = [f for f in args.formats if features.check(f)]
+    for missing in set(args.formats) - set(formats):
+        print(f"WARNING: this Pillow build cannot encode {missing.upper()}; skipping it")
+    if not formats:
+        return 1
+
+    paths = [Path(p).resolve() for p in args.images] or default_inputs()
+    manifest = load_manifest()
+    manifest["target_ssim"] = args.target
+
+    png_total = variant_total = 0
+    for i, path in enumerate(paths, 1):
+        key = path.relative_to(PROJECT_ROOT).as_posix()
+        print(f"\n[{i}/{len(paths)}] {key} ({path.stat().st_size / 1024:.0f} KB)")
+        old = manifest["images"].get(key)
+        if old and not args.force and set(formats) <= set(old["variants"]) \
+                and old.get("png_bytes") == path.stat().st_size:
+            print("  [SKIP] Already encoded")
+            entry = old
+        else:
+            entry = encode_image(path, formats, args.target)
+            manifest["images"][key] = entry
+        encode_tiers(key, entry, old, formats, args.target, args.force)
+        png_total += entry["png_bytes"]
+        sizes = [v["bytes"] for v in entry["variants"].values()]
+        variant_total += min(sizes) if sizes else entry["png_bytes"]
+
+    write_bytes_atomic(MANIFEST_PATH, (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+
+    print("\n" + "=" * 60)
+    print("  ENCODE SUMMARY")
+    print("=" * 60)
+    print(f"  Images: {len(paths)}   target SSIM: {args.target}")
+    print(f"  PNG: {png_total / 1_000_000:.1f} MB -> smallest variants: "
+          f"{variant_total / 1_000_000:.2f} MB ({1 - variant_total / max(png_total, 1):.1%} smaller)")
+    print(f"  Manifest: {MANIFEST_PATH.relative_to(PROJECT_ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Dragon Nest Lite - Flipbook Motion Vectors
+==========================================
+
+Effect sheets are 16-frame flipbooks; stepping through them frame by frame
+stutters unless every frame is kept at full resolution. This stage estimates
+dense optical flow from each frame to the next (pyramidal Lucas-Kanade in
+NumPy) and stores it as a small companion texture in the same grid layout:
+
+  assets/textures/effects/motion/fx_xxx_sheet_mv.png   (RG = dx, dy; 128 = still)
+  assets/textures/effects/motion/motion.json
+
+Vectors are in cell units (1.0 = one cell width/height), y up, scaled by the
+per-sheet maxDisplacement recorded in motion.json. EffectManager warps the two
+neighbouring frames towards each other along the flow and cross-fades them,
+so a sheet can drop to 8 frames (or half resolution) and still play smoothly.
+
+Each sheet is checked by rebuilding every odd frame from its two neighbours
+(as if the sheet had half the frames), flow-guided vs. a plain cross-fade.
+Sheets whose frames are too unlike each other for the flow to win get no
+motion texture ("image": null) and are cross-faded without warping.
+
+Sheets are read through unmatte_effects.sheet_sources() (the premultiplied
+copy where there is one) and motion.json is keyed by that path, as listed in
+EffectManager's FX_SPRITE_SHEETS. generate_images.py --effects runs this
+after un-matting and packing.
+
+Usage:
+  python flipbook_motion.py
+  python flipbook_motion.py --scale 0.5      # Denser vectors (default 0.25 of the cell)
+
+Requires:
+  pip install Pillow numpy
+"""
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:
+    print("ERROR: Required packages not installed.")
+    print("Run: pip install Pillow numpy")
+    sys.exit(1)
+
+from asset_io import save_image_atomic, write_bytes_atomic
+from unmatte_effects import sheet_sources
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+EFFECTS_DIR = PROJECT_ROOT / "assets" / "textures" / "effects"
+MOTION_DIR = EFFECTS_DIR / "motion"
+MANIFEST_PATH = MOTION_DIR / "motion.json"
+
+GRID = (4, 4)              # cols, rows of the generated sheets
+FLOW_SCALE = 0.25          # motion texture resolution relative to the sheet
+EVAL_SCALE = 0.5           # resolution of the reconstruction check
+
+PYRAMID_LEVELS = 3
+LK_ITERATIONS = 3          # warp/solve passes per level
+LK_WINDOW = 7              # px, at the level's resolution
+LK_REGULARIZATION = 1.0    # added to the structure tensor diagonal (flat areas -> no motion)
+DISPLACEMENT_STEP = 1 / 64  # maxDisplacement is rounded up to this (cell units)
+
+
+# ---------------------------------------------------------------------------
+# Image helpers
+# ---------------------------------------------------------------------------
+
+def intensity(cell: np.ndarray) -> np.ndarray:
+    """Float luma in [0, 1] of an RGB(A) cell (premultiplied rgb = visible emission)."""
+    rgb = cell[..., :3].astype(np.float32) / 255.0
+    return rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def resize(plane: np.ndarray, width: int, height: int) -> np.ndarray:
+    return np.asarray(Image.fromarray(plane.astype(np.float32), "F").resize((width, height), Image.BILINEAR))
+
+
+def box_sum(a: np.ndarray, w: int) -> np.ndarray:
+    """Sum over a w x w window centred on every pixel (edges replicated)."""
+    r = w // 2
+    p = np.pad(a, r, mode="edge")
+    s = np.pad(p, ((1, 0), (1, 0))).cumsum(0).cumsum(1)
+    return s[w:, w:] - s[:-w, w:] - s[w:, :-w] + s[:-w, :-w]
+
+
+def warp(img: np.ndarray, fx: np.ndarray, fy: np.ndarray) -> np.ndarray:
+    """Sample ``img`` at (x + fx, y + fy) with bilinear filtering and edge clamping."""
+    h, w = img.shape[:2]
+    ys, xs = np.mgrid[0:h, 0:w].astype(np.float32)
+    x = np.clip(xs + fx, 0, w - 1)
+    y = np.clip(ys + fy, 0, h - 1)
+    x0, y0 = np.floor(x).astype(int), np.floor(y).astype(int)
+    x1, y1 = np.minimum(x0 + 1, w - 1), np.minimum(y0 + 1, h - 1)
+    ax, ay = x - x0, y - y0
+    if img.ndim == 3:
+        ax, ay = ax[..., None], ay[..., None]
+    top = img[y0, x0] * (1 - ax) + img[y0, x1] * ax
+    bottom = img[y1, x0] * (1 - ax) + img[y1, x1] * ax
+    return top * (1 - ay) + bottom * ay
+
+
+# ---------------------------------------------------------------------------
+# Optical flow
+# ---------------------------------------------------------------------------
+
+def lucas_kanade(i0: np.ndarray, i1: np.ndarray):
+    """
+    Dense flow (fx, fy) in px such that i1(x + f) ~= i0(x).
+
+    Coarse-to-fine over PYRAMID_LEVELS; each level re-warps i1 by the current
+    estimate and solves the windowed 2x2 Lucas-Kanade system per pixel.
+    """
+    pyramid = [(i0, i1)]
+    for _ in range(PYRAMID_LEVELS - 1):
+        a, b = pyramid[-1]
+        if min(a.shape) < 2 * LK_WINDOW:
+            break
+        pyramid.append((resize(a, a.shape[1] // 2, a.shape[0] // 2),
+                        resize(b, b.shape[1] // 2, b.shape[0] // 2)))
+
+    fx = fy = None
+    for a, b in reversed(pyramid):
+        h, w = a.shape
+        if fx is None:
+            fx = np.zeros((h, w), np.float32)
+            fy = np.zeros((h, w), np.float32)
+        else:
+            fx = resize(fx, w, h) * (w / fx.shape[1])
+            fy = resize(fy, w, h) * (h / fy.shape[0])
+        for _ in range(LK_ITERATIONS):
+            bw = warp(b, fx, fy)
+            gy, gx = np.gradient((a + bw) * 0.5)
+            it = bw - a
+            sxx = box_sum(gx * gx, LK_WINDOW) + LK_REGULARIZATION
+            syy = box_sum(gy * gy, LK_WINDOW) + LK_REGULARIZATION
+            sxy = box_sum(gx * gy, LK_WINDOW)
+            bx = -box_sum(gx * it, LK_WINDOW)
+            by = -box_sum(gy * it, LK_WINDOW)
+            det = sxx * syy - sxy * sxy
+            fx = fx + (syy * bx - sxy * by) / det
+            fy = fy + (sxx * by - sxy * bx) / det
+    return fx, fy
+
+
+def interpolate(f0: np.ndarray, f1: np.ndarray, fx: np.ndarray, fy: np.ndarray, t: float) -> np.ndarray:
+    """Frame between f0 and f1 at ``t``, the way EffectManager's shader blends them."""
+    a = warp(f0, -t * fx, -t * fy)
+    b = warp(f1, (1 - t) * fx, (1 - t) * fy)
+    return a * (1 - t) + b * t
+
+
+def psnr(a: np.ndarray, b: np.ndarray) -> float:
+    mse = float(np.mean((a - b) ** 2))
+    return 99.0 if mse <= 1e-10 else 10 * math.log10(1.0 / mse)
+
+
+# ---------------------------------------------------------------------------
+# Sheets
+# ---------------------------------------------------------------------------
+
+def split_cells(sheet: np.ndarray, cols: int, rows: int) -> list[np.ndarray]:
+    ch, cw = sheet.shape[0] // rows, sheet.shape[1] // cols
+    return [sheet[r * ch:(r + 1) * ch, c * cw:(c + 1) * cw] for r in range(rows) for c in range(cols)]
+
+
+def cell_flow(c0: np.ndarray, c1: np.ndarray, scale: float):
+    """Flow between two cells at ``scale`` of their resolution, in cell units (y down)."""
+    h, w = c0.shape[:2]
+    fw, fh = max(8, round(w * scale)), max(8, round(h * scale))
+    fx, fy = lucas_kanade(resize(intensity(c0), fw, fh), resize(intensity(c1), fw, fh))
+    return fx / fw, fy / fh
+
+
+def evaluate(cells: list[np.ndarray]):
+    """Mean PSNR of odd frames rebuilt from their neighbours: (flow-guided, cross-fade)."""
+    flow_scores, fade_scores = [], []
+    for i in range(0, len(cells) - 2, 2):
+        h, w = cells[i].shape[:2]
+        ew, eh = round(w * EVAL_SCALE), round(h * EVAL_SCALE)
+        f0, mid, f2 = (resize(intensity(cells[j]), ew, eh) for j in (i, i + 1, i + 2))
+        fx, fy = cell_flow(cells[i], cells[i + 2], EVAL_SCALE / 2)
+        fx, fy = resize(fx, ew, eh) * ew, resize(fy, ew, eh) * eh
+        flow_scores.append(psnr(interpolate(f0, f2, fx, fy, 0.5), mid))
+        fade_scores.append(psnr((f0 + f2) * 0.5, mid))
+    return float(np.mean(flow_scores)), float(np.mean(fade_scores))
+
+
+def build_motion_sheet(path: Path, cols: int, rows: int, scale: float) -> dict:
+    """Write the motion-vector companion of one sheet; returns its motion.json entry."""
+    with Image.open(path) as img:
+        sheet = np.asarray(img.convert("RGBA"))
+    cells = split_cells(sheet, cols, rows)
+    cell_h, cell_w = cells[0].shape[:2]
+    fw, fh = max(8, round(cell_w * scale)), max(8, round(cell_h * scale))
+
+    flows = []
+    for i in range(len(cells)):
+        if i + 1 < len(cells):
+            fx, fy = cell_flow(cells[i], cells[i + 1], scale)
+        else:
+            fx = fy = np.zeros((fh, fw), np.float32)  # last frame holds still
+        flows.append((fx, -fy))  # store y up, like texture coordinates
+
+    magnitudes = np.concatenate([np.hypot(fx, fy).ravel() for fx, fy in flows])
+    limit = float(np.percentile(magnitudes, 99.5))
+    max_disp = max(DISPLACEMENT_STEP, math.ceil(limit / DISPLACEMENT_STEP) * DISPLACEMENT_STEP)
+
+    out = np.zeros((rows * fh, cols * fw, 3), dtype=np.uint8)
+    for i, (fx, fy) in enumerate(flows):
+        r, c = divmod(i, cols)
+        encoded = np.clip(np.rint(127.5 + np.stack([fx, fy], axis=-1) / max_disp * 127.5), 0, 255)
+        out[r * fh:(r + 1) * fh, c * fw:(c + 1) * fw, :2] = encoded.astype(np.uint8)
+
+    target = MOTION_DIR / f"{path.stem}_mv.png"
+    entry = {"image": None, "cols": cols, "rows": rows, "maxDisplacement": 0}
+    flow_psnr, fade_psnr = evaluate(cells)
+    score = f"half-rate rebuild: flow {flow_psnr:.1f} dB vs fade {fade_psnr:.1f} dB"
+    if flow_psnr < fade_psnr:
+        # Frames too unlike each other for flow to help; EffectManager cross-fades
+        target.unlink(missing_ok=True)
+        print(f"  [FADE] {path.name}  {score}")
+        return entry
+
+    save_image_atomic(Image.fromarray(out, "RGB"), target, optimize=True)
+    print(f"  [MV] {target.name} ({out.shape[1]}x{out.shape[0]}, {target.stat().st_size / 1024:.0f} KB, "
+          f"max {max_disp:.3f} cell)  {score}")
+    entry.update(image=target.relative_to(PROJECT_ROOT).as_posix(), maxDisplacement=max_disp)
+    return entry
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def build_all_motion(scale: float = FLOW_SCALE, cols: int = GRID[0], rows: int = GRID[1]) -> dict:
+    """Motion textures for every effect sheet; rewrites motion.json."""
+    manifest = {}
+    for path in sheet_sources():
+        manifest[path.relative_to(PROJECT_ROOT).as_posix()] = build_motion_sheet(path, cols, rows, scale)
+    write_bytes_atomic(MANIFEST_PATH, (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute flipbook motion-vector textures for effect sheets")
+    parser.add_argument("--scale", type=float, default=FLOW_SCALE,
+                        help=f"Motion texture resolution relative to the sheet (default {FLOW_SCALE})")
+    parser.add_argument("--cols", type=int, default=GRID[0], help="Columns in the source sheets")
+    parser.add_argument("--rows", type=int, default=GRID[1], help="Rows in the source sheets")
+    args = parser.parse_args()
+
+    sheets = sheet_sources()
+    if not sheets:
+        print(f"No sheets found in {EFFECTS_DIR}")
+        return 1
+
+    print("=" * 60)
+    print("  Flipbook Motion Vectors")
+    print("=" * 60)
+    manifest = build_all_motion(args.scale, args.cols, args.rows)
+    print(f"\n  Sheets: {len(manifest)}  Manifest: {MANIFEST_PATH.relative_to(PROJECT_ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,20 +10,24 @@ Usage:
     python generate_bgm.py              # Generate all BGM
     python generate_bgm.py --list       # List tracks
     python generate_bgm.py --dry-run    # Preview only
+    python generate_bgm.py --no-validate  # Save without output checks
 
 Requires:
-    pip install requests python-dotenv
+    pip install requests python-dotenv numpy
+    pip install miniaudio   # optional: enables the clipping/silence checks
 """
 
 import argparse
-import os
 import sys
-import time
 from pathlib import Path
 
 import requests
 from dotenv import load_dotenv
 
+from asset_io import write_bytes_atomic
+from key_pool import KeyPool, KeyPoolExhausted
+from output_checks import check_audio
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -31,11 +35,13 @@ from dotenv import load_dotenv
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 load_dotenv(PROJECT_ROOT / '.env')
 
-API_KEY = os.environ.get('ELEVENLABS_API_KEY', '')
 API_URL = 'https://api.elevenlabs.io/v1/sound-generation'
 OUTPUT_DIR = PROJECT_ROOT / 'assets' / 'audio' / 'bgm'
 
-REQUEST_DELAY = 3.0  # seconds between requests (BGM takes longer)
+REQUEST_DELAY = 3.0  # seconds between requests on the same key (BGM takes longer)
+VALIDATION_RETRIES = 2  # regenerations allowed after a rejected output
+
+KEY_POOL = KeyPool.from_env('ELEVENLABS_API_KEY', min_interval=REQUEST_DELAY)
 
 # ---------------------------------------------------------------------------
 # BGM Definitions
@@ -83,31 +89,57 @@ BGM_TRACKS = [
 # API
 # ---------------------------------------------------------------------------
 
-def generate_bgm(track: dict) -> bytes | None:
-    """Call ElevenLabs Sound Generation API and return MP3 bytes."""
-    if not API_KEY:
-        print('  [ERROR] ELEVENLABS_API_KEY not set in .env')
+def generate_bgm(track: dict, validate: bool = True) -> bytes | None:
+    """Call ElevenLabs Sound Generation API and return MP3 bytes.
+
+    With ``validate``, a track that fails check_audio is regenerated
+    immediately, up to VALIDATION_RETRIES times.
+    """
+    if not KEY_POOL:
+        print('  [ERROR] ELEVENLABS_API_KEY (or ELEVENLABS_API_KEYS) not set in .env')
         return None
 
-    headers = {
-        'xi-api-key': API_KEY,
-        'Content-Type': 'application/json',
-    }
     payload = {
         'text': track['prompt'],
         'duration_seconds': track['duration'],
     }
 
-    try:
-        resp = requests.post(API_URL, json=payload, headers=headers, timeout=120)
-        if resp.status_code == 200:
-            return resp.content
-        else:
+    rejected = 0
+    while True:
+        try:
+            api_key = KEY_POOL.acquire()
+        except KeyPoolExhausted as e:
+            print(f'  [ERROR] {e}')
+            return None
+
+        headers = {
+            'xi-api-key': api_key,
+            'Content-Type': 'application/json',
+        }
+
+        try:
+            resp = requests.post(API_URL, json=payload, headers=headers, timeout=120)
+            if resp.status_code == 200:
+                if validate:
+                    ok, reason = check_audio(resp.content, track['duration'])
+                    if not ok:
+                        print(f'  [REJECT] {reason}')
+                        if rejected < VALIDATION_RETRIES:
+                            rejected += 1
+                            print(f'  [RETRY {rejected}/{VALIDATION_RETRIES}] Regenerating...')
+                            continue
+                        return None
+                return resp.content
             print(f'  [ERROR] HTTP {resp.status_code}: {resp.text[:200]}')
+            # Evicted keys (401 / quota) hand the track to the next key
+            if KEY_POOL.report_failure(api_key, resp.status_code, resp.text) and KEY_POOL:
+                continue
             return None
-    except Exception as e:
-        print(f'  [ERROR] {e}')
-        return None
+        except Exception as e:
+            print(f'  [ERROR] {e}')
+            return None
+        finally:
+            KEY_POOL.release(api_key)
 
 
 # ---------------------------------------------------------------------------
@@ -118,6 +150,8 @@ def main():
     parser = argparse.ArgumentParser(description='Generate BGM tracks')
     parser.add_argument('--list', action='store_true', help='List all tracks')
     parser.add_argument('--dry-run', action='store_true', help='Preview only')
+    parser.add_argument('--no-validate', action='store_true',
+                        help='Save tracks without duration/clipping/silence checks')
     args = parser.parse_args()
 
     if args.list:
@@ -130,6 +164,7 @@ def main():
     print(f'Loaded .env from {PROJECT_ROOT / ".env"}')
     print(f'Output: {OUTPUT_DIR}')
     print(f'Tracks: {len(BGM_TRACKS)}')
+    print(KEY_POOL.describe())
     print()
 
     succeeded = 0
@@ -149,9 +184,9 @@ def main():
             print(f'  [DRY-RUN] Would generate: {track["prompt"][:80]}...')
             continue
 
-        data = generate_bgm(track)
+        data = generate_bgm(track, validate=not args.no_validate)
         if data:
-            outfile.write_bytes(data)
+            write_bytes_atomic(outfile, data)
             size_kb = len(data) / 1024
             print(f'  [SAVED] {outfile.name} ({size_kb:.1f} KB)')
             succeeded += 1
@@ -159,9 +194,6 @@ def main():
             print(f'  [FAILED] {track["name"]}')
             failed += 1
 
-        if i < len(BGM_TRACKS) - 1:
-            time.sleep(REQUEST_DELAY)
-
     print()
     print(f'Done: {succeeded} generated, {skipped} skipped, {failed} failed')
 
@@ -3,22 +3,21 @@
 Dragon Nest Lite - Effect Texture Generation Script
 
 Generates VFX textures using Gemini (gemini-3-pro-image-preview / NanoBanana Pro).
-Outputs transparent PNG textures for use as billboard sprites in Three.js.
+Effects are requested on pure black and un-matted to RGBA (alpha from the
+emission) before saving, for use as billboard sprites in Three.js.
 
 Usage:
     python generate_effects.py              # Generate all effect textures
     python generate_effects.py --list       # List all effects
     python generate_effects.py --effect slash_arc  # Generate a specific one
+    python generate_effects.py --no-validate  # Accept outputs without checks
 
 Requires:
-    pip install google-genai python-dotenv Pillow
+    pip install google-genai python-dotenv Pillow numpy
 """
 
 import argparse
-import io
-import os
 import sys
-import time
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -27,11 +26,17 @@ try:
     from google import genai
     from google.genai import types
     from PIL import Image
+    import numpy as np
 except ImportError:
     print("ERROR: Required packages not installed.")
-    print("Run: pip install google-genai python-dotenv Pillow")
+    print("Run: pip install google-genai python-dotenv Pillow numpy")
     sys.exit(1)
 
+from asset_io import LazyImage, png_has_alpha, save_image_atomic
+from key_pool import KeyPool, KeyPoolExhausted
+from output_checks import check_transparency
+from unmatte_effects import unmatte_black
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -43,9 +48,10 @@ EFFECTS_DIR = ASSETS_DIR / "textures" / "effects"
 MODEL_NAME = "gemini-3-pro-image-preview"
 MAX_RETRIES = 3
 RETRY_DELAY_BASE = 5
-REQUEST_DELAY = 4  # seconds between requests
+REQUEST_DELAY = 4  # seconds between requests on the same API key
 
-CLIENT = None
+KEY_POOL = None
+_CLIENTS = {}
 
 # ---------------------------------------------------------------------------
 # Effect Texture Definitions
@@ -59,7 +65,7 @@ EFFECT_TEXTURES = {
             "game VFX slash effect, single dynamic curved sword slash trail, "
             "glowing white energy with light blue edge glow, motion blur trail, "
             "stylized anime action game style, clean sharp edges, "
-            "transparent background (alpha channel), centered composition, "
+            "pure black background (additive blending, nothing else behind the effect), centered composition, "
             "512x512, no text, no watermark, no background noise"
         ),
     },
@@ -69,7 +75,7 @@ EFFECT_TEXTURES = {
             "game VFX heavy sword slash, large powerful downward diagonal energy slash, "
             "glowing orange-gold energy with fire sparks, thick trail with dynamic motion, "
             "stylized fantasy RPG action game style, "
-            "transparent background (alpha channel), centered, "
+            "pure black background (additive blending, nothing else behind the effect), centered, "
             "512x512, no text, no watermark"
         ),
     },
@@ -78,7 +84,7 @@ EFFECT_TEXTURES = {
         "prompt": (
             "game VFX hit impact spark, radial burst of bright golden-white sparks, "
             "small explosion of light particles radiating outward, comic action style, "
-            "transparent background (alpha channel), centered composition, "
+            "pure black background (additive blending, nothing else behind the effect), centered composition, "
             "256x256, no text, no watermark, clean edges"
         ),
     },
@@ -90,7 +96,7 @@ EFFECT_TEXTURES = {
             "game VFX fireball projectile, bright burning orange-red fireball with trailing flames, "
             "hot glowing core with wispy fire edges, stylized cartoon flames, "
             "fantasy RPG magic spell style, dynamic motion feeling, "
-            "transparent background (alpha channel), centered, "
+            "pure black background (additive blending, nothing else behind the effect), centered, "
             "256x256, no text, no watermark"
         ),
     },
@@ -100,7 +106,7 @@ EFFECT_TEXTURES = {
             "game VFX fire explosion, large radial burst of flames and sparks, "
             "orange and red with bright yellow center, stylized cartoon explosion, "
             "fantasy RPG magic spell detonation, dynamic expanding shape, "
-            "transparent background (alpha channel), centered, "
+            "pure black background (additive blending, nothing else behind the effect), centered, "
             "512x512, no text, no watermark"
         ),
     },
@@ -112,7 +118,7 @@ EFFECT_TEXTURES = {
             "game VFX ice crystal shard, sharp translucent blue ice crystal, "
             "glowing icy blue with white frost highlights, faceted gem-like surface, "
             "cold mist wisps around edges, stylized fantasy RPG style, "
-            "transparent background (alpha channel), centered, "
+            "pure black background (additive blending, nothing else behind the effect), centered, "
             "256x256, no text, no watermark"
         ),
     },
@@ -122,7 +128,7 @@ EFFECT_TEXTURES = {
             "game VFX ice explosion, radial burst of ice crystals and snowflakes, "
             "light blue and white with frozen mist, sharp crystalline fragments flying outward, "
             "fantasy RPG frost magic spell effect, "
-            "transparent background (alpha channel), centered, "
+            "pure black background (additive blending, nothing else behind the effect), centered, "
             "512x512, no text, no watermark"
         ),
     },
@@ -132,7 +138,7 @@ EFFECT_TEXTURES = {
             "game VFX frost magic circle on ground, circular ice rune pattern, "
             "glowing icy blue lines forming an intricate circular pattern, "
             "frozen crystalline edges, snowflake motifs, top-down view, "
-            "transparent background (alpha channel), "
+            "pure black background (additive blending, nothing else behind the effect), "
             "512x512, no text, no watermark"
         ),
     },
@@ -144,7 +150,7 @@ EFFECT_TEXTURES = {
             "game VFX dark magic energy orb, swirling purple-black void sphere, "
             "glowing dark purple edges with violet energy wisps, "
             "ominous dark magic spell, gravitational distortion effect, "
-            "transparent background (alpha channel), centered, "
+            "pure black background (additive blending, nothing else behind the effect), centered, "
             "256x256, no text, no watermark"
         ),
     },
@@ -154,7 +160,7 @@ EFFECT_TEXTURES = {
             "game VFX dark magic explosion, expanding purple-black energy burst, "
             "violet and indigo swirling energy with dark center, "
             "dark magic spell detonation, ominous fantasy RPG style, "
-            "transparent background (alpha channel), centered, "
+            "pure black background (additive blending, nothing else behind the effect), centered, "
             "512x512, no text, no watermark"
         ),
     },
@@ -166,7 +172,7 @@ EFFECT_TEXTURES = {
             "game VFX magic beam laser ray, horizontal bright magenta-purple energy beam, "
             "glowing hot center with energy wisps along edges, straight line, "
             "stylized fantasy RPG magic beam attack, horizontal orientation, "
-            "transparent background (alpha channel), "
+            "pure black background (additive blending, nothing else behind the effect), "
             "512x128, no text, no watermark"
         ),
     },
@@ -178,7 +184,7 @@ EFFECT_TEXTURES = {
             "game VFX buff aura ring, circular glowing magic ring, "
             "golden-green energy rune circle, mystical symbols on ring, "
             "power-up enhancement magic effect, top-down view, "
-            "transparent background (alpha channel), "
+            "pure black background (additive blending, nothing else behind the effect), "
             "512x512, no text, no watermark"
         ),
     },
@@ -190,7 +196,7 @@ EFFECT_TEXTURES = {
             "game VFX magic summoning circle, intricate arcane circle with runes, "
             "glowing blue-white magical lines forming concentric patterns, "
             "mystical symbols and geometric patterns, top-down view, "
-            "transparent background (alpha channel), "
+            "pure black background (additive blending, nothing else behind the effect), "
             "512x512, no text, no watermark"
         ),
     },
@@ -200,7 +206,7 @@ EFFECT_TEXTURES = {
             "game VFX ground impact shockwave, expanding concentric ring on ground, "
             "dust and debris particles radiating outward, "
             "earth-toned energy ring with cracks, top-down view, "
-            "transparent background (alpha channel), "
+            "pure black background (additive blending, nothing else behind the effect), "
             "512x512, no text, no watermark"
         ),
     },
@@ -212,21 +218,38 @@ EFFECT_TEXTURES = {
 # ---------------------------------------------------------------------------
 
 def init_genai():
-    global CLIENT
+    global KEY_POOL
     load_dotenv(PROJECT_ROOT / ".env")
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        print("ERROR: GEMINI_API_KEY not found in .env")
+    KEY_POOL = KeyPool.from_env("GEMINI_API_KEY", min_interval=REQUEST_DELAY)
+    if not KEY_POOL:
+        print("ERROR: GEMINI_API_KEY (or GEMINI_API_KEYS) not found in .env")
         sys.exit(1)
-    CLIENT = genai.Client(api_key=api_key)
     print(f"[OK] Gemini SDK configured (model: {MODEL_NAME})")
+    print(f"[OK] {KEY_POOL.describe()}")
+
+
+def get_client(api_key):
+    """Return the Gemini client bound to one API key (created on first use)."""
+    if api_key not in _CLIENTS:
+        _CLIENTS[api_key] = genai.Client(api_key=api_key)
+    return _CLIENTS[api_key]
+
 
+def generate_image(prompt, output_path, retries=MAX_RETRIES, validate=True):
+    """Generate a single image using Gemini.
 
-def generate_image(prompt, output_path, retries=MAX_RETRIES):
-    """Generate a single image using Gemini."""
+    With ``validate``, an image with neither real alpha nor a black
+    (additive-ready) background is rejected and regenerated right away.
+    """
     for attempt in range(1, retries + 1):
         try:
-            response = CLIENT.models.generate_content(
+            api_key = KEY_POOL.acquire()
+        except KeyPoolExhausted as e:
+            print(f"    {e}")
+            return False
+
+        try:
+            response = get_client(api_key).models.generate_content(
                 model=MODEL_NAME,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -239,22 +262,35 @@ def generate_image(prompt, output_path, retries=MAX_RETRIES):
                 if part.inline_data is not None:
                     mime = part.inline_data.mime_type
                     if mime and mime.startswith("image/"):
-                        img_data = part.inline_data.data
-                        img = Image.open(io.BytesIO(img_data))
-                        # Convert to RGBA for transparency
-                        if img.mode != "RGBA":
-                            img = img.convert("RGBA")
-                        img.save(str(output_path), "PNG")
+                        result = LazyImage(part.inline_data.data, mime)
+                        if validate:
+                            ok, reason = check_transparency(result.image)
+                            if not ok:
+                                print(f"    Rejected (attempt {attempt}): {reason}")
+                                break
+                        # PNGs that already carry alpha are written as returned;
+                        # anything else was drawn on black and gets its alpha
+                        # back from the emission (straight alpha: _createSprite
+                        # premultiplies at upload)
+                        if png_has_alpha(result.data):
+                            result.save(output_path)
+                        else:
+                            rgba = unmatte_black(np.asarray(result.image.convert("RGB")),
+                                                 premultiplied=False)
+                            save_image_atomic(Image.fromarray(rgba, "RGBA"), output_path)
                         return True
-
-            print(f"    No image in response (attempt {attempt})")
+            else:
+                print(f"    No image in response (attempt {attempt})")
 
         except Exception as e:
             print(f"    Error (attempt {attempt}): {e}")
+            delay = RETRY_DELAY_BASE * (2 ** (attempt - 1))
+            # Only 429/5xx rest the key (see KeyPool.report_failure)
+            KEY_POOL.report_failure(api_key, getattr(e, "code", None), str(e), cooldown=delay)
             if attempt < retries:
-                delay = RETRY_DELAY_BASE * (2 ** (attempt - 1))
-                print(f"    Retrying in {delay}s...")
-                time.sleep(delay)
+                print("    Retrying...")
+        finally:
+            KEY_POOL.release(api_key)
 
     return False
 
@@ -268,6 +304,8 @@ def main():
     parser.add_argument("--effect", nargs="+", help="Specific effect(s) to generate")
     parser.add_argument("--list", action="store_true", help="List all effects")
     parser.add_argument("--dry-run", action="store_true", help="Preview only")
+    parser.add_argument("--no-validate", action="store_true",
+                        help="Accept images without the transparency check")
     args = parser.parse_args()
 
     if args.list:
@@ -312,7 +350,7 @@ def main():
             continue
 
         print(f"  Generating...")
-        ok = generate_image(config["prompt"], output_path)
+        ok = generate_image(config["prompt"], output_path, validate=not args.no_validate)
         if ok:
             print(f"  OK: {output_path}")
             succeeded.append(name)
@@ -320,8 +358,6 @@ def main():
             print(f"  FAILED")
             failed.append(name)
 
-        time.sleep(REQUEST_DELAY)
-
     # Summary
     print(f"\n{'='*50}")
     print(f"EFFECT GENERATION SUMMARY")
@@ -17,18 +17,18 @@ Usage:
   python generate_images.py --characters
   python generate_images.py --enemies
   python generate_images.py --icons
+  python generate_images.py --icons --icon-grid 3   # 3x3 icons per call, sliced locally
   python generate_images.py --ui
   python generate_images.py --backgrounds
+  python generate_images.py --icons --style-instruction # style text as a system instruction
+  python generate_images.py --effects --no-validate      # accept outputs unchecked
 
 Requires:
-  pip install google-genai python-dotenv Pillow
+  pip install google-genai python-dotenv Pillow numpy
 """
 
 import argparse
-import io
-import os
 import sys
-import time
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -37,11 +37,23 @@ try:
     from google import genai
     from google.genai import types
     from PIL import Image
+    import numpy  # noqa: F401 - used by output_checks
 except ImportError:
     print("ERROR: Required packages not installed.")
-    print("Run: pip install google-genai python-dotenv Pillow")
+    print("Run: pip install google-genai python-dotenv Pillow numpy")
     sys.exit(1)
 
+from asset_io import LazyImage, save_image_atomic
+from key_pool import KeyPool, KeyPoolExhausted
+from output_checks import check_icon, check_icon_cell, check_icon_grid, check_sprite_sheet
+from build_icon_atlas import build_icon_atlas
+from flipbook_motion import build_all_motion
+from prompt_styles import InlinePrompts, StylePreamble, SystemInstructionPrompts
+from resize_icons import ICON_SIZES, build_icon_variants, print_summary as print_icon_variant_summary
+from texture_tiers import build_tiers
+from pack_effect_sheets import pack_all_sheets
+from unmatte_effects import premultiply_sheet
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -59,10 +71,15 @@ MODEL_NAME = "gemini-3-pro-image-preview"
 # Retry settings
 MAX_RETRIES = 3
 RETRY_DELAY_BASE = 5  # seconds, exponential back-off base
-REQUEST_DELAY = 3  # seconds between requests to avoid rate limits
+REQUEST_DELAY = 3  # seconds between requests on the same API key
+
+# Global key pool, per-key clients and style preamble cache
+KEY_POOL = None
+_CLIENTS = {}
+PROMPT_MODE = None
 
-# Global client
-CLIENT = None
+# Run output_checks on each result before accepting it (--no-validate disables)
+VALIDATE_OUTPUTS = True
 
 
 # ---------------------------------------------------------------------------
@@ -75,16 +92,28 @@ def ensure_dirs():
         d.mkdir(parents=True, exist_ok=True)
 
 
-def init_genai():
-    """Load API key and configure the Gemini SDK."""
-    global CLIENT
+def init_genai(style_instruction=False):
+    """Load API keys and configure the Gemini SDK."""
+    global KEY_POOL, PROMPT_MODE
     load_dotenv(PROJECT_ROOT / ".env")
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        print("ERROR: GEMINI_API_KEY not found in .env")
+    KEY_POOL = KeyPool.from_env("GEMINI_API_KEY", min_interval=REQUEST_DELAY)
+    if not KEY_POOL:
+        print("ERROR: GEMINI_API_KEY (or GEMINI_API_KEYS) not found in .env")
         sys.exit(1)
-    CLIENT = genai.Client(api_key=api_key)
     print(f"[OK] Gemini SDK configured (model: {MODEL_NAME})")
+    print(f"[OK] {KEY_POOL.describe()}")
+    if style_instruction:
+        PROMPT_MODE = SystemInstructionPrompts()
+        print("[OK] Style preambles are sent as system instructions")
+    else:
+        PROMPT_MODE = InlinePrompts()
+
+
+def get_client(api_key: str):
+    """Return the Gemini client bound to one API key (created on first use)."""
+    if api_key not in _CLIENTS:
+        _CLIENTS[api_key] = genai.Client(api_key=api_key)
+    return _CLIENTS[api_key]
 
 
 def load_reference_image(filename: str) -> Image.Image:
@@ -103,116 +132,150 @@ def load_reference_image(filename: str) -> Image.Image:
     return img
 
 
-def save_image_from_response(response, output_path: Path):
-    """Extract image from Gemini response and save as PNG."""
-    saved = False
+def first_image_blob(response):
+    """Return the first inline image blob (``.data`` / ``.mime_type``) in a response, or None."""
     try:
         for part in response.candidates[0].content.parts:
             if part.inline_data is not None:
                 mime = part.inline_data.mime_type
                 if mime and mime.startswith("image/"):
-                    img_data = part.inline_data.data
-                    img = Image.open(io.BytesIO(img_data))
-                    img.save(str(output_path), "PNG")
-                    saved = True
-                    break
+                    return part.inline_data
     except (AttributeError, IndexError, TypeError) as exc:
         print(f"  ERROR parsing response: {exc}")
-        return False
+    return None
 
-    if not saved:
-        # Sometimes the model returns text instead of an image
-        text_parts = []
-        try:
-            for part in response.candidates[0].content.parts:
-                if hasattr(part, "text") and part.text:
-                    text_parts.append(part.text)
-        except Exception:
-            pass
-        if text_parts:
-            print(f"  Model returned text instead of image: {text_parts[0][:200]}")
-        return False
 
+def print_text_reply(response):
+    """Sometimes the model returns text instead of an image; show it."""
+    text_parts = []
+    try:
+        for part in response.candidates[0].content.parts:
+            if hasattr(part, "text") and part.text:
+                text_parts.append(part.text)
+    except Exception:
+        pass
+    if text_parts:
+        print(f"  Model returned text instead of image: {text_parts[0][:200]}")
+
+
+def save_image_from_response(response, output_path: Path):
+    """Extract image from Gemini response and save it as PNG (atomically)."""
+    blob = first_image_blob(response)
+    if blob is None:
+        print_text_reply(response)
+        return False
+    LazyImage.from_blob(blob).save(output_path)
     return True
 
 
-def generate_image_text(prompt: str, output_path: Path, retries=MAX_RETRIES):
-    """Generate an image from a text prompt and save it."""
-    if output_path.exists():
-        print(f"  [SKIP] Already exists: {output_path.name}")
-        return True
+def _generate_content(client, prompt: str, style, reference):
+    """One generate_content call, with the style preamble applied by PROMPT_MODE."""
+    text, extra = PROMPT_MODE.prepare(style, prompt)
+    contents = text if reference is None else [text, reference]
+    return client.models.generate_content(
+        model=MODEL_NAME,
+        contents=contents,
+        config=types.GenerateContentConfig(response_modalities=["IMAGE", "TEXT"], **extra),
+    )
+
 
+def request_image(prompt: str, label: str, retries=MAX_RETRIES, style=None, reference=None,
+                  validate=None):
+    """Send one generation request through the key pool, retrying on failure.
+
+    ``prompt`` is the task-specific text; when a ``style`` preamble is given it
+    is applied by PROMPT_MODE: wrapped around the prompt inline by default,
+    or sent as a system instruction (see prompt_styles.py).
+    ``reference`` is an optional input image.
+    ``validate`` is an output_checks function; a rejected image is regenerated
+    straight away as the next attempt.
+
+    Returns a LazyImage of the first successful response, or None.
+    """
     for attempt in range(1, retries + 1):
+        delay = RETRY_DELAY_BASE * (2 ** (attempt - 1))
         try:
-            response = CLIENT.models.generate_content(
-                model=MODEL_NAME,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_modalities=["IMAGE", "TEXT"],
-                ),
-            )
-            if save_image_from_response(response, output_path):
-                print(f"  [SAVED] {output_path.relative_to(PROJECT_ROOT)}")
-                return True
-            else:
-                print(f"  [RETRY {attempt}/{retries}] No image in response for {output_path.name}")
+            api_key = KEY_POOL.acquire()
+        except KeyPoolExhausted as exc:
+            print(f"  [FAILED] {exc}")
+            return None
+
+        try:
+            client = get_client(api_key)
+            response = _generate_content(client, prompt, style, reference)
+            blob = first_image_blob(response)
+            if blob is None:
+                print(f"  [RETRY {attempt}/{retries}] No image in response for {label}")
+                print_text_reply(response)
+                continue
+            result = LazyImage.from_blob(blob)
+            if validate and VALIDATE_OUTPUTS:
+                ok, reason = validate(result.image)
+                if not ok:
+                    print(f"  [RETRY {attempt}/{retries}] Rejected {label}: {reason}")
+                    continue
+            return result
         except Exception as exc:
             print(f"  [RETRY {attempt}/{retries}] Error: {exc}")
+            # 429/5xx rest this key only; other keys in the pool stay available
+            KEY_POOL.report_failure(api_key, getattr(exc, "code", None), str(exc), cooldown=delay)
+        finally:
+            KEY_POOL.release(api_key)
 
-        if attempt < retries:
-            delay = RETRY_DELAY_BASE * (2 ** (attempt - 1))
-            print(f"  Waiting {delay}s before retry...")
-            time.sleep(delay)
+    return None
 
-    print(f"  [FAILED] Could not generate: {output_path.name}")
-    return False
 
-
-def generate_image_with_reference(reference_image: Image.Image, prompt: str, output_path: Path, retries=MAX_RETRIES):
-    """Generate an image using a reference image (image-to-image) and save it."""
+def _generate_and_save(prompt: str, output_path: Path, retries=MAX_RETRIES, style=None, reference=None,
+                       validate=None):
+    """Generate one image and save it, skipping outputs that already exist."""
     if output_path.exists():
         print(f"  [SKIP] Already exists: {output_path.name}")
         return True
 
-    for attempt in range(1, retries + 1):
-        try:
-            response = CLIENT.models.generate_content(
-                model=MODEL_NAME,
-                contents=[prompt, reference_image],
-                config=types.GenerateContentConfig(
-                    response_modalities=["IMAGE", "TEXT"],
-                ),
-            )
-            if save_image_from_response(response, output_path):
-                print(f"  [SAVED] {output_path.relative_to(PROJECT_ROOT)}")
-                return True
-            else:
-                print(f"  [RETRY {attempt}/{retries}] No image in response for {output_path.name}")
-        except Exception as exc:
-            print(f"  [RETRY {attempt}/{retries}] Error: {exc}")
+    result = request_image(prompt, output_path.name, retries, style=style, reference=reference,
+                           validate=validate)
+    if result is None:
+        print(f"  [FAILED] Could not generate: {output_path.name}")
+        return False
+
+    # PNG payloads are written as returned; anything else is re-encoded
+    result.save(output_path)
+    print(f"  [SAVED] {output_path.relative_to(PROJECT_ROOT)}")
+    return True
 
-        if attempt < retries:
-            delay = RETRY_DELAY_BASE * (2 ** (attempt - 1))
-            print(f"  Waiting {delay}s before retry...")
-            time.sleep(delay)
 
-    print(f"  [FAILED] Could not generate: {output_path.name}")
-    return False
+def generate_image_text(prompt: str, output_path: Path, retries=MAX_RETRIES, style=None, validate=None):
+    """Generate an image from a text prompt and save it."""
+    return _generate_and_save(prompt, output_path, retries, style=style, validate=validate)
+
+
+def generate_image_with_reference(reference_image: Image.Image, prompt: str, output_path: Path,
+                                  retries=MAX_RETRIES, style=None):
+    """Generate an image using a reference image (image-to-image) and save it."""
+    return _generate_and_save(prompt, output_path, retries, style=style, reference=reference_image)
 
 
 # ---------------------------------------------------------------------------
 # A. Character Costume Conversion (Image-to-Image)
 # ---------------------------------------------------------------------------
 
+# Shared opening of every costume conversion prompt
+CHARACTER_STYLE = StylePreamble(
+    "character-costume",
+    prefix=(
+        "Keep the character's face, hairstyle, and body exactly the same. "
+        "Change only the clothing to simple fantasy RPG style: "
+    ),
+)
+
 CHARACTER_TASKS = [
-    # (input_filename, output_filename, output_dir, prompt)
+    # (input_filename, output_filename, output_dir, costume description)
     (
         "Mia_SD.jpg",
         "mia_fantasy_sd.png",
         FANTASY_DIR,
         (
-            "Keep the character's face, hairstyle, and body exactly the same. "
-            "Change only the clothing to simple fantasy RPG style: leather armor, "
+            "leather armor, "
             "shoulder pads, belt with dagger, knee-high boots, greatsword. "
             "Style: chibi, super deformed, 2.5 head ratio, cute, clean simple design. "
             "White background. Full body front view."
@@ -223,8 +286,7 @@ CHARACTER_TASKS = [
         "haru_fantasy_sd.png",
         FANTASY_DIR,
         (
-            "Keep the character's face, hairstyle, and body exactly the same. "
-            "Change only the clothing to simple fantasy RPG style: simple robe, "
+            "simple robe, "
             "hooded short cloak, wooden staff with gem, short boots, belt pouch. "
             "Style: chibi, super deformed, 2.5 head ratio, cute, clean simple design. "
             "White background. Full body front view."
@@ -235,8 +297,7 @@ CHARACTER_TASKS = [
         "chara_mia.png",
         UI_DIR,
         (
-            "Keep the character's face, hairstyle, and body exactly the same. "
-            "Change only the clothing to simple fantasy RPG style: leather armor, "
+            "leather armor, "
             "shoulder pads, belt with dagger, knee-high boots, greatsword. "
             "Style: cute, clean simple design, full body front view. "
             "White background."
@@ -247,8 +308,7 @@ CHARACTER_TASKS = [
         "chara_haru.png",
         UI_DIR,
         (
-            "Keep the character's face, hairstyle, and body exactly the same. "
-            "Change only the clothing to simple fantasy RPG style: simple robe, "
+            "simple robe, "
             "hooded short cloak, wooden staff with gem, short boots, belt pouch. "
             "Style: cute, clean simple design, full body front view. "
             "White background."
@@ -266,7 +326,7 @@ def generate_characters():
     success = 0
     total = len(CHARACTER_TASKS)
 
-    for i, (input_file, output_file, output_dir, prompt) in enumerate(CHARACTER_TASKS, 1):
+    for i, (input_file, output_file, output_dir, description) in enumerate(CHARACTER_TASKS, 1):
         print(f"\n[{i}/{total}] {input_file} -> {output_file}")
         ref_img = load_reference_image(input_file)
         if ref_img is None:
@@ -274,12 +334,9 @@ def generate_characters():
             continue
 
         output_path = output_dir / output_file
-        if generate_image_with_reference(ref_img, prompt, output_path):
+        if generate_image_with_reference(ref_img, description, output_path, style=CHARACTER_STYLE):
             success += 1
 
-        if i < total:
-            time.sleep(REQUEST_DELAY)
-
     print(f"\n  Characters done: {success}/{total}")
     return success
 
@@ -416,9 +473,6 @@ def generate_enemies():
         if generate_image_text(prompt, output_path):
             success += 1
 
-        if i < total:
-            time.sleep(REQUEST_DELAY)
-
     print(f"\n  Enemies/NPCs done: {success}/{total}")
     return success
 
@@ -433,125 +487,244 @@ ICON_SUFFIX = (
     ", dark background, clean edges, 64x64, vibrant colors, "
     "no text, centered composition, fantasy RPG style"
 )
+SKILL_ICON_STYLE = StylePreamble("skill-icon", ICON_PREFIX, ICON_SUFFIX)
 
-# All 56 skill icons grouped by class/tree
-SKILL_ICON_TASKS = [
+# All 56 skill icons grouped by class/tree (grid mode batches within a tree)
+SKILL_ICON_TREES = {
     # ---------------------------------------------------------------
     # Warrior Base (8)
     # ---------------------------------------------------------------
-    ("icon_impact_punch.png", "fist impact with golden glowing energy, heavy punch"),
-    ("icon_heavy_slash.png", "heavy sword downward slash, powerful strike, orange energy trail"),
-    ("icon_rising_slash.png", "upward sword slash, rising arc, white energy trail"),
-    ("icon_tumble.png", "dodge roll motion, evasive tumble, speed lines"),
-    ("icon_aerial_evasion_w.png", "aerial recovery with glowing wings, mid-air dodge"),
-    ("icon_dash.png", "speed dash with wind trail, forward burst movement"),
-    ("icon_physical_mastery.png", "muscle power with red aura, physical strength symbol"),
-    ("icon_mental_mastery.png", "mental energy with blue aura, mind power symbol"),
+    "Warrior Base": [
+        ("icon_impact_punch.png", "fist impact with golden glowing energy, heavy punch"),
+        ("icon_heavy_slash.png", "heavy sword downward slash, powerful strike, orange energy trail"),
+        ("icon_rising_slash.png", "upward sword slash, rising arc, white energy trail"),
+        ("icon_tumble.png", "dodge roll motion, evasive tumble, speed lines"),
+        ("icon_aerial_evasion_w.png", "aerial recovery with glowing wings, mid-air dodge"),
+        ("icon_dash.png", "speed dash with wind trail, forward burst movement"),
+        ("icon_physical_mastery.png", "muscle power with red aura, physical strength symbol"),
+        ("icon_mental_mastery.png", "mental energy with blue aura, mind power symbol"),
+    ],
 
     # ---------------------------------------------------------------
     # Sword Master - Blade Column (5)
     # ---------------------------------------------------------------
-    ("icon_dash_slash.png", "forward rushing three-hit sword slash, speed dash attack, blue energy"),
-    ("icon_triple_slash.png", "triple consecutive sword slashes, three blade trails"),
-    ("icon_line_drive.png", "piercing thrust attack, sword penetrating forward, green energy"),
-    ("icon_hacking_stance.png", "rapid continuous overhead sword strikes, eight-hit combo"),
-    ("icon_infinity_edge.png", "ultimate glowing sword, 20-hit super speed slash, purple legendary aura"),
+    "Sword Master - Blade Column": [
+        ("icon_dash_slash.png", "forward rushing three-hit sword slash, speed dash attack, blue energy"),
+        ("icon_triple_slash.png", "triple consecutive sword slashes, three blade trails"),
+        ("icon_line_drive.png", "piercing thrust attack, sword penetrating forward, green energy"),
+        ("icon_hacking_stance.png", "rapid continuous overhead sword strikes, eight-hit combo"),
+        ("icon_infinity_edge.png", "ultimate glowing sword, 20-hit super speed slash, purple legendary aura"),
+    ],
 
     # ---------------------------------------------------------------
     # Sword Master - Wave Column (5)
     # ---------------------------------------------------------------
-    ("icon_moonlight_splitter.png", "crescent moon energy blade projectile, silver moonlight"),
-    ("icon_cyclone_slash.png", "spinning sword slash, surrounding cyclone, wind energy"),
-    ("icon_halfmoon_slash.png", "large half-moon energy wave, massive crescent blade"),
-    ("icon_crescent_cleave.png", "five consecutive shockwave slashes, crescents flying forward"),
-    ("icon_great_wave.png", "ultimate sword energy explosion, omnidirectional blade aura, golden legendary"),
+    "Sword Master - Wave Column": [
+        ("icon_moonlight_splitter.png", "crescent moon energy blade projectile, silver moonlight"),
+        ("icon_cyclone_slash.png", "spinning sword slash, surrounding cyclone, wind energy"),
+        ("icon_halfmoon_slash.png", "large half-moon energy wave, massive crescent blade"),
+        ("icon_crescent_cleave.png", "five consecutive shockwave slashes, crescents flying forward"),
+        ("icon_great_wave.png", "ultimate sword energy explosion, omnidirectional blade aura, golden legendary"),
+    ],
 
     # ---------------------------------------------------------------
     # Mercenary - Devastation Column (5)
     # ---------------------------------------------------------------
-    ("icon_stomp.png", "foot stomping ground, shockwave rings, earth impact"),
-    ("icon_whirlwind.png", "spinning axe whirlwind attack, four-hit rotation"),
-    ("icon_circle_swing.png", "massive circular swing, heavy weapon full rotation"),
-    ("icon_demolition_fist.png", "ground pound with fist, earth shattering upward debris"),
-    ("icon_maelstrom_howl.png", "ultimate storm vortex area, raging purple tempest, legendary aura"),
+    "Mercenary - Devastation Column": [
+        ("icon_stomp.png", "foot stomping ground, shockwave rings, earth impact"),
+        ("icon_whirlwind.png", "spinning axe whirlwind attack, four-hit rotation"),
+        ("icon_circle_swing.png", "massive circular swing, heavy weapon full rotation"),
+        ("icon_demolition_fist.png", "ground pound with fist, earth shattering upward debris"),
+        ("icon_maelstrom_howl.png", "ultimate storm vortex area, raging purple tempest, legendary aura"),
+    ],
 
     # ---------------------------------------------------------------
     # Mercenary - Warcry Column (5)
     # ---------------------------------------------------------------
-    ("icon_iron_skin.png", "iron shield defensive buff, metallic silver armor glow"),
-    ("icon_taunting_howl.png", "war cry taunt, red aggro shockwave, angry face"),
-    ("icon_battle_howl.png", "battle cry buff, orange attack power boost aura"),
-    ("icon_howling_charge.png", "charging forward with super armor glow, bull rush"),
-    ("icon_fortress.png", "ultimate invincible fortress, golden shield dome, legendary aura"),
+    "Mercenary - Warcry Column": [
+        ("icon_iron_skin.png", "iron shield defensive buff, metallic silver armor glow"),
+        ("icon_taunting_howl.png", "war cry taunt, red aggro shockwave, angry face"),
+        ("icon_battle_howl.png", "battle cry buff, orange attack power boost aura"),
+        ("icon_howling_charge.png", "charging forward with super armor glow, bull rush"),
+        ("icon_fortress.png", "ultimate invincible fortress, golden shield dome, legendary aura"),
+    ],
 
     # ---------------------------------------------------------------
     # Sorceress Base (8)
     # ---------------------------------------------------------------
-    ("icon_magic_missile.png", "homing magic missile, glowing blue arcane projectile"),
-    ("icon_void_blast.png", "void explosion, purple dark energy burst forward"),
-    ("icon_glacial_spike.png", "ice spike projectile, frozen crystal shard, blue frost"),
-    ("icon_teleport.png", "teleportation magic circle, instant blink, arcane symbols"),
-    ("icon_aerial_evasion_s.png", "aerial magic recovery, floating arcane wings"),
-    ("icon_poison_missile.png", "poison swamp puddle, toxic green bubbling area"),
-    ("icon_intelligence_mastery.png", "intelligence book with arcane runes, magic power symbol"),
-    ("icon_mind_conquer.png", "mind energy spiral, MP regeneration, cyan mana flow"),
+    "Sorceress Base": [
+        ("icon_magic_missile.png", "homing magic missile, glowing blue arcane projectile"),
+        ("icon_void_blast.png", "void explosion, purple dark energy burst forward"),
+        ("icon_glacial_spike.png", "ice spike projectile, frozen crystal shard, blue frost"),
+        ("icon_teleport.png", "teleportation magic circle, instant blink, arcane symbols"),
+        ("icon_aerial_evasion_s.png", "aerial magic recovery, floating arcane wings"),
+        ("icon_poison_missile.png", "poison swamp puddle, toxic green bubbling area"),
+        ("icon_intelligence_mastery.png", "intelligence book with arcane runes, magic power symbol"),
+        ("icon_mind_conquer.png", "mind energy spiral, MP regeneration, cyan mana flow"),
+    ],
 
     # ---------------------------------------------------------------
     # Elemental Lord - Flame Column (5)
     # ---------------------------------------------------------------
-    ("icon_flame_spark.png", "double fire spark projectiles, orange flame balls"),
-    ("icon_fireball.png", "large fireball with explosion aura, massive fire sphere"),
-    ("icon_inferno.png", "fire pillar erupting from ground, triple flame column"),
-    ("icon_flame_wall.png", "wall of fire, horizontal flame barrier, burning"),
-    ("icon_phoenix_storm.png", "ultimate phoenix rising, fire bird descending, red golden legendary aura"),
+    "Elemental Lord - Flame Column": [
+        ("icon_flame_spark.png", "double fire spark projectiles, orange flame balls"),
+        ("icon_fireball.png", "large fireball with explosion aura, massive fire sphere"),
+        ("icon_inferno.png", "fire pillar erupting from ground, triple flame column"),
+        ("icon_flame_wall.png", "wall of fire, horizontal flame barrier, burning"),
+        ("icon_phoenix_storm.png", "ultimate phoenix rising, fire bird descending, red golden legendary aura"),
+    ],
 
     # ---------------------------------------------------------------
     # Elemental Lord - Frost Column (5)
     # ---------------------------------------------------------------
-    ("icon_icy_shard.png", "scattering ice crystal shards, three frozen fragments"),
-    ("icon_freezing_field.png", "area freeze circle, frozen ground, ice crystals expanding"),
-    ("icon_frost_wind.png", "icy wind storm, four-hit blizzard gust, frost particles"),
-    ("icon_elemental_shield.png", "magic absorption shield, blue crystal barrier, protective"),
-    ("icon_blizzard_storm.png", "ultimate blizzard vortex, massive ice storm, blue legendary aura"),
+    "Elemental Lord - Frost Column": [
+        ("icon_icy_shard.png", "scattering ice crystal shards, three frozen fragments"),
+        ("icon_freezing_field.png", "area freeze circle, frozen ground, ice crystals expanding"),
+        ("icon_frost_wind.png", "icy wind storm, four-hit blizzard gust, frost particles"),
+        ("icon_elemental_shield.png", "magic absorption shield, blue crystal barrier, protective"),
+        ("icon_blizzard_storm.png", "ultimate blizzard vortex, massive ice storm, blue legendary aura"),
+    ],
 
     # ---------------------------------------------------------------
     # Force User - Gravity Column (5)
     # ---------------------------------------------------------------
-    ("icon_gravity_ball.png", "dark gravity sphere, pulling force, purple distortion"),
-    ("icon_summon_black_hole.png", "black hole vortex, dark void suction, space warp"),
-    ("icon_nine_tail_laser.png", "nine homing laser beams, purple tracking rays"),
-    ("icon_gravity_crush.png", "gravity compression crushing force, dark implosion"),
-    ("icon_singularity.png", "ultimate singularity black hole, cosmic destruction, purple legendary aura"),
+    "Force User - Gravity Column": [
+        ("icon_gravity_ball.png", "dark gravity sphere, pulling force, purple distortion"),
+        ("icon_summon_black_hole.png", "black hole vortex, dark void suction, space warp"),
+        ("icon_nine_tail_laser.png", "nine homing laser beams, purple tracking rays"),
+        ("icon_gravity_crush.png", "gravity compression crushing force, dark implosion"),
+        ("icon_singularity.png", "ultimate singularity black hole, cosmic destruction, purple legendary aura"),
+    ],
 
     # ---------------------------------------------------------------
     # Force User - Chrono Column (5)
     # ---------------------------------------------------------------
-    ("icon_slow_area.png", "time slow zone, clock gears, distorted hourglass field"),
-    ("icon_time_acceleration.png", "time speed up buff, fast forward clock, golden time aura"),
-    ("icon_time_stop.png", "time freeze, shattered clock face, frozen moment"),
-    ("icon_linear_ray.png", "straight penetrating energy beam, white laser line"),
-    ("icon_time_break.png", "ultimate time shatter, broken clock explosion, golden legendary aura"),
-]
+    "Force User - Chrono Column": [
+        ("icon_slow_area.png", "time slow zone, clock gears, distorted hourglass field"),
+        ("icon_time_acceleration.png", "time speed up buff, fast forward clock, golden time aura"),
+        ("icon_time_stop.png", "time freeze, shattered clock face, frozen moment"),
+        ("icon_linear_ray.png", "straight penetrating energy beam, white laser line"),
+        ("icon_time_break.png", "ultimate time shatter, broken clock explosion, golden legendary aura"),
+    ],
+}
+
+SKILL_ICON_TASKS = [task for tasks in SKILL_ICON_TREES.values() for task in tasks]
+
+
+# Grid mode: several icons from the same tree in one call, sliced locally
+ICON_GRID_SIZES = (2, 3)
+ICON_GRID_PREFIX = (
+    "{n}x{n} grid of {count} separate game {kind} icons from the same set on one square image, "
+    "each icon small and centered in its own equal square cell with a wide empty dark margin, "
+    "cells left-to-right, top-to-bottom: "
+)
+ICON_GRID_SUFFIX = (
+    ", dark background, clean edges, vibrant colors, consistent style across all cells, "
+    "no text, no labels, no grid lines, no borders between cells, fantasy RPG style"
+)
+ICON_GRID_STYLE = StylePreamble("icon-grid", suffix=ICON_GRID_SUFFIX)
+
+
+def build_icon_grid_prompt(tasks, kind: str, n: int) -> str:
+    """Prompt for an n x n grid holding the given (filename, description) tasks.
+
+    The shared ICON_GRID_SUFFIX is not included; it is sent as ICON_GRID_STYLE.
+    """
+    cells = [f"cell {i}: {description}" for i, (_, description) in enumerate(tasks, 1)]
+    cells += [f"cell {i}: empty dark background" for i in range(len(tasks) + 1, n * n + 1)]
+    # ICON_SUFFIX asks for "64x64" and "centered composition", which would
+    # describe the whole sheet here, so grids use their own suffix
+    return ICON_GRID_PREFIX.format(n=n, count=len(tasks), kind=kind) + "; ".join(cells)
+
+
+def generate_icon_grid(tasks, style: StylePreamble, kind: str, grid: int):
+    """
+    Generate up to grid*grid icons in one call and slice them into files.
+
+    A sheet that is not square, or whose cells are smaller than the largest
+    icon variant, is rejected; a nearly square one is resized to square
+    before slicing. Cells that fail check_icon_cell() (and the whole batch,
+    if the call or the sheet fails) fall back to one single-icon call each.
+
+    Returns:
+        Number of icons saved.
+    """
+    n = next(size for size in range(1, grid + 1) if size * size >= len(tasks))
+    prompt = build_icon_grid_prompt(tasks, kind, n)
+    print(f"  Requesting {n}x{n} grid: {', '.join(name for name, _ in tasks)}")
+
+    rejected = []
+    result = request_image(prompt, f"{n}x{n} icon grid", style=ICON_GRID_STYLE)
+    sheet = result.image.convert("RGB") if result is not None else None
+    if sheet is not None:
+        ok, reason = check_icon_grid(sheet, n, max(ICON_SIZES))
+        if not ok:
+            print(f"  [REJECT] {n}x{n} icon grid: {reason}")
+            sheet = None
+    if sheet is None:
+        rejected = list(tasks)
+    else:
+        side = min(sheet.size)
+        if sheet.width != sheet.height:
+            sheet = sheet.resize((side, side), Image.LANCZOS)
+        pitch = side / n
+        for index, (output_file, description) in enumerate(tasks):
+            row, col = divmod(index, n)
+            box = (round(col * pitch), round(row * pitch),
+                   round((col + 1) * pitch), round((row + 1) * pitch))
+            icon = sheet.crop(box)
+            ok, reason = check_icon_cell(icon)
+            if ok:
+                save_image_atomic(icon, UI_DIR / output_file)
+                print(f"  [SAVED] {(UI_DIR / output_file).relative_to(PROJECT_ROOT)} (cell {index + 1})")
+            else:
+                print(f"  [REJECT] {output_file}: {reason}")
+                rejected.append((output_file, description))
 
+    success = len(tasks) - len(rejected)
+    for output_file, description in rejected:
+        print(f"  Falling back to a single call for {output_file}")
+        if generate_image_text(description, UI_DIR / output_file, style=style, validate=check_icon):
+            success += 1
+    return success
 
-def generate_skill_icons():
+
+def generate_icon_set(groups, style: StylePreamble, kind: str, grid=None):
+    """Generate icons one per call, or batched per group in grid mode."""
+    tasks = [task for group in groups for task in group]
+    total = len(tasks)
+    success = 0
+
+    if not grid:
+        for i, (output_file, description) in enumerate(tasks, 1):
+            print(f"\n[{i}/{total}] {output_file}")
+            if generate_image_text(description, UI_DIR / output_file, style=style, validate=check_icon):
+                success += 1
+        return success
+
+    for group in groups:
+        pending = []
+        for output_file, description in group:
+            if (UI_DIR / output_file).exists():
+                print(f"  [SKIP] Already exists: {output_file}")
+                success += 1
+            else:
+                pending.append((output_file, description))
+        for start in range(0, len(pending), grid * grid):
+            batch = pending[start:start + grid * grid]
+            print(f"\n[{success + 1}-{success + len(batch)}/{total}]")
+            success += generate_icon_grid(batch, style, kind, grid)
+    return success
+
+
+def generate_skill_icons(grid=None):
     """Category C: Generate all 56 skill icons."""
     print("\n" + "=" * 60)
-    print("  C. Skill Icons (56 icons)")
+    print("  C. Skill Icons (56 icons)" + (f" - {grid}x{grid} grid mode" if grid else ""))
     print("=" * 60)
 
-    success = 0
     total = len(SKILL_ICON_TASKS)
-
-    for i, (output_file, description) in enumerate(SKILL_ICON_TASKS, 1):
-        print(f"\n[{i}/{total}] {output_file}")
-        prompt = ICON_PREFIX + description + ICON_SUFFIX
-        output_path = UI_DIR / output_file
-        if generate_image_text(prompt, output_path):
-            success += 1
-
-        if i < total:
-            time.sleep(REQUEST_DELAY)
+    success = generate_icon_set(list(SKILL_ICON_TREES.values()), SKILL_ICON_STYLE, "skill", grid)
 
     print(f"\n  Skill icons done: {success}/{total}")
     return success
@@ -561,24 +734,24 @@ def generate_skill_icons():
 # D. UI Elements
 # ---------------------------------------------------------------------------
 
+# Potion icons share the skill icon suffix
+ITEM_ICON_PREFIX = "game item icon, "
+ITEM_ICON_STYLE = StylePreamble("item-icon", ITEM_ICON_PREFIX, ICON_SUFFIX)
+
 POTION_ICON_TASKS = [
-    # (output_filename, prompt)
+    # (output_filename, description)
     (
         "icon_potion_hp.png",
         (
-            "game item icon, red healing potion in glass bottle, heart-shaped label, "
-            "glowing warm red liquid, small bubbles, cork stopper, "
-            "dark background, clean edges, 64x64, vibrant colors, "
-            "no text, centered composition, fantasy RPG style"
+            "red healing potion in glass bottle, heart-shaped label, "
+            "glowing warm red liquid, small bubbles, cork stopper"
         ),
     ),
     (
         "icon_potion_mp.png",
         (
-            "game item icon, blue mana potion in glass bottle, star-shaped label, "
-            "glowing cyan blue liquid, small sparkles, cork stopper, "
-            "dark background, clean edges, 64x64, vibrant colors, "
-            "no text, centered composition, fantasy RPG style"
+            "blue mana potion in glass bottle, star-shaped label, "
+            "glowing cyan blue liquid, small sparkles, cork stopper"
         ),
     ),
 ]
@@ -688,23 +861,14 @@ UI_TASKS = [
 ]
 
 
-def generate_potions():
+def generate_potions(grid=None):
     """Category F: Generate potion icons."""
     print("\n" + "=" * 60)
-    print("  F. Potion Icons")
+    print("  F. Potion Icons" + (f" - {grid}x{grid} grid mode" if grid else ""))
     print("=" * 60)
 
-    success = 0
     total = len(POTION_ICON_TASKS)
-
-    for i, (output_file, prompt) in enumerate(POTION_ICON_TASKS, 1):
-        print(f"\n[{i}/{total}] {output_file}")
-        output_path = UI_DIR / output_file
-        if generate_image_text(prompt, output_path):
-            success += 1
-
-        if i < total:
-            time.sleep(REQUEST_DELAY)
+    success = generate_icon_set([POTION_ICON_TASKS], ITEM_ICON_STYLE, "item", grid)
 
     print(f"\n  Potion icons done: {success}/{total}")
     return success
@@ -725,9 +889,6 @@ def generate_ui():
         if generate_image_text(prompt, output_path):
             success += 1
 
-        if i < total:
-            time.sleep(REQUEST_DELAY)
-
     print(f"\n  UI elements done: {success}/{total}")
     return success
 
@@ -823,9 +984,6 @@ def generate_backgrounds():
         if generate_image_text(prompt, output_path):
             success += 1
 
-        if i < total:
-            time.sleep(REQUEST_DELAY)
-
     print(f"\n  Backgrounds/Textures done: {success}/{total}")
     return success
 
@@ -843,6 +1001,7 @@ EFFECT_SHEET_SUFFIX = (
     "game VFX, stylized, vibrant glowing colors, no text, no labels, "
     "no borders between frames, animation sequence"
 )
+EFFECT_SHEET_STYLE = StylePreamble("effect-sheet", suffix=EFFECT_SHEET_SUFFIX)
 
 EFFECT_SHEET_TASKS = [
     # (output_filename, description)
@@ -922,14 +1081,15 @@ def generate_effect_sheets():
 
     for i, (output_file, description) in enumerate(EFFECT_SHEET_TASKS, 1):
         print(f"\n[{i}/{total}] {output_file}")
-        prompt = description + EFFECT_SHEET_SUFFIX
         output_path = EFFECTS_DIR / output_file
-        if generate_image_text(prompt, output_path):
+        if generate_image_text(description, output_path, style=EFFECT_SHEET_STYLE,
+                               validate=check_sprite_sheet):
+            premultiply_sheet(output_path)
             success += 1
 
-        if i < total:
-            time.sleep(REQUEST_DELAY)
-
+    if success:
+        pack_all_sheets()
+        build_all_motion()
     print(f"\n  Effect sprite sheets done: {success}/{total}")
     return success
 
@@ -950,6 +1110,13 @@ def main():
     parser.add_argument("--backgrounds", action="store_true", help="E. Backgrounds & textures")
     parser.add_argument("--potions", action="store_true", help="F. Potion icons")
     parser.add_argument("--effects", action="store_true", help="G. Effect sprite sheets")
+    parser.add_argument("--icon-grid", type=int, choices=ICON_GRID_SIZES, metavar="N",
+                        help="Batch icons (--icons/--potions) as an NxN grid per call (2 or 3)")
+    parser.add_argument("--style-instruction", action="store_true",
+                        help="Send shared style preambles as system instructions "
+                             "(default: inline in each prompt)")
+    parser.add_argument("--no-validate", action="store_true",
+                        help="Accept generated images without running output checks")
     args = parser.parse_args()
 
     # If no flags provided, show help
@@ -959,8 +1126,10 @@ def main():
         sys.exit(0)
 
     # Initialize
+    global VALIDATE_OUTPUTS
+    VALIDATE_OUTPUTS = not args.no_validate
     ensure_dirs()
-    init_genai()
+    init_genai(style_instruction=args.style_instruction)
 
     run_all = args.all
     results = {}
@@ -981,7 +1150,7 @@ def main():
         total_success += count
 
     if run_all or args.icons:
-        count = generate_skill_icons()
+        count = generate_skill_icons(grid=args.icon_grid)
         results["Skill Icons"] = (count, len(SKILL_ICON_TASKS))
         total_assets += len(SKILL_ICON_TASKS)
         total_success += count
@@ -999,17 +1168,32 @@ def main():
         total_success += count
 
     if run_all or args.potions:
-        count = generate_potions()
+        count = generate_potions(grid=args.icon_grid)
         results["Potions"] = (count, len(POTION_ICON_TASKS))
         total_assets += len(POTION_ICON_TASKS)
         total_success += count
 
+    # Post-process: display-sized icon variants + manifest, then the skill atlas
+    if run_all or args.icons or args.potions:
+        print("\n" + "=" * 60)
+        print("  Icon Variants (64/128/256 px) + Skill Atlas")
+        print("=" * 60)
+        print_icon_variant_summary(build_icon_variants())
+        build_icon_atlas()
+
     if run_all or args.effects:
         count = generate_effect_sheets()
         results["Effect Sheets"] = (count, len(EFFECT_SHEET_TASKS))
         total_assets += len(EFFECT_SHEET_TASKS)
         total_success += count
 
+    # Post-process: low/medium tiers of the new backgrounds and effects
+    if run_all or args.backgrounds or args.effects:
+        print("\n" + "=" * 60)
+        print("  Texture Tiers (1/2, 1/4)")
+        print("=" * 60)
+        build_tiers()
+
     # Summary
     print("\n" + "=" * 60)
     print("  GENERATION SUMMARY")
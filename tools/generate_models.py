@@ -23,7 +23,6 @@ Requires:
 import argparse
 import base64
 import json
-import os
 import sys
 import time
 from dataclasses import dataclass, field
@@ -34,6 +33,9 @@ from typing import Optional
 import requests
 from dotenv import load_dotenv
 
+from asset_io import write_stream_atomic
+from key_pool import KeyPool, KeyPoolExhausted, mask_key
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -548,14 +550,69 @@ class MeshyAPIError(Exception):
 
 
 class MeshyClient:
-    """Client for interacting with the Meshy API."""
+    """
+    Client for interacting with the Meshy API.
+
+    New tasks are created on the least-loaded key of the pool. Meshy tasks
+    belong to the account that created them, so status polls and refines
+    reuse the key recorded for that task ID.
+    """
 
-    def __init__(self, api_key: str):
-        self.api_key = api_key
+    def __init__(self, key_pool: KeyPool):
+        self.key_pool = key_pool
         self.session = requests.Session()
-        self.session.headers.update({
-            "Authorization": f"Bearer {api_key}",
-        })
+        self._task_keys: dict[str, str] = {}
+
+    @staticmethod
+    def _auth(api_key: str) -> dict:
+        return {"Authorization": f"Bearer {api_key}"}
+
+    def _create_task(self, url: str, payload: dict, context: str, owner_task_id: Optional[str] = None) -> str:
+        """
+        POST a task-creation request and remember which key owns the new task.
+
+        If the key is evicted (401/402/quota) the request moves on to the next
+        live key, unless it is bound to the key that owns ``owner_task_id``.
+        """
+        while True:
+            owner_key = self._task_keys.get(owner_task_id) if owner_task_id else None
+            if owner_key is not None:
+                api_key = owner_key
+            else:
+                try:
+                    api_key = self.key_pool.acquire()
+                except KeyPoolExhausted as e:
+                    raise MeshyAPIError(str(e))
+
+            try:
+                response = self.session.post(url, json=payload, headers=self._auth(api_key))
+                data = self._check_response(response, context)
+            except MeshyAPIError as e:
+                evicted = self.key_pool.report_failure(api_key, e.status_code, e.response_body)
+                if evicted and owner_key is None and self.key_pool:
+                    print(f"  Retrying {context} on another API key...")
+                    continue
+                raise
+            finally:
+                if owner_key is None:
+                    self.key_pool.release(api_key)
+
+            task_id = data.get("result")
+            if not task_id:
+                raise MeshyAPIError(f"No task ID in {context} response: {data}")
+            self._task_keys[task_id] = api_key
+            return task_id
+
+    def _get_task(self, url: str, task_id: str, context: str) -> dict:
+        """GET a task's status using the key that created it (any live key if unknown)."""
+        api_key = self._task_keys.get(task_id)
+        if api_key is None:
+            # Raises KeyPoolExhausted once every key has been evicted
+            with self.key_pool.lease() as api_key:
+                response = self.session.get(url, headers=self._auth(api_key))
+        else:
+            response = self.session.get(url, headers=self._auth(api_key))
+        return self._check_response(response, context)
 
     def _check_response(self, response: requests.Response, context: str) -> dict:
         """Check API response and raise on error."""
@@ -594,17 +651,12 @@ class MeshyClient:
             "should_remesh": True,
         }
 
-        response = self.session.post(IMAGE_TO_3D_URL, json=payload)
-        data = self._check_response(response, "Image-to-3D creation")
-        task_id = data.get("result")
-        if not task_id:
-            raise MeshyAPIError(f"No task ID in Image-to-3D response: {data}")
-        return task_id
+        return self._create_task(IMAGE_TO_3D_URL, payload, "Image-to-3D creation")
 
     def get_image_to_3d_status(self, task_id: str) -> dict:
         """Get status of an Image-to-3D task."""
-        response = self.session.get(f"{IMAGE_TO_3D_URL}/{task_id}")
-        return self._check_response(response, f"Image-to-3D status check ({task_id})")
+        return self._get_task(f"{IMAGE_TO_3D_URL}/{task_id}", task_id,
+                              f"Image-to-3D status check ({task_id})")
 
     # ----- Text-to-3D -----
 
@@ -640,17 +692,12 @@ class MeshyClient:
             "should_remesh": True,
         }
 
-        response = self.session.post(TEXT_TO_3D_URL, json=payload)
-        data = self._check_response(response, "Text-to-3D creation")
-        task_id = data.get("result")
-        if not task_id:
-            raise MeshyAPIError(f"No task ID in Text-to-3D response: {data}")
-        return task_id
+        return self._create_task(TEXT_TO_3D_URL, payload, "Text-to-3D creation")
 
     def get_text_to_3d_status(self, task_id: str) -> dict:
         """Get status of a Text-to-3D task."""
-        response = self.session.get(f"{TEXT_TO_3D_URL}/{task_id}")
-        return self._check_response(response, f"Text-to-3D status check ({task_id})")
+        return self._get_task(f"{TEXT_TO_3D_URL}/{task_id}", task_id,
+                              f"Text-to-3D status check ({task_id})")
 
     # ----- Refine -----
 
@@ -671,12 +718,9 @@ class MeshyClient:
             "texture_richness": texture_richness,
         }
 
-        response = self.session.post(TEXT_TO_3D_URL, json=payload)
-        data = self._check_response(response, "Text-to-3D refine")
-        task_id = data.get("result")
-        if not task_id:
-            raise MeshyAPIError(f"No task ID in refine response: {data}")
-        return task_id
+        # The preview belongs to the account that created it
+        return self._create_task(TEXT_TO_3D_URL, payload, "Text-to-3D refine",
+                                 owner_task_id=preview_task_id)
 
     # ----- Rigging -----
 
@@ -694,17 +738,12 @@ class MeshyClient:
             "model_url": model_url,
         }
 
-        response = self.session.post(RIGGING_URL, json=payload)
-        data = self._check_response(response, "Rigging creation")
-        task_id = data.get("result")
-        if not task_id:
-            raise MeshyAPIError(f"No task ID in rigging response: {data}")
-        return task_id
+        return self._create_task(RIGGING_URL, payload, "Rigging creation")
 
     def get_rigging_status(self, task_id: str) -> dict:
         """Get status of a rigging task."""
-        response = self.session.get(f"{RIGGING_URL}/{task_id}")
-        return self._check_response(response, f"Rigging status check ({task_id})")
+        return self._get_task(f"{RIGGING_URL}/{task_id}", task_id,
+                              f"Rigging status check ({task_id})")
 
     # ----- Polling helper -----
 
@@ -767,11 +806,7 @@ class MeshyClient:
                 f"GLB download failed: HTTP {response.status_code}",
                 status_code=response.status_code,
             )
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        file_size = output_path.stat().st_size
+        file_size = write_stream_atomic(output_path, response.iter_content(chunk_size=8192))
         print(f"  Downloaded: {output_path} ({file_size:,} bytes)")
 
 
@@ -1123,19 +1158,21 @@ def main() -> int:
             print(f"\nWARNING: .env file not found at {env_path}")
             print("Falling back to environment variables.")
 
-        api_key = os.environ.get("MESHY_API_KEY")
-        if not api_key:
+        key_pool = KeyPool.from_env("MESHY_API_KEY")
+        if not key_pool:
             print("ERROR: MESHY_API_KEY not found in .env or environment variables.")
-            print("Please set MESHY_API_KEY in your .env file:")
+            print("Please set MESHY_API_KEY (or a comma-separated MESHY_API_KEYS) in your .env file:")
             print(f"  echo 'MESHY_API_KEY=msy_your_key_here' >> {env_path}")
             return 1
 
         # Validate API key format (basic check)
-        if not api_key.startswith("msy_"):
-            print("WARNING: MESHY_API_KEY does not start with 'msy_'. "
-                  "This may not be a valid Meshy API key.")
+        for api_key in key_pool.keys():
+            if not api_key.startswith("msy_"):
+                print(f"WARNING: Meshy key {mask_key(api_key)} does not start with 'msy_'. "
+                      "This may not be a valid Meshy API key.")
+        print(key_pool.describe())
 
-        client = MeshyClient(api_key)
+        client = MeshyClient(key_pool)
     else:
         client = None  # type: ignore[assignment]
 
@@ -12,20 +12,24 @@ Usage:
     python generate_sounds.py --category combat    # By category
     python generate_sounds.py --category ui skill  # Multiple categories
     python generate_sounds.py --dry-run        # Print what would be done
+    python generate_sounds.py --no-validate    # Save without output checks
 
 Requires:
-    pip install requests python-dotenv
+    pip install requests python-dotenv numpy
+    pip install miniaudio   # optional: enables the clipping/silence checks
 """
 
 import argparse
-import os
 import sys
-import time
 from pathlib import Path
 
 import requests
 from dotenv import load_dotenv
 
+from asset_io import write_bytes_atomic
+from key_pool import KeyPool, KeyPoolExhausted
+from output_checks import check_audio
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -33,12 +37,14 @@ from dotenv import load_dotenv
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 load_dotenv(PROJECT_ROOT / '.env')
 
-API_KEY = os.environ.get('ELEVENLABS_API_KEY', '')
 API_URL = 'https://api.elevenlabs.io/v1/sound-generation'
 OUTPUT_DIR = PROJECT_ROOT / 'assets' / 'audio' / 'sfx'
 
 # Rate limiting
-REQUEST_DELAY = 1.5  # seconds between requests
+REQUEST_DELAY = 1.5  # seconds between requests on the same API key
+VALIDATION_RETRIES = 2  # regenerations allowed after a rejected output
+
+KEY_POOL = KeyPool.from_env('ELEVENLABS_API_KEY', min_interval=REQUEST_DELAY)
 
 # ---------------------------------------------------------------------------
 # Sound Effect Definitions
@@ -486,7 +492,7 @@ SOUND_EFFECTS = [
 # API Functions
 # ---------------------------------------------------------------------------
 
-def generate_sound(sfx_def: dict, dry_run: bool = False) -> bool:
+def generate_sound(sfx_def: dict, dry_run: bool = False, validate: bool = True) -> bool:
     """Generate a single sound effect using ElevenLabs Sound Effects API."""
     output_path = OUTPUT_DIR / f"{sfx_def['id']}.mp3"
 
@@ -500,39 +506,65 @@ def generate_sound(sfx_def: dict, dry_run: bool = False) -> bool:
         print(f"        Duration: {sfx_def['duration_seconds']}s")
         return True
 
-    headers = {
-        'xi-api-key': API_KEY,
-        'Content-Type': 'application/json',
-    }
-
     payload = {
         'text': sfx_def['text'],
         'duration_seconds': sfx_def['duration_seconds'],
         'prompt_influence': sfx_def.get('prompt_influence', 0.3),
     }
 
-    try:
-        print(f"  Generating ({sfx_def['duration_seconds']}s)...")
-        resp = requests.post(API_URL, json=payload, headers=headers, timeout=60)
-        resp.raise_for_status()
+    # Try each live key at most once; a key that 401s or runs out of quota is
+    # evicted and the request moves on to the next one. Outputs that fail
+    # check_audio are regenerated immediately, up to VALIDATION_RETRIES times.
+    rejected = 0
+    while True:
+        try:
+            api_key = KEY_POOL.acquire()
+        except KeyPoolExhausted as e:
+            print(f"  [ERROR] {e}")
+            return False
 
-        output_path.write_bytes(resp.content)
-        size_kb = len(resp.content) / 1024
-        print(f"  [OK] Saved: {output_path.name} ({size_kb:.1f} KB)")
-        return True
+        headers = {
+            'xi-api-key': api_key,
+            'Content-Type': 'application/json',
+        }
 
-    except requests.exceptions.HTTPError as e:
-        error_body = ''
         try:
-            error_body = e.response.text[:200]
-        except Exception:
-            pass
-        print(f"  [ERROR] HTTP {e.response.status_code}: {error_body}")
-        return False
-
-    except requests.exceptions.RequestException as e:
-        print(f"  [ERROR] Request failed: {e}")
-        return False
+            print(f"  Generating ({sfx_def['duration_seconds']}s)...")
+            resp = requests.post(API_URL, json=payload, headers=headers, timeout=60)
+            resp.raise_for_status()
+
+            if validate:
+                ok, reason = check_audio(resp.content, sfx_def['duration_seconds'])
+                if not ok:
+                    print(f"  [REJECT] {reason}")
+                    if rejected < VALIDATION_RETRIES:
+                        rejected += 1
+                        print(f"  [RETRY {rejected}/{VALIDATION_RETRIES}] Regenerating...")
+                        continue
+                    return False
+
+            write_bytes_atomic(output_path, resp.content)
+            size_kb = len(resp.content) / 1024
+            print(f"  [OK] Saved: {output_path.name} ({size_kb:.1f} KB)")
+            return True
+
+        except requests.exceptions.HTTPError as e:
+            error_body = ''
+            try:
+                error_body = e.response.text[:200]
+            except Exception:
+                pass
+            print(f"  [ERROR] HTTP {e.response.status_code}: {error_body}")
+            if KEY_POOL.report_failure(api_key, e.response.status_code, error_body) and KEY_POOL:
+                continue
+            return False
+
+        except requests.exceptions.RequestException as e:
+            print(f"  [ERROR] Request failed: {e}")
+            return False
+
+        finally:
+            KEY_POOL.release(api_key)
 
 
 # ---------------------------------------------------------------------------
@@ -548,6 +580,8 @@ def main():
                         choices=['all', 'combat', 'skill', 'player', 'enemy', 'ui', 'environment', 'ambient'],
                         help='Categories to generate')
     parser.add_argument('--dry-run', action='store_true', help='Print what would be done')
+    parser.add_argument('--no-validate', action='store_true',
+                        help='Save sounds without duration/clipping/silence checks')
     args = parser.parse_args()
 
     # List mode
@@ -572,9 +606,9 @@ def main():
         print(f"\nTotal: {len(SOUND_EFFECTS)} sounds, {total_duration:.1f}s total duration")
         return
 
-    # Check API key
-    if not API_KEY:
-        print("ERROR: ELEVENLABS_API_KEY not set. Check .env file.")
+    # Check API keys
+    if not KEY_POOL:
+        print("ERROR: ELEVENLABS_API_KEY (or ELEVENLABS_API_KEYS) not set. Check .env file.")
         sys.exit(1)
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -595,6 +629,7 @@ def main():
     print(f"  Output: {OUTPUT_DIR}")
     print(f"  Sounds: {len(sounds)}")
     print(f"  Mode:   {'DRY RUN' if args.dry_run else 'GENERATE'}")
+    print(f"  Keys:   {KEY_POOL.describe()}")
     print("=" * 60)
 
     success = 0
@@ -604,7 +639,7 @@ def main():
     for i, sfx in enumerate(sounds):
         print(f"\n[{i+1}/{len(sounds)}] {sfx['id']} ({sfx['category']})")
 
-        result = generate_sound(sfx, dry_run=args.dry_run)
+        result = generate_sound(sfx, dry_run=args.dry_run, validate=not args.no_validate)
         if result:
             if (OUTPUT_DIR / f"{sfx['id']}.mp3").exists() and not args.dry_run:
                 success += 1
@@ -613,10 +648,6 @@ def main():
         else:
             failed += 1
 
-        # Rate limiting (skip for dry run and already-existing files)
-        if not args.dry_run and not (OUTPUT_DIR / f"{sfx['id']}.mp3").exists():
-            time.sleep(REQUEST_DELAY)
-
     print(f"\n{'=' * 60}")
     print(f"Complete!")
     print(f"  Generated: {success}")
@@ -3,14 +3,19 @@
 Dragon Nest Lite - ElevenLabs Voice Generation Script
 Generates NPC voices, player battle cries, and narration using ElevenLabs API.
 All generated audio is saved as MP3 to assets/audio/voice/
+Each line is checked for clipping and silence before it is saved (needs numpy;
+install miniaudio to enable the PCM checks).
 """
 
 import os
 import sys
-import time
 import requests
 from pathlib import Path
 
+from asset_io import write_bytes_atomic
+from key_pool import KeyPool, KeyPoolExhausted
+from output_checks import check_audio
+
 # Load .env
 def load_env():
     env_path = Path(__file__).parent.parent / '.env'
@@ -23,7 +28,9 @@ def load_env():
 
 load_env()
 
-API_KEY = os.environ.get('ELEVENLABS_API_KEY', '')
+REQUEST_DELAY = 0.5  # seconds between requests on the same API key
+VALIDATION_RETRIES = 2  # regenerations allowed after a rejected output
+KEY_POOL = KeyPool.from_env('ELEVENLABS_API_KEY', min_interval=REQUEST_DELAY)
 BASE_URL = 'https://api.elevenlabs.io/v1'
 OUTPUT_DIR = Path(__file__).parent.parent / 'assets' / 'audio' / 'voice'
 
@@ -156,8 +163,8 @@ VOICE_LINES = [
 
 def get_available_voices():
     """Fetch available voices from ElevenLabs and assign to voice types."""
-    headers = {'xi-api-key': API_KEY}
-    resp = requests.get(f'{BASE_URL}/voices', headers=headers)
+    with KEY_POOL.lease() as api_key:
+        resp = requests.get(f'{BASE_URL}/voices', headers={'xi-api-key': api_key})
     resp.raise_for_status()
     voices = resp.json().get('voices', [])
 
@@ -219,11 +226,6 @@ def generate_voice(voice_line, voice_id):
         print(f"  [SKIP] Already exists: {output_path.name}")
         return True
 
-    headers = {
-        'xi-api-key': API_KEY,
-        'Content-Type': 'application/json',
-    }
-
     payload = {
         'text': voice_line['text'],
         'model_id': voice_line.get('model', 'eleven_multilingual_v2'),
@@ -235,22 +237,50 @@ def generate_voice(voice_line, voice_id):
 
     url = f'{BASE_URL}/text-to-speech/{voice_id}'
 
-    try:
-        resp = requests.post(url, json=payload, headers=headers, timeout=30)
-        resp.raise_for_status()
-
-        output_path.write_bytes(resp.content)
-        print(f"  [OK] Generated: {output_path.name} ({len(resp.content)} bytes)")
-        return True
-
-    except requests.exceptions.RequestException as e:
-        print(f"  [ERROR] Failed to generate {voice_line['id']}: {e}")
-        return False
+    rejected = 0
+    while True:
+        try:
+            api_key = KEY_POOL.acquire()
+        except KeyPoolExhausted as e:
+            print(f"  [ERROR] {e}")
+            return False
+
+        headers = {
+            'xi-api-key': api_key,
+            'Content-Type': 'application/json',
+        }
+
+        try:
+            resp = requests.post(url, json=payload, headers=headers, timeout=30)
+            resp.raise_for_status()
+
+            ok, reason = check_audio(resp.content)
+            if not ok:
+                print(f"  [REJECT] {voice_line['id']}: {reason}")
+                if rejected < VALIDATION_RETRIES:
+                    rejected += 1
+                    print(f"  [RETRY {rejected}/{VALIDATION_RETRIES}] Regenerating...")
+                    continue
+                return False
+
+            write_bytes_atomic(output_path, resp.content)
+            print(f"  [OK] Generated: {output_path.name} ({len(resp.content)} bytes)")
+            return True
+
+        except requests.exceptions.RequestException as e:
+            print(f"  [ERROR] Failed to generate {voice_line['id']}: {e}")
+            response = getattr(e, 'response', None)
+            if response is not None and KEY_POOL.report_failure(api_key, response.status_code, response.text) and KEY_POOL:
+                continue
+            return False
+
+        finally:
+            KEY_POOL.release(api_key)
 
 
 def main():
-    if not API_KEY:
-        print("ERROR: ELEVENLABS_API_KEY not set. Check .env file.")
+    if not KEY_POOL:
+        print("ERROR: ELEVENLABS_API_KEY (or ELEVENLABS_API_KEYS) not set. Check .env file.")
         sys.exit(1)
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -261,6 +291,7 @@ def main():
     print("=" * 50)
     print("Dragon Nest Lite - Voice Generation")
     print("=" * 50)
+    print(KEY_POOL.describe())
 
     # Get available voices
     print("\nFetching available voices...")
@@ -307,9 +338,6 @@ def main():
         else:
             failed += 1
 
-        # Rate limiting
-        time.sleep(0.5)
-
     print(f"\n{'=' * 50}")
     print(f"Complete! Success: {success}, Failed: {failed}")
     print(f"Output directory: {OUTPUT_DIR}")
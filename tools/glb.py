@@ -0,0 +1,342 @@
+"""
+Dragon Nest Lite - GLB Helpers
+
+Shared by the model post-processing stages (optimize_models.py and the
+stages after it). pygltflib parses the JSON; the binary chunk is kept here
+as a plain bytes object so stages can read accessors as numpy arrays,
+append new data and repack the buffer without pygltflib merging buffers
+behind their back (EXT_meshopt_compression needs a separate fallback
+buffer, which pygltflib's own GLB writer would flatten).
+
+Typical use:
+
+    glb = Glb.load(path)
+    positions = glb.read_accessor(prim.attributes.POSITION)
+    prim.attributes.POSITION = glb.add_accessor(new_positions, ...)
+    glb.prune()          # drop accessors/views nothing references any more
+    glb.save(out_path)   # repacks the binary chunk, atomic write
+"""
+
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+import pygltflib
+
+from asset_io import write_bytes_atomic
+
+GLB_MAGIC = b"glTF"
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+COMPONENT_DTYPES = {
+    5120: np.int8,
+    5121: np.uint8,
+    5122: np.int16,
+    5123: np.uint16,
+    5125: np.uint32,
+    5126: np.float32,
+}
+DTYPE_COMPONENTS = {np.dtype(v): k for k, v in COMPONENT_DTYPES.items()}
+TYPE_SIZES = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4, "MAT2": 4, "MAT3": 9, "MAT4": 16}
+SIZE_TYPES = {1: "SCALAR", 2: "VEC2", 3: "VEC3", 4: "VEC4", 16: "MAT4"}
+
+
+def _align(value: int, step: int = 4) -> int:
+    return -(-value // step) * step
+
+
+def to_float(values: np.ndarray, normalized: bool) -> np.ndarray:
+    """Accessor values as float32, applying glTF normalized-integer decoding."""
+    if values.dtype == np.float32 or not normalized:
+        return values.astype(np.float32)
+    info = np.iinfo(values.dtype)
+    if info.min < 0:
+        return np.maximum(values.astype(np.float32) / info.max, -1.0)
+    return values.astype(np.float32) / info.max
+
+
+def _pack(rows: np.ndarray, target: int = None):
+    """(bytes, byteStride or None) for count x components ``rows``, padding vertex elements to 4 bytes."""
+    element = rows.dtype.itemsize * rows.shape[1]
+    if target != ARRAY_BUFFER or element % 4 == 0:
+        return np.ascontiguousarray(rows).tobytes(), None
+    stride = _align(element)
+    padded = np.zeros((len(rows), stride), dtype=np.uint8)
+    padded[:, :element] = np.ascontiguousarray(rows).view(np.uint8).reshape(len(rows), element)
+    return padded.tobytes(), stride
+
+
+class Glb:
+    """A glTF document plus its binary chunk."""
+
+    def __init__(self, gltf: pygltflib.GLTF2, blob: bytes):
+        self.gltf = gltf
+        self.blob = bytes(blob or b"")
+
+    @classmethod
+    def load(cls, path: Path) -> "Glb":
+        gltf = pygltflib.GLTF2().load(str(path))
+        return cls(gltf, gltf.binary_blob() or b"")
+
+    # -----------------------------------------------------------------------
+    # Reading
+    # -----------------------------------------------------------------------
+
+    def view_bytes(self, index: int) -> bytes:
+        view = self.gltf.bufferViews[index]
+        start = view.byteOffset or 0
+        return self.blob[start:start + view.byteLength]
+
+    def read_accessor(self, index: int) -> np.ndarray:
+        """Raw accessor values, shape (count,) for SCALAR else (count, components)."""
+        acc = self.gltf.accessors[index]
+        if acc.sparse is not None:
+            raise ValueError(f"accessor {index}: sparse accessors are not supported")
+        dtype = np.dtype(COMPONENT_DTYPES[acc.componentType])
+        components = TYPE_SIZES[acc.type]
+        if acc.bufferView is None:
+            out = np.zeros((acc.count, components), dtype=dtype)
+        else:
+            view = self.gltf.bufferViews[acc.bufferView]
+            element = dtype.itemsize * components
+            stride = view.byteStride or element
+            start = (view.byteOffset or 0) + (acc.byteOffset or 0)
+            raw = np.frombuffer(self.blob, dtype=np.uint8, count=stride * (acc.count - 1) + element, offset=start)
+            rows = np.lib.stride_tricks.as_strided(raw, shape=(acc.count, element), strides=(stride, 1))
+            out = np.ascontiguousarray(rows).view(dtype).reshape(acc.count, components)
+        return out[:, 0] if components == 1 else out
+
+    def read_floats(self, index: int) -> np.ndarray:
+        acc = self.gltf.accessors[index]
+        return to_float(self.read_accessor(index), bool(acc.normalized))
+
+    # -----------------------------------------------------------------------
+    # Writing
+    # -----------------------------------------------------------------------
+
+    def add_view(self, data: bytes, byte_stride: int = None, target: int = None) -> int:
+        """Append ``data`` to the binary chunk as a new bufferView; returns its index."""
+        offset = _align(len(self.blob))
+        self.blob = self.blob + b"\0" * (offset - len(self.blob)) + bytes(data)
+        self.gltf.bufferViews.append(pygltflib.BufferView(
+            buffer=0, byteOffset=offset, byteLength=len(data), byteStride=byte_stride, target=target))
+        return len(self.gltf.bufferViews) - 1
+
+    def add_accessor(self, values: np.ndarray, normalized: bool = False, target: int = None,
+                     acc_type: str = None, bounds: bool = False) -> int:
+        """
+        Append ``values`` (count x components, or count) as a new accessor
+        with a bufferView of its own.
+
+        Vertex attributes are padded per element to a multiple of 4 bytes as
+        glTF requires (e.g. VEC3 of int16 gets an 8-byte stride).
+        """
+        values = np.asarray(values)
+        rows = values.reshape(len(values), -1)
+        data, byte_stride = _pack(rows, target)
+        view = self.add_view(data, byte_stride=byte_stride, target=target)
+        accessor = pygltflib.Accessor(
+            bufferView=view,
+            componentType=DTYPE_COMPONENTS[rows.dtype],
+            count=len(rows),
+            type=acc_type or SIZE_TYPES[rows.shape[1]],
+            normalized=True if normalized else None,
+        )
+        if bounds:
+            accessor.min = rows.min(axis=0).tolist()
+            accessor.max = rows.max(axis=0).tolist()
+        self.gltf.accessors.append(accessor)
+        return len(self.gltf.accessors) - 1
+
+    def split_views(self) -> None:
+        """
+        Give every accessor a tightly packed bufferView of its own.
+
+        Meshy output packs several accessors into one view; per-view codecs
+        (EXT_meshopt_compression) need one element size per view.
+        """
+        targets = {}
+        for owner, name in self.accessor_refs():
+            targets[self._get(owner, name)] = ELEMENT_ARRAY_BUFFER if name == "indices" else (
+                ARRAY_BUFFER if isinstance(owner, pygltflib.Attributes) else None)
+        for index, acc in enumerate(self.gltf.accessors):
+            if acc.bufferView is None:
+                continue
+            values = self.read_accessor(index)
+            data, byte_stride = _pack(values.reshape(acc.count, -1), targets.get(index))
+            acc.bufferView = self.add_view(data, byte_stride=byte_stride, target=targets.get(index))
+            acc.byteOffset = None
+        self.prune()
+
+    # -----------------------------------------------------------------------
+    # Housekeeping
+    # -----------------------------------------------------------------------
+
+    def accessor_refs(self):
+        """Yield (owner, attribute name) for every accessor reference."""
+        g = self.gltf
+        for mesh in g.meshes:
+            for prim in mesh.primitives:
+                for name, value in vars(prim.attributes).items():
+                    if isinstance(value, int):
+                        yield prim.attributes, name
+                if prim.indices is not None:
+                    yield prim, "indices"
+                for target in prim.targets or []:
+                    for name in list(target):
+                        yield target, name
+        for skin in g.skins:
+            if skin.inverseBindMatrices is not None:
+                yield skin, "inverseBindMatrices"
+        for anim in g.animations:
+            for sampler in anim.samplers:
+                yield sampler, "input"
+                yield sampler, "output"
+
+    @staticmethod
+    def _get(owner, name):
+        return owner[name] if isinstance(owner, dict) else getattr(owner, name)
+
+    @staticmethod
+    def _set(owner, name, value):
+        if isinstance(owner, dict):
+            owner[name] = value
+        else:
+            setattr(owner, name, value)
+
+    def prune(self) -> None:
+        """Drop accessors, bufferViews, images, textures and samplers nobody references."""
+        g = self.gltf
+
+        refs = list(self.accessor_refs())
+        used = sorted({self._get(o, n) for o, n in refs})
+        remap = {old: new for new, old in enumerate(used)}
+        g.accessors = [g.accessors[i] for i in used]
+        for owner, name in refs:
+            self._set(owner, name, remap[self._get(owner, name)])
+
+        used_textures = sorted({info["index"] for info in self._texture_infos()})
+        tex_remap = {old: new for new, old in enumerate(used_textures)}
+        g.textures = [g.textures[i] for i in used_textures]
+        for info in self._texture_infos():
+            info["index"] = tex_remap[info["index"]]
+
+        used_images = sorted({t.source for t in g.textures if t.source is not None}
+                             | {ext["source"] for t in g.textures for ext in (t.extensions or {}).values()
+                                if isinstance(ext, dict) and "source" in ext})
+        img_remap = {old: new for new, old in enumerate(used_images)}
+        g.images = [g.images[i] for i in used_images]
+        used_samplers = sorted({t.sampler for t in g.textures if t.sampler is not None})
+        smp_remap = {old: new for new, old in enumerate(used_samplers)}
+        g.samplers = [g.samplers[i] for i in used_samplers]
+        for t in g.textures:
+            if t.source is not None:
+                t.source = img_remap[t.source]
+            if t.sampler is not None:
+                t.sampler = smp_remap[t.sampler]
+            for ext in (t.extensions or {}).values():
+                if isinstance(ext, dict) and "source" in ext:
+                    ext["source"] = img_remap[ext["source"]]
+
+        # Primitive extensions (KHR_draco_mesh_compression) hold a bufferView of their own
+        prim_exts = [ext for m in g.meshes for p in m.primitives for ext in (p.extensions or {}).values()
+                     if isinstance(ext, dict) and "bufferView" in ext]
+        views = sorted({a.bufferView for a in g.accessors if a.bufferView is not None}
+                       | {i.bufferView for i in g.images if i.bufferView is not None}
+                       | {ext["bufferView"] for ext in prim_exts})
+        view_remap = {old: new for new, old in enumerate(views)}
+        g.bufferViews = [g.bufferViews[i] for i in views]
+        for item in [*g.accessors, *g.images]:
+            if item.bufferView is not None:
+                item.bufferView = view_remap[item.bufferView]
+        for ext in prim_exts:
+            ext["bufferView"] = view_remap[ext["bufferView"]]
+
+    def _texture_infos(self):
+        """Every textureInfo dict/object in materials, as a dict-like proxy."""
+        for mat in self.gltf.materials:
+            pbr = mat.pbrMetallicRoughness
+            slots = [mat.normalTexture, mat.occlusionTexture, mat.emissiveTexture]
+            if pbr is not None:
+                slots += [pbr.baseColorTexture, pbr.metallicRoughnessTexture]
+            for slot in slots:
+                if slot is not None:
+                    yield _InfoProxy(slot)
+
+    def repack(self) -> None:
+        """Rebuild the binary chunk from the bufferViews in order, dropping gaps."""
+        chunks, offset = [], 0
+        for index, view in enumerate(self.gltf.bufferViews):
+            if view.buffer != 0:
+                continue
+            data = self.view_bytes(index)
+            pad = _align(offset) - offset
+            chunks.append(b"\0" * pad + data)
+            offset += pad
+            view.byteOffset = offset
+            offset += len(data)
+        self.blob = b"".join(chunks)
+
+    # -----------------------------------------------------------------------
+    # Output
+    # -----------------------------------------------------------------------
+
+    def to_bytes(self, repack: bool = True) -> bytes:
+        if repack:
+            self.repack()
+        g = self.gltf
+        blob = self.blob + b"\0" * (_align(len(self.blob)) - len(self.blob))
+        if not g.buffers:
+            g.buffers = [pygltflib.Buffer()]
+        g.buffers[0].byteLength = len(self.blob)
+        g.buffers[0].uri = None
+        text = json.dumps(_strip_empty(json.loads(g.gltf_to_json())), separators=(",", ":")).encode("utf-8")
+        text += b" " * (_align(len(text)) - len(text))
+        length = 12 + 8 + len(text) + (8 + len(blob) if blob else 0)
+        out = [GLB_MAGIC, struct.pack("<II", 2, length), struct.pack("<II", len(text), CHUNK_JSON), text]
+        if blob:
+            out += [struct.pack("<II", len(blob), CHUNK_BIN), blob]
+        return b"".join(out)
+
+    def save(self, path: Path, repack: bool = True) -> int:
+        """Write the GLB atomically; returns its size in bytes."""
+        data = self.to_bytes(repack)
+        write_bytes_atomic(Path(path), data)
+        return len(data)
+
+
+# Properties pygltflib writes out at their spec default
+_DEFAULTS = {"byteOffset": 0, "normalized": False}
+
+
+def _is_default(key, value) -> bool:
+    # Compare types too: byteOffset 0 is a default, but False == 0 in Python
+    return key in _DEFAULTS and type(value) is type(_DEFAULTS[key]) and value == _DEFAULTS[key]
+
+
+def _strip_empty(value):
+    """Drop empty ``extensions``/``extras`` objects, empty lists and spec defaults pygltflib writes everywhere."""
+    if isinstance(value, dict):
+        out = {k: _strip_empty(v) for k, v in value.items()}
+        return {k: v for k, v in out.items()
+                if v not in ({}, [], None) and not _is_default(k, v)}
+    if isinstance(value, list):
+        return [_strip_empty(v) for v in value]
+    return value
+
+
+class _InfoProxy(dict):
+    """dict view of a pygltflib TextureInfo so prune() can rewrite ``index`` uniformly."""
+
+    def __init__(self, info):
+        super().__init__(index=info.index)
+        self._info = info
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        setattr(self._info, key, value)
@@ -0,0 +1,252 @@
+"""
+Dragon Nest Lite - API Key Pool
+
+Spreads requests for a single provider (Gemini, Meshy, ElevenLabs) across
+several API keys so bulk runs are limited by aggregate quota instead of the
+per-key rate limit.
+
+Keys are read from a comma-separated ``<NAME>S`` variable plus the legacy
+single-key ``<NAME>`` variable, e.g. in .env:
+
+    GEMINI_API_KEYS=key_a,key_b,key_c
+    GEMINI_API_KEY=key_d
+
+Each key tracks its own recent request timestamps, in-flight requests and
+cooldown. ``acquire()`` hands out the least-loaded key that is ready, waiting
+only when every live key is pacing or cooling down. Keys that fail
+authentication or run out of quota are evicted for the rest of the run.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+RATE_WINDOW_SECONDS = 60.0
+RATE_LIMIT_COOLDOWN = 30.0  # seconds a key rests after a plain HTTP 429
+
+# HTTP statuses that mean the key itself is unusable (bad key, no credits, banned)
+EVICT_STATUS_CODES = (401, 402, 403)
+
+# Substrings in a 429 body that mean the quota is gone for the day, not just
+# for the current minute
+QUOTA_EXHAUSTED_MARKERS = (
+    "per day",
+    "perday",
+    "daily",
+    "quota_exceeded",
+    "insufficient",
+    "credits",
+)
+
+
+class KeyPoolExhausted(RuntimeError):
+    """Raised when every key in a pool has been evicted."""
+
+
+@dataclass
+class _KeyState:
+    key: str
+    label: str
+    recent: deque = field(default_factory=deque)
+    in_flight: int = 0
+    next_ready: float = 0.0
+    evicted: Optional[str] = None
+
+
+def mask_key(key: str) -> str:
+    """Short printable form of an API key (never log the full secret)."""
+    if len(key) <= 8:
+        return "*" * len(key)
+    return f"{key[:4]}...{key[-4:]}"
+
+
+# ---------------------------------------------------------------------------
+# Key pool
+# ---------------------------------------------------------------------------
+
+class KeyPool:
+    """Thread-safe pool of API keys for one provider."""
+
+    def __init__(
+        self,
+        provider: str,
+        keys: list[str],
+        min_interval: float = 0.0,
+        max_per_minute: Optional[int] = None,
+    ):
+        """
+        Args:
+            provider: Human-readable provider name for logging.
+            keys: API keys (duplicates are dropped).
+            min_interval: Minimum seconds between two requests on the same key.
+            max_per_minute: Optional hard cap of requests per key per minute.
+        """
+        self.provider = provider
+        self.min_interval = min_interval
+        self.max_per_minute = max_per_minute
+        self._lock = threading.Condition()
+        self._states: list[_KeyState] = []
+        for key in dict.fromkeys(k for k in keys if k):
+            self._states.append(_KeyState(key=key, label=mask_key(key)))
+
+    @classmethod
+    def from_env(
+        cls,
+        env_var: str,
+        min_interval: float = 0.0,
+        max_per_minute: Optional[int] = None,
+    ) -> "KeyPool":
+        """Build a pool from ``<env_var>S`` (comma-separated) and ``<env_var>``."""
+        keys = [k.strip() for k in os.environ.get(f"{env_var}S", "").split(",")]
+        keys.append(os.environ.get(env_var, "").strip())
+        provider = env_var.replace("_API_KEY", "").title()
+        return cls(provider, keys, min_interval=min_interval, max_per_minute=max_per_minute)
+
+    # ----- Introspection -----
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(1 for s in self._states if s.evicted is None)
+
+    def keys(self) -> list[str]:
+        """Live (non-evicted) keys."""
+        with self._lock:
+            return [s.key for s in self._states if s.evicted is None]
+
+    @property
+    def capacity(self) -> float:
+        """Aggregate sustainable requests per second across all live keys."""
+        per_key = []
+        if self.min_interval > 0:
+            per_key.append(1.0 / self.min_interval)
+        if self.max_per_minute:
+            per_key.append(self.max_per_minute / RATE_WINDOW_SECONDS)
+        if not per_key:
+            return float("inf")
+        return len(self) * min(per_key)
+
+    def describe(self) -> str:
+        live = len(self)
+        total = len(self._states)
+        capacity = self.capacity
+        rate = "unpaced" if capacity == float("inf") else f"~{capacity:.2f} req/s aggregate"
+        return f"{self.provider} key pool: {live}/{total} keys live, {rate}"
+
+    # ----- Acquire / release -----
+
+    def _load(self, state: _KeyState, now: float) -> tuple:
+        while state.recent and now - state.recent[0] > RATE_WINDOW_SECONDS:
+            state.recent.popleft()
+        return (state.in_flight, len(state.recent), state.next_ready)
+
+    def _ready_at(self, state: _KeyState) -> float:
+        ready = state.next_ready
+        if self.max_per_minute and len(state.recent) >= self.max_per_minute:
+            ready = max(ready, state.recent[0] + RATE_WINDOW_SECONDS)
+        return ready
+
+    def acquire(self) -> str:
+        """
+        Reserve the least-loaded ready key, waiting if every key is busy.
+
+        Raises:
+            KeyPoolExhausted: If no live keys remain.
+        """
+        with self._lock:
+            while True:
+                live = [s for s in self._states if s.evicted is None]
+                if not live:
+                    raise KeyPoolExhausted(f"All {self.provider} API keys have been evicted")
+
+                now = time.monotonic()
+                live.sort(key=lambda s: self._load(s, now))
+                ready = [s for s in live if self._ready_at(s) <= now]
+                if ready:
+                    state = ready[0]
+                    state.in_flight += 1
+                    state.recent.append(now)
+                    state.next_ready = now + self.min_interval
+                    return state.key
+
+                wait = min(self._ready_at(s) for s in live) - now
+                self._lock.wait(timeout=max(wait, 0.01))
+
+    def release(self, key: str) -> None:
+        """Return a key reserved by ``acquire()``."""
+        with self._lock:
+            state = self._find(key)
+            if state and state.in_flight > 0:
+                state.in_flight -= 1
+            self._lock.notify_all()
+
+    @contextmanager
+    def lease(self):
+        """Context manager form of acquire()/release()."""
+        key = self.acquire()
+        try:
+            yield key
+        finally:
+            self.release(key)
+
+    # ----- Failure handling -----
+
+    def report_failure(
+        self,
+        key: str,
+        status_code: Optional[int] = None,
+        message: str = "",
+        cooldown: float = 0.0,
+    ) -> bool:
+        """
+        Record a failed request made with ``key``.
+
+        Auth failures and exhausted quotas evict the key; a plain 429 rests it
+        for at least RATE_LIMIT_COOLDOWN and a 5xx for ``cooldown``. Anything
+        else (a bad request, a failure with no HTTP status) is not the key's
+        fault and leaves it ready.
+
+        Returns:
+            True if the key was evicted.
+        """
+        text = (message or "").lower()
+        with self._lock:
+            state = self._find(key)
+            if state is None or state.evicted is not None:
+                return False
+
+            if status_code in EVICT_STATUS_CODES:
+                reason = f"HTTP {status_code}"
+            elif status_code == 429 and any(m in text for m in QUOTA_EXHAUSTED_MARKERS):
+                reason = "quota exhausted"
+            else:
+                reason = None
+
+            if reason:
+                state.evicted = reason
+                remaining = sum(1 for s in self._states if s.evicted is None)
+                print(f"  [KEY] Evicted {self.provider} key {state.label} ({reason}); "
+                      f"{remaining} key(s) left")
+                self._lock.notify_all()
+                return True
+
+            if status_code == 429:
+                cooldown = max(cooldown, RATE_LIMIT_COOLDOWN)
+            elif status_code is None or status_code < 500:
+                cooldown = 0.0
+            if cooldown > 0:
+                state.next_ready = max(state.next_ready, time.monotonic() + cooldown)
+            return False
+
+    def _find(self, key: str) -> Optional[_KeyState]:
+        for state in self._states:
+            if state.key == key:
+                return state
+        return None
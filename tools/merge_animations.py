@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Dragon Nest Lite - Animation Clip Merger
+========================================
+
+Meshy delivers each rigged animation as a complete GLB: fighter_walk.glb
+repeats fighter.glb's mesh, skin and texture just to carry one clip. This
+stage copies only the animation channels and samplers out of every
+<model>_<clip>.glb next to a rigged <model>.glb, retargets them to the base
+model's nodes by name, and adds them to <model>.glb as a clip named <clip>
+(an existing clip of that name is replaced). All clips of a model are
+merged in one pass, and the base file's root extras get a clip index
+(CLIP_INDEX: name -> animation index, duration, channel count). The
+animation GLBs are deleted afterwards unless --keep is given, so neither
+the build nor the model optimizer picks the duplicate geometry up again.
+
+Source files may be full rigged GLBs or armature-only ones; either way
+only keyframes are copied. They come from the same rigging task as the
+base model, so the skeletons are the same; the merge checks that every
+joint a clip animates exists in the base model and that the base skin's
+joints are all present in the source.
+
+rig_models.py calls merge_files() once it has downloaded a model's
+animations.
+
+Usage:
+  python merge_animations.py                  # Merge every <model>_<clip>.glb
+  python merge_animations.py --keep           # Keep the animation GLBs
+  python merge_animations.py assets/models/fighter_walk.glb
+
+Requires:
+  pip install pygltflib numpy
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+try:
+    import pygltflib
+except ImportError:
+    print("ERROR: Required packages not installed.")
+    print("Run: pip install pygltflib numpy")
+    sys.exit(1)
+
+from glb import Glb
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+MODELS_DIR = PROJECT_ROOT / "assets" / "models"
+
+CLIP_INDEX = "clips"         # root extras key: clip name -> {animation, duration, channels}
+
+
+# ---------------------------------------------------------------------------
+# Merging
+# ---------------------------------------------------------------------------
+
+def node_remap(base: pygltflib.GLTF2, source: pygltflib.GLTF2) -> dict:
+    """Source node index -> base node index, matched by name."""
+    by_name = {node.name: index for index, node in enumerate(base.nodes) if node.name}
+    return {index: by_name[node.name] for index, node in enumerate(source.nodes) if node.name in by_name}
+
+
+def check_skeleton(base: pygltflib.GLTF2, source: pygltflib.GLTF2) -> None:
+    """Raise ValueError unless the base model's joints all exist in the source."""
+    if not base.skins:
+        raise ValueError("base model has no skin")
+    names = {node.name for node in source.nodes}
+    missing = [base.nodes[j].name for skin in base.skins for j in skin.joints if base.nodes[j].name not in names]
+    if missing:
+        raise ValueError(f"joints missing from the animation file: {', '.join(missing[:5])}")
+
+
+def merge_clip(base: Glb, source: Glb, animation: pygltflib.Animation, name: str) -> int:
+    """Add one of ``source``'s animations to ``base`` as clip ``name``; returns its channel count."""
+    remap = node_remap(base.gltf, source.gltf)
+    clip = pygltflib.Animation(name=name, channels=[], samplers=[])
+    copied = {}
+    for channel in animation.channels:
+        target = channel.target.node
+        if target is None:
+            continue
+        if target not in remap:
+            raise ValueError(f"animated node {source.gltf.nodes[target].name!r} is not in the base model")
+        if channel.sampler not in copied:
+            sampler = animation.samplers[channel.sampler]
+            copied[channel.sampler] = len(clip.samplers)
+            clip.samplers.append(pygltflib.AnimationSampler(
+                input=_copy_accessor(base, source, sampler.input, bounds=True),
+                output=_copy_accessor(base, source, sampler.output),
+                interpolation=sampler.interpolation,
+            ))
+        clip.channels.append(pygltflib.AnimationChannel(
+            sampler=copied[channel.sampler],
+            target=pygltflib.AnimationChannelTarget(node=remap[target], path=channel.target.path),
+        ))
+
+    base.gltf.animations = [a for a in base.gltf.animations if a.name != name] + [clip]
+    return len(clip.channels)
+
+
+def _copy_accessor(base: Glb, source: Glb, index: int, bounds: bool = False) -> int:
+    acc = source.gltf.accessors[index]
+    return base.add_accessor(source.read_accessor(index), normalized=bool(acc.normalized),
+                             acc_type=acc.type, bounds=bounds)
+
+
+def clip_index(gltf: pygltflib.GLTF2) -> dict:
+    """Clip name -> {animation, duration, channels} for every named animation."""
+    index = {}
+    for i, animation in enumerate(gltf.animations):
+        if not animation.name:
+            continue
+        inputs = {s.input for s in animation.samplers}
+        duration = max((gltf.accessors[a].max[0] for a in inputs if gltf.accessors[a].max), default=0.0)
+        index[animation.name] = {"animation": i, "duration": round(float(duration), 4),
+                                 "channels": len(animation.channels)}
+    return index
+
+
+def merge_files(base_path: Path, clips: dict, keep: bool = False) -> dict:
+    """
+    Merge the animations of several GLBs into ``base_path`` in place.
+
+    ``clips`` maps clip name -> animation GLB. A file with one animation
+    becomes clip ``name``; several become name, name_1, ... The base file
+    is written once, with the clip index in its root extras (CLIP_INDEX).
+    Returns that index.
+    """
+    base = Glb.load(base_path)
+    for name, anim_path in clips.items():
+        source = Glb.load(anim_path)
+        check_skeleton(base.gltf, source.gltf)
+        for i, animation in enumerate(source.gltf.animations):
+            merge_clip(base, source, animation, name if i == 0 else f"{name}_{i}")
+    base.prune()
+    index = clip_index(base.gltf)
+    base.gltf.extras = {**(base.gltf.extras or {}), CLIP_INDEX: index}
+    base.save(base_path)
+    if not keep:
+        for anim_path in clips.values():
+            anim_path.unlink()
+    return index
+
+
+def animation_files() -> dict:
+    """Base path -> {clip name: animation path} for every <model>_<clip>.glb next to a <model>.glb."""
+    found = {}
+    for path in sorted(MODELS_DIR.glob("*_*.glb")):
+        model, _, clip = path.stem.rpartition("_")
+        base_path = MODELS_DIR / f"{model}.glb"
+        if not base_path.exists():
+            continue
+        gltf = pygltflib.GLTF2().load(str(path))
+        if gltf.animations:
+            found.setdefault(base_path, {})[clip] = path
+    return found
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge <model>_<clip>.glb animations into <model>.glb")
+    parser.add_argument("files", nargs="*", help="Animation GLBs (default: every <model>_<clip>.glb)")
+    parser.add_argument("--keep", action="store_true", help="Keep the animation GLBs after merging")
+    args = parser.parse_args()
+
+    jobs = animation_files()
+    if args.files:
+        wanted = {Path(f).resolve() for f in args.files}
+        jobs = {base: {clip: path for clip, path in clips.items() if path.resolve() in wanted}
+                for base, clips in jobs.items()}
+        jobs = {base: clips for base, clips in jobs.items() if clips}
+    if not jobs:
+        print(f"No animation GLBs found in {MODELS_DIR}")
+        return 1
+
+    print("=" * 60)
+    print("  Animation Clip Merger")
+    print("=" * 60)
+    failed = 0
+    for base_path, clips in jobs.items():
+        before = sum(path.stat().st_size for path in clips.values())
+        try:
+            index = merge_files(base_path, clips, keep=args.keep)
+        except ValueError as e:
+            print(f"  [FAIL] {base_path.name}: {e}")
+            failed += 1
+            continue
+        print(f"  [MERGE] {', '.join(p.name for p in clips.values())} ({before / 1024:.0f} KB) -> "
+              f"{base_path.name} ({base_path.stat().st_size / 1024:.0f} KB), clips: {', '.join(index)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
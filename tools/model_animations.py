@@ -0,0 +1,243 @@
+"""
+Dragon Nest Lite - Animation Keyframe Reduction
+
+Used by optimize_models.py. Meshy samples every bone of every clip at a
+fixed rate (32 keys per second of walk cycle) with float32 rotation,
+translation and scale, although most tracks are constant or close to
+linear between a few poses. This step shrinks each clip's keyframes:
+
+  - constant tracks (every key within tolerance of the first) that equal
+    the node's rest transform are dropped, since the bone holds that value
+    when no track drives it; other constant tracks keep a single key
+  - a key is removed when interpolating between its kept neighbours
+    (slerp for rotations, lerp otherwise, hold for STEP) reproduces every
+    original key in between within tolerance
+  - rotations are stored as normalized int16 (core glTF allows it for
+    animation outputs; GLTFLoader dequantizes on load)
+
+Tolerances are ANGULAR_TOLERANCE degrees for rotations, POSITION_TOLERANCE
+metres for translations (measured at the model's normalized size, so run
+this after normalize_scene) and SCALE_TOLERANCE for scale factors. Errors
+are local to each bone: a parent's rotation error still moves its
+children. The reported error is measured against the original keys after
+quantization, per bone and per clip; CUBICSPLINE tracks are left alone.
+
+Typical use:
+
+    stats = reduce_animations(glb)
+"""
+
+import numpy as np
+import pygltflib
+
+from glb import COMPONENT_DTYPES, TYPE_SIZES
+from normalize_models import world_matrices
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+ANGULAR_TOLERANCE = 0.25       # degrees
+POSITION_TOLERANCE = 0.0005    # metres
+SCALE_TOLERANCE = 0.001        # scale factor
+
+ROTATION_BITS = 16             # normalized int16
+# Worst-case rotation error int16 rounding adds, kept out of the reduction budget
+QUANTIZATION_ANGLE = np.degrees(4 / (2 ** (ROTATION_BITS - 1) - 1))
+
+REST = {"translation": [0.0, 0.0, 0.0], "rotation": [0.0, 0.0, 0.0, 1.0], "scale": [1.0, 1.0, 1.0]}
+
+
+# ---------------------------------------------------------------------------
+# Track math
+# ---------------------------------------------------------------------------
+
+def continuous(quats: np.ndarray) -> np.ndarray:
+    """Unit quaternions with signs flipped so consecutive keys lie in the same hemisphere."""
+    quats = quats / np.linalg.norm(quats, axis=1, keepdims=True)
+    signs = np.where(np.sum(quats[1:] * quats[:-1], axis=1) < 0, -1.0, 1.0)
+    return quats * np.concatenate([[1.0], np.cumprod(signs)])[:, None]
+
+
+def slerp(q0: np.ndarray, q1: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """Shortest-path slerp from q0 to q1 at fractions ``u`` (as THREE.Quaternion.slerpFlat)."""
+    dot = float(np.dot(q0, q1))
+    if dot < 0:
+        q1, dot = -q1, -dot
+    if dot > 0.9995:
+        out = q0 + (q1 - q0) * u[:, None]
+        return out / np.linalg.norm(out, axis=1, keepdims=True)
+    theta = np.arccos(dot)
+    return (np.sin((1 - u) * theta)[:, None] * q0 + np.sin(u * theta)[:, None] * q1) / np.sin(theta)
+
+
+def track_error(path: str, values: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Per-key error of ``values`` against ``reference``: degrees for rotations, units otherwise."""
+    if path == "rotation":
+        dot = np.abs(np.sum(values * reference, axis=1)) / (
+            np.linalg.norm(values, axis=1) * np.linalg.norm(reference, axis=1))
+        return np.degrees(2 * np.arccos(np.clip(dot, 0.0, 1.0)))
+    if path == "translation":
+        return np.linalg.norm(values - reference, axis=1)
+    return np.abs(values - reference).max(axis=1)
+
+
+def sample(path: str, interpolation: str, times: np.ndarray, values: np.ndarray, at: np.ndarray) -> np.ndarray:
+    """The track (times, values) evaluated at ``at``, as the runtime interpolates it."""
+    after = np.searchsorted(times, at, side="right")
+    if len(times) == 1:
+        return np.repeat(values, len(at), axis=0)
+    if interpolation == "STEP":
+        return values[np.maximum(after - 1, 0)]
+    right = np.clip(after, 1, len(times) - 1)
+    left = right - 1
+    u = np.clip((at - times[left]) / np.maximum(times[right] - times[left], 1e-9), 0.0, 1.0)
+    if path == "rotation":
+        return np.array([slerp(values[l], values[r], np.array([w]))[0] for l, r, w in zip(left, right, u)])
+    return values[left] + (values[right] - values[left]) * u[:, None]
+
+
+def reduce_keys(path: str, interpolation: str, times: np.ndarray, values: np.ndarray, tolerance: float) -> list:
+    """Indices of the keys to keep so the track stays within ``tolerance`` (track_error units)."""
+    n = len(times)
+    if n <= 2:
+        return list(range(n))
+    kept, anchor = [0], 0
+    for candidate in range(2, n):
+        span = np.arange(anchor + 1, candidate)
+        segment = [anchor, candidate]
+        approx = sample(path, interpolation, times[segment], values[segment], times[span])
+        if track_error(path, approx, values[span]).max() > tolerance:
+            anchor = candidate - 1
+            kept.append(anchor)
+    kept.append(n - 1)
+    return kept
+
+
+def quantize_rotations(quats: np.ndarray) -> np.ndarray:
+    scale = 2 ** (ROTATION_BITS - 1) - 1
+    return np.round(np.clip(quats, -1.0, 1.0) * scale).astype(np.int16)
+
+
+# ---------------------------------------------------------------------------
+# Clips
+# ---------------------------------------------------------------------------
+
+def reduce_animations(glb, angle: float = ANGULAR_TOLERANCE, position: float = POSITION_TOLERANCE,
+                      scale: float = SCALE_TOLERANCE) -> dict:
+    """
+    Reduce and quantize every animation of ``glb`` in place.
+
+    Returns {clip name: {before, after, keys: [before, after], dropped,
+    rotationError, translationError, bones: {bone: {rotation, translation}}}}
+    with sizes in bytes of keyframe data, rotation errors in degrees and
+    translation errors in metres.
+    """
+    g = glb.gltf
+    units = _world_units(g)
+    tolerances = {"rotation": angle - QUANTIZATION_ANGLE, "translation": position, "scale": scale}
+    stats = {}
+    for number, animation in enumerate(g.animations):
+        before = _clip_bytes(g, animation)
+        clip = {"before": before, "after": 0, "keys": [0, 0], "dropped": 0,
+                "rotationError": 0.0, "translationError": 0.0, "bones": {}}
+        channels, samplers = [], []
+        for channel in animation.channels:
+            sampler = animation.samplers[channel.sampler]
+            node, path = channel.target.node, channel.target.path
+            if node is None or path not in tolerances or sampler.interpolation == "CUBICSPLINE":
+                channels.append(pygltflib.AnimationChannel(sampler=len(samplers), target=channel.target))
+                samplers.append(sampler)
+                continue
+            times = glb.read_floats(sampler.input).reshape(-1)
+            values = glb.read_floats(sampler.output).astype(np.float64)
+            if path == "rotation":
+                values = continuous(values)
+            unit = units.get(node, 1.0) if path == "translation" else 1.0
+            tolerance = tolerances[path] / unit
+            clip["keys"][0] += len(times)
+
+            if track_error(path, values, values[:1]).max() <= tolerance:
+                rest = _rest_value(g.nodes[node], path)
+                if rest is not None and track_error(path, values[:1], rest[None]).max() <= tolerance:
+                    clip["dropped"] += 1
+                    error = track_error(path, rest[None], values).max() * unit
+                    _record(clip, g.nodes[node].name or f"node{node}", path, error)
+                    continue
+                kept = [0]
+            else:
+                kept = reduce_keys(path, sampler.interpolation, times, values, tolerance)
+
+            key_times, key_values = times[kept], values[kept]
+            if path == "rotation":
+                stored = quantize_rotations(key_values)
+                decoded = stored / (2 ** (ROTATION_BITS - 1) - 1)
+                output = glb.add_accessor(stored, normalized=True)
+            else:
+                decoded = key_values.astype(np.float32)
+                output = glb.add_accessor(decoded)
+            approx = sample(path, sampler.interpolation, key_times, decoded, times)
+            _record(clip, g.nodes[node].name or f"node{node}", path,
+                    track_error(path, approx, values).max() * unit)
+
+            clip["keys"][1] += len(kept)
+            samplers.append(pygltflib.AnimationSampler(
+                input=glb.add_accessor(key_times.astype(np.float32), bounds=True),
+                output=output, interpolation=sampler.interpolation))
+            channels.append(pygltflib.AnimationChannel(sampler=len(samplers) - 1, target=channel.target))
+
+        if not channels:
+            # glTF needs at least one channel; keep the first track as a single key
+            channel = animation.channels[0]
+            sampler = animation.samplers[channel.sampler]
+            samplers.append(pygltflib.AnimationSampler(
+                input=glb.add_accessor(glb.read_floats(sampler.input).reshape(-1)[:1], bounds=True),
+                output=glb.add_accessor(glb.read_floats(sampler.output)[:1]),
+                interpolation=sampler.interpolation))
+            channels.append(pygltflib.AnimationChannel(sampler=0, target=channel.target))
+            clip["dropped"] -= 1
+            clip["keys"][1] += 1
+
+        animation.channels, animation.samplers = channels, samplers
+        clip["after"] = _clip_bytes(g, animation)
+        clip["rotationError"] = round(clip["rotationError"], 4)
+        clip["translationError"] = round(clip["translationError"], 6)
+        stats[animation.name or f"animation{number}"] = clip
+    return stats
+
+
+
+def _record(clip: dict, bone: str, path: str, error: float) -> None:
+    if path == "scale":
+        return
+    key = "rotationError" if path == "rotation" else "translationError"
+    clip[key] = max(clip[key], float(error))
+    bone_errors = clip["bones"].setdefault(bone, {"rotation": 0.0, "translation": 0.0})
+    bone_errors[path] = max(bone_errors[path], round(float(error), 6))
+
+
+def _rest_value(node: pygltflib.Node, path: str):
+    """The node's own TRS value for ``path`` (None for matrix nodes)."""
+    if node.matrix is not None:
+        return None
+    value = getattr(node, path)
+    return np.array(value if value is not None else REST[path], dtype=np.float64)
+
+
+def _world_units(gltf: pygltflib.GLTF2) -> dict:
+    """node index -> metres per unit of its translation (the parent's world scale)."""
+    worlds = world_matrices(gltf)
+    parents = {child: index for index, node in enumerate(gltf.nodes) for child in node.children or []}
+    units = {}
+    for index in worlds:
+        parent = parents.get(index)
+        if parent is not None and parent in worlds:
+            units[index] = float(np.cbrt(abs(np.linalg.det(worlds[parent][:3, :3]))))
+    return units
+
+
+def _clip_bytes(gltf: pygltflib.GLTF2, animation: pygltflib.Animation) -> int:
+    """Keyframe bytes of a clip, each accessor counted once."""
+    accessors = [gltf.accessors[a] for a in {a for s in animation.samplers for a in (s.input, s.output)}]
+    return sum(a.count * np.dtype(COMPONENT_DTYPES[a.componentType]).itemsize * TYPE_SIZES[a.type]
+               for a in accessors)
@@ -0,0 +1,161 @@
+"""
+Dragon Nest Lite - Model LOD Chains
+
+Used by optimize_models.py. Every model ships at a single detail level, so
+a dungeon full of skeletons draws each one at 6-10k triangles even when it
+covers a few dozen pixels. This step adds up to LOD_RATIOS lower levels to
+every mesh node of characters, NPCs and environment models
+(model_textures.CATEGORY_GLOBS) with at least MIN_TRIANGLES triangles,
+stored the MSFT_lod way:
+
+  base node  extensions.MSFT_lod.ids = [lod1 node, lod2 node]
+             extras.MSFT_screencoverage = [c0, c1, 0]
+  lod nodes  outside the scene, same transform and skin as the base node,
+             mesh primitives with the same material and a simplified index
+             buffer (prepare_mesh later drops the vertices it no longer uses)
+
+Simplification is meshoptimizer's quadric-error simplify on world-space
+positions, so errors come out in metres at the model's normalized size. It
+never moves or creates vertices, only picks a subset, which keeps UV seams
+(split vertices stay split) and skin weights exactly. A level stops the
+chain when it saves less than MIN_REDUCTION, which is what happens when
+LOD_MAX_ERROR stops the simplifier short of its target.
+
+Screen coverage is the fraction of the screen height the model's height
+covers; level i is drawn while the coverage is at least c[i], where c[i]
+is the coverage at which level i + 1's error would reach PIXEL_ERROR px on
+a REFERENCE_HEIGHT px viewport. The last level is never culled (0).
+ModelLoader turns these into THREE.LOD distances with the game camera's
+field of view.
+
+Typical use:
+
+    lods = build_lods(glb, height, model_category(relative_path))
+"""
+
+import copy
+
+import meshoptimizer
+import numpy as np
+import pygltflib
+
+from normalize_models import world_matrices
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+MSFT_LOD = "MSFT_lod"
+COVERAGE = "MSFT_screencoverage"
+
+LOD_CATEGORIES = {"character", "npc", "environment"}
+MIN_TRIANGLES = 2000
+LOD_RATIOS = [0.5, 0.25]       # target triangle count per level, of the base mesh
+LOD_MAX_ERROR = 0.02           # relative to the mesh extent (meshoptimizer's error scale)
+MIN_REDUCTION = 0.8            # a level must keep at most this fraction of the previous one
+
+PIXEL_ERROR = 1.0
+REFERENCE_HEIGHT = 1080
+
+
+# ---------------------------------------------------------------------------
+# Simplification
+# ---------------------------------------------------------------------------
+
+def simplify(indices: np.ndarray, positions: np.ndarray, ratio: float):
+    """(indices, absolute error) of one primitive simplified to ``ratio`` of its triangles."""
+    indices = np.ascontiguousarray(indices, dtype=np.uint32)
+    positions = np.ascontiguousarray(positions, dtype=np.float32)
+    out = np.zeros(len(indices), dtype=np.uint32)
+    error = np.zeros(1, dtype=np.float32)
+    target = max(3, int(len(indices) * ratio) // 3 * 3)
+    count = meshoptimizer.simplify(out, indices, positions, target_index_count=target,
+                                   target_error=LOD_MAX_ERROR, result_error=error)
+    return out[:count], float(error[0]) * meshoptimizer.simplify_scale(positions)
+
+
+def _world_positions(glb, prim, world: np.ndarray) -> np.ndarray:
+    positions = glb.read_floats(prim.attributes.POSITION).astype(np.float64)
+    return positions @ world[:3, :3].T + world[:3, 3]
+
+
+# ---------------------------------------------------------------------------
+# LOD chain
+# ---------------------------------------------------------------------------
+
+def build_lods(glb, height: float, category: str) -> dict:
+    """
+    Add MSFT_lod levels to every eligible mesh node of ``glb``'s default scene.
+
+    Returns {triangles: [per level], error: [metres, per level]} summed /
+    maxed over the nodes, or None when the model gets no LODs.
+    """
+    g = glb.gltf
+    if category not in LOD_CATEGORIES:
+        return None
+
+    summary = None
+    for index, world in list(world_matrices(g).items()):
+        node = g.nodes[index]
+        if node.mesh is None or MSFT_LOD in (node.extensions or {}):
+            continue
+        primitives = [p for p in g.meshes[node.mesh].primitives
+                      if p.indices is not None and p.mode in (None, 4)]
+        if len(primitives) != len(g.meshes[node.mesh].primitives):
+            continue
+        base = [glb.read_accessor(p.indices) for p in primitives]
+        triangles = [sum(len(i) for i in base) // 3]
+        if triangles[0] < MIN_TRIANGLES:
+            continue
+
+        positions = [_world_positions(glb, p, world) for p in primitives]
+        levels, errors = [], [0.0]
+        for ratio in LOD_RATIOS:
+            results = [simplify(i, pos, ratio) for i, pos in zip(base, positions)]
+            count = sum(len(i) for i, _ in results) // 3
+            error = max(e for _, e in results)
+            if count > triangles[-1] * MIN_REDUCTION:
+                break
+            levels.append(_add_level(glb, index, [i for i, _ in results], len(levels) + 1))
+            triangles.append(count)
+            errors.append(error)
+        if not levels:
+            continue
+
+        node.extensions = {**(node.extensions or {}), MSFT_LOD: {"ids": levels}}
+        node.extras = {**(node.extras or {}), COVERAGE: screen_coverage(errors, height)}
+        if summary is None:
+            summary = {"triangles": [0] * len(triangles), "error": [0.0] * len(errors)}
+        for level, (t, e) in enumerate(zip(triangles, errors)):
+            if level < len(summary["triangles"]):
+                summary["triangles"][level] += t
+                summary["error"][level] = max(summary["error"][level], round(e, 6))
+
+    if summary and MSFT_LOD not in g.extensionsUsed:
+        g.extensionsUsed.append(MSFT_LOD)
+    return summary
+
+
+def _add_level(glb, index: int, indices: list, level: int) -> int:
+    """New node copying node ``index`` with a mesh of simplified index buffers; returns its index."""
+    g = glb.gltf
+    node = g.nodes[index]
+    mesh = g.meshes[node.mesh]
+    level_mesh = pygltflib.Mesh(name=f"{mesh.name or 'mesh'}_lod{level}", primitives=[])
+    for prim, level_indices in zip(mesh.primitives, indices):
+        level_prim = copy.deepcopy(prim)
+        level_prim.indices = glb.add_accessor(level_indices, acc_type="SCALAR")
+        level_mesh.primitives.append(level_prim)
+    g.meshes.append(level_mesh)
+    g.nodes.append(pygltflib.Node(
+        name=f"{node.name or 'node'}_lod{level}", mesh=len(g.meshes) - 1, skin=node.skin,
+        matrix=copy.copy(node.matrix), translation=copy.copy(node.translation),
+        rotation=copy.copy(node.rotation), scale=copy.copy(node.scale)))
+    return len(g.nodes) - 1
+
+
+def screen_coverage(errors: list, height: float) -> list:
+    """MSFT_screencoverage for a chain with per-level errors in metres (errors[0] = 0)."""
+    coverage = [min(1.0, PIXEL_ERROR * height / (error * REFERENCE_HEIGHT)) if error > 0 else 1.0
+                for error in errors[1:]]
+    return [round(c, 4) for c in coverage] + [0.0]
@@ -0,0 +1,164 @@
+"""
+Dragon Nest Lite - Embedded Model Textures
+
+Used by optimize_models.py. Meshy embeds every texture at 2048px as a JPEG,
+which is most of each GLB's weight, while an NPC is about 1.8 m tall on
+screen and never covers more than a few hundred pixels. This step
+downscales each embedded image to its model category's budget and
+re-encodes it as WebP (EXT_texture_webp, listed as required: every browser
+that runs WebGL2 decodes WebP, and three.js's GLTFLoader reads the
+extension). Only the image bufferViews are replaced; geometry and animation
+views are carried over byte for byte.
+
+Budgets are the long side in px per category (CATEGORY_GLOBS, matched on the
+path relative to assets/models); images already within budget are only
+re-encoded. Colour textures (base colour, emissive) are downsampled in
+linear light like texture_tiers.py; data textures (normal, metallic-
+roughness, occlusion) are filtered as stored and get SLOT_SCALE of the
+budget. WebP quality is the lowest reaching SSIM_TARGETS[kind] against the
+downscaled image (encode_images.search_quality). An image whose WebP would
+not be smaller than what is embedded is left alone.
+
+KTX2/Basis would also save GPU memory but needs toktx, which this pipeline
+only has for the loose textures (compile_textures.py); WebP needs nothing
+beyond Pillow.
+
+Typical use:
+
+    stats = compress_textures(glb, texture_budget(relative_path))
+"""
+
+import fnmatch
+import functools
+import io
+
+import numpy as np
+from PIL import Image
+
+from encode_images import _planes, encode, search_quality
+from texture_tiers import downsample
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+WEBP = "EXT_texture_webp"
+
+# Long side in px per category; first matching category wins
+CATEGORY_GLOBS = [
+    ("character", ["fighter*.glb", "mage*.glb", "enemy_*.glb", "boss_*.glb"]),
+    ("npc", ["npc_*.glb"]),
+    ("prop", ["item_*.glb"]),
+    ("environment", ["env_*.glb"]),
+]
+BUDGETS = {"character": 1024, "npc": 512, "prop": 256, "environment": 512}
+DEFAULT_BUDGET = 1024
+
+# Fraction of the budget per material slot; data maps tolerate less resolution than colour
+SLOT_SCALE = {"baseColor": 1.0, "emissive": 1.0, "normal": 1.0, "metallicRoughness": 0.5, "occlusion": 0.5}
+COLOR_SLOTS = {"baseColor", "emissive"}
+
+SSIM_TARGETS = {"color": 0.98, "data": 0.99}
+
+
+# ---------------------------------------------------------------------------
+# Budgets
+# ---------------------------------------------------------------------------
+
+def model_category(relative: str) -> str:
+    """Category of a GLB from its path relative to assets/models, or None."""
+    for category, globs in CATEGORY_GLOBS:
+        if any(fnmatch.fnmatch(relative, g) for g in globs):
+            return category
+    return None
+
+
+def texture_budget(relative: str) -> int:
+    return BUDGETS.get(model_category(relative), DEFAULT_BUDGET)
+
+
+def image_slots(gltf) -> dict:
+    """image index -> set of material slot names sampling it (via either texture source)."""
+    slots = {}
+    for mat in gltf.materials:
+        pbr = mat.pbrMetallicRoughness
+        infos = {"normal": mat.normalTexture, "occlusion": mat.occlusionTexture, "emissive": mat.emissiveTexture}
+        if pbr is not None:
+            infos.update(baseColor=pbr.baseColorTexture, metallicRoughness=pbr.metallicRoughnessTexture)
+        for slot, info in infos.items():
+            if info is None:
+                continue
+            texture = gltf.textures[info.index]
+            source = (texture.extensions or {}).get(WEBP, {}).get("source", texture.source)
+            if source is not None:
+                slots.setdefault(source, set()).add(slot)
+    return slots
+
+
+# ---------------------------------------------------------------------------
+# Images
+# ---------------------------------------------------------------------------
+
+def resize_image(img: Image.Image, size: int, color: bool) -> Image.Image:
+    """``img`` with its long side reduced to ``size`` (unchanged if already within it)."""
+    mode = "RGBA" if "A" in img.getbands() else "RGB"
+    img = img.convert(mode)
+    if max(img.size) <= size:
+        return img
+    scale = size / max(img.size)
+    if color:
+        return Image.fromarray(downsample(np.asarray(img), scale, tiling=False, premultiplied=False), mode)
+    width, height = max(1, round(img.width * scale)), max(1, round(img.height * scale))
+    return img.resize((width, height), Image.LANCZOS)
+
+
+@functools.lru_cache(maxsize=16)
+def compress_image(data: bytes, size: int, color: bool):
+    """(webp bytes, (width, height), quality) for one embedded image; cached, every codec variant shares it."""
+    with Image.open(io.BytesIO(data)) as img:
+        resized = resize_image(img, size, color)
+    found = search_quality(resized, _planes(resized), "webp", SSIM_TARGETS["color" if color else "data"])
+    if found is None:
+        return encode(resized, "webp", 100), resized.size, 100
+    quality, _, webp = found
+    return webp, resized.size, quality
+
+
+def compress_textures(glb, budget: int) -> list:
+    """
+    Re-encode every material image of ``glb`` as WebP within ``budget`` px.
+
+    Each image gets a new bufferView and its textures point at it through
+    EXT_texture_webp; the old view is dropped by the next prune(). Returns
+    one dict per image: {slots, before, after, size, quality} (after is
+    None when the image was kept as it was).
+    """
+    g = glb.gltf
+    stats = []
+    for index, slots in sorted(image_slots(g).items()):
+        image = g.images[index]
+        if image.bufferView is None:
+            continue
+        data = glb.view_bytes(image.bufferView)
+        size = int(budget * max(SLOT_SCALE.get(s, 1.0) for s in slots))
+        color = bool(slots & COLOR_SLOTS)
+        webp, dims, quality = compress_image(data, size, color)
+        entry = {"slots": sorted(slots), "before": len(data), "after": None, "size": list(dims), "quality": quality}
+        stats.append(entry)
+        if len(webp) >= len(data):
+            continue
+
+        image.bufferView = glb.add_view(webp)
+        image.mimeType = "image/webp"
+        entry["after"] = len(webp)
+        for texture in g.textures:
+            ext = (texture.extensions or {}).get(WEBP)
+            if texture.source == index or (ext and ext["source"] == index):
+                texture.extensions = {**(texture.extensions or {}), WEBP: {"source": index}}
+                texture.source = None
+
+    if any(s["after"] is not None for s in stats):
+        for names in (g.extensionsUsed, g.extensionsRequired):
+            if WEBP not in names:
+                names.append(WEBP)
+    return stats
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Dragon Nest Lite - Nine-Slice Frame Extraction
+==============================================
+
+The generated UI frames (minimap frame, skill tree background, skill slot,
+HP/MP bar backgrounds) are full-size bitmaps of 0.9-1.7 MB each,
+although most of their area is a plain edge or centre that only needs to be
+stretched. This stage turns each frame into a compact nine-slice source:
+
+  1. Key out the generator's backdrop: when the image border is one or two
+     flat colours (black, or the grey checkerboard the generator paints for
+     "transparent"), pixels of those colours connected to the border - and
+     to the centre, for hollow frames - become transparent.
+  2. Crop to the remaining content.
+  3. Find the stretchable band on each axis: the columns (rows) around the
+     middle that look like the middle one. Everything before the band is
+     the left (top) slice, everything after it the right (bottom) slice.
+  4. Check the result is usable: both bands must be at least MIN_BAND of
+     their axis, the fixed slices at most MAX_FIXED_SHARE of it, and the
+     on-screen border (slices times CSS_SCALE) at most MAX_BORDER_SHARE of
+     the panel the frame is meant for (FRAME_TARGETS). Frames that fail
+     are skipped.
+  5. Collapse each band to STRIP px and write the result.
+
+ui_dialog_box is not in the default set: the generator painted a scene
+into it, so there is no plain centre to stretch.
+
+Outputs (assets/ui/nineslice/):
+  <name>.png          compact source
+  nineslice.json      { name: { image, width, height, slice: [t, r, b, l],
+                                fill, source, sourceBytes, bytes } }
+  nineslice.css       .nine-<name> classes using border-image; the on-screen
+                      border is the slice size times --nine-scale (default 0.25)
+
+When no frame passes, no outputs are written (stale ones are removed) and
+build.sh deploys nothing. Link nineslice.css from index.html and add the
+classes to the target panels only once frames pass.
+
+Usage:
+  python nine_slice.py                         # Default frame set
+  python nine_slice.py assets/ui/ui_tab_active.png
+
+Requires:
+  pip install Pillow numpy
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:
+    print("ERROR: Required packages not installed.")
+    print("Run: pip install Pillow numpy")
+    sys.exit(1)
+
+from asset_io import save_image_atomic, write_bytes_atomic
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+UI_DIR = PROJECT_ROOT / "assets" / "ui"
+OUTPUT_DIR = UI_DIR / "nineslice"
+MANIFEST_PATH = OUTPUT_DIR / "nineslice.json"
+CSS_PATH = OUTPUT_DIR / "nineslice.css"
+
+# Frame -> (panel it would dress, that panel's size in CSS px; see css/style.css)
+FRAME_TARGETS = {
+    "ui_minimap_frame": ("#minimap", (120, 120)),
+    "ui_skilltree_bg": ("#skill-tree-panel", (1280, 720)),
+    "ui_skill_slot": (".skill-slot", (52, 52)),
+    "ui_hp_bar_bg": ("#player-info .bar", (190, 18)),
+    "ui_mp_bar_bg": ("#player-info .bar", (190, 18)),
+}
+DEFAULT_FRAMES = [f"{name}.png" for name in FRAME_TARGETS]
+
+BORDER = 4               # px of image border sampled for the backdrop palette
+PALETTE_COVERAGE = 0.85  # share of the border the 2 dominant colours must cover
+KEY_TOLERANCE = 18       # max channel distance from a backdrop colour
+OPEN_RADIUS = 2          # opaque details thinner than 2 * this are keying leftovers
+STRIP = 8                # px kept of each stretchable band
+BAND_TOLERANCE = 32.0    # abs difference (0-255) from the reference line ...
+BAND_PERCENTILE = 95     # ... that this share of the line's values stay within
+ANALYSIS_SCALE = 4       # band search runs on a 1/4 size copy
+SEED_RANGE = 0.6         # share of the axis, around the middle, searched for a band
+MIN_BAND = 0.1           # skip frames where either band is shorter than this share of the axis
+MAX_FIXED_SHARE = 0.8    # skip frames whose fixed slices take more of an axis than this
+MAX_BORDER_SHARE = 0.5   # on-screen border may take at most this share of the target panel
+SPECK_SHARE = 0.02       # rows/columns less opaque than this are keying leftovers
+CSS_SCALE = 0.25
+
+
+# ---------------------------------------------------------------------------
+# Backdrop keying
+# ---------------------------------------------------------------------------
+
+def backdrop_palette(rgb: np.ndarray):
+    """The border's two dominant colours, or None if the border is not flat."""
+    b = BORDER
+    border = np.concatenate([rgb[:b].reshape(-1, 3), rgb[-b:].reshape(-1, 3),
+                             rgb[:, :b].reshape(-1, 3), rgb[:, -b:].reshape(-1, 3)])
+    bins, counts = np.unique(border // 8, axis=0, return_counts=True)
+    top = np.argsort(-counts)[:2]
+    if counts[top].sum() < PALETTE_COVERAGE * len(border):
+        return None
+    palette = []
+    for i in top:
+        members = np.all(border // 8 == bins[i], axis=1)
+        palette.append(border[members].mean(axis=0))
+    return np.array(palette)
+
+
+def _flood(candidate: np.ndarray, seed: np.ndarray) -> np.ndarray:
+    """Grow ``seed`` through 4-connected ``candidate`` pixels until stable."""
+    region = seed & candidate
+    while True:
+        grown = region.copy()
+        grown[1:] |= region[:-1]
+        grown[:-1] |= region[1:]
+        grown[:, 1:] |= region[:, :-1]
+        grown[:, :-1] |= region[:, 1:]
+        grown &= candidate
+        if np.array_equal(grown, region):
+            return region
+        region = grown
+
+
+def _shift_all(mask: np.ndarray, radius: int, combine) -> np.ndarray:
+    """Erode (np.logical_and) or dilate (np.logical_or) with a square of ``radius``."""
+    out = mask.copy()
+    padded = np.pad(mask, radius, mode="edge")
+    h, w = mask.shape
+    for dy in range(2 * radius + 1):
+        for dx in range(2 * radius + 1):
+            combine(out, padded[dy:dy + h, dx:dx + w], out=out)
+    return out
+
+
+def key_backdrop(rgb: np.ndarray) -> np.ndarray:
+    """Alpha (uint8) with the backdrop connected to the border/centre cleared."""
+    h, w = rgb.shape[:2]
+    palette = backdrop_palette(rgb)
+    if palette is None:
+        return np.full((h, w), 255, dtype=np.uint8)
+
+    distance = np.abs(rgb[:, :, None, :] - palette[None, None]).max(axis=3).min(axis=2)
+    candidate = distance <= KEY_TOLERANCE
+    seed = np.zeros((h, w), dtype=bool)
+    seed[0], seed[-1], seed[:, 0], seed[:, -1] = True, True, True, True
+    seed[h // 2, w // 2] = True       # hollow frames: the opening shows the backdrop too
+    opaque = ~_flood(candidate, seed)
+    # Opening drops the thin seams between checker squares that escape the key
+    opaque = _shift_all(_shift_all(opaque, OPEN_RADIUS, np.logical_and), OPEN_RADIUS, np.logical_or) & opaque
+    return np.where(opaque, 255, 0).astype(np.uint8)
+
+
+# ---------------------------------------------------------------------------
+# Slicing
+# ---------------------------------------------------------------------------
+
+def stretch_band(lines: np.ndarray):
+    """
+    Longest band of lines (axis 0) that all stay close to one reference line.
+
+    Every line in the middle SEED_RANGE of the axis is tried as the reference
+    and the band grows outwards from it on each side, so an ornament in the
+    middle of an edge does not stop the plain stretch beside it.
+
+    Returns:
+        (start, end) in line indices, end exclusive.
+    """
+    n = len(lines)
+    flat = lines.reshape(n, -1)
+    lo, hi = int(n * (0.5 - SEED_RANGE / 2)), int(n * (0.5 + SEED_RANGE / 2)) + 1
+    best = (n // 2, n // 2 + 1)
+    for seed in range(lo, min(hi, n)):
+        close = np.percentile(np.abs(flat - flat[seed]), BAND_PERCENTILE, axis=1) <= BAND_TOLERANCE
+        start, end = seed, seed + 1
+        while start > 0 and close[start - 1]:
+            start -= 1
+        while end < n and close[end]:
+            end += 1
+        # Prefer the longer band, then the one nearer the middle
+        if (end - start, -abs(seed - n // 2)) > (best[1] - best[0], -abs(sum(best) // 2 - n // 2)):
+            best = (start, end)
+    return best
+
+
+def content_bounds(alpha: np.ndarray):
+    """(y0, y1, x0, x1) of rows/columns with real content, ignoring stray specks."""
+    opaque = alpha > 0
+    rows = np.flatnonzero(opaque.mean(axis=1) > SPECK_SHARE)
+    cols = np.flatnonzero(opaque.mean(axis=0) > SPECK_SHARE)
+    if rows.size == 0 or cols.size == 0:
+        return None
+    return rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+
+
+def find_slices(rgba: np.ndarray):
+    """(top, right, bottom, left) slice sizes in px, or None if nothing stretches."""
+    h, w = rgba.shape[:2]
+    small = np.asarray(Image.fromarray(rgba, "RGBA").resize(
+        (max(1, w // ANALYSIS_SCALE), max(1, h // ANALYSIS_SCALE)), Image.BOX)).astype(np.float32)
+    # Premultiply so colour under transparent pixels does not matter
+    small[..., :3] *= small[..., 3:] / 255.0
+
+    rows = stretch_band(small)
+    cols = stretch_band(small.transpose(1, 0, 2))
+    if (rows[1] - rows[0]) < MIN_BAND * small.shape[0] or (cols[1] - cols[0]) < MIN_BAND * small.shape[1]:
+        return None
+    s = ANALYSIS_SCALE
+    # Map back to full size, keeping the seams one analysis line inside the band
+    top, bottom = (rows[0] + 1) * s, h - max(rows[1] - 1, rows[0] + 1) * s
+    left, right = (cols[0] + 1) * s, w - max(cols[1] - 1, cols[0] + 1) * s
+    return top, right, bottom, left
+
+
+def inset_problem(shape, slices, target):
+    """Why the slices are unusable for ``target`` (selector, (w, h)), or None if they are fine."""
+    h, w = shape[:2]
+    top, right, bottom, left = slices
+    for axis, fixed, size, index in (("vertical", top + bottom, h, 1), ("horizontal", left + right, w, 0)):
+        if fixed > MAX_FIXED_SHARE * size:
+            return f"{fixed} of {size} px fixed on the {axis} axis"
+        if target is not None:
+            selector, box = target
+            border = fixed * CSS_SCALE
+            if border > MAX_BORDER_SHARE * box[index]:
+                return (f"{axis} border of {border:.0f} px at --nine-scale {CSS_SCALE} "
+                        f"does not fit {selector} ({box[index]} px)")
+    return None
+
+
+def compact(rgba: np.ndarray, slices) -> np.ndarray:
+    """Drop all but STRIP px of the stretchable band on both axes."""
+    top, right, bottom, left = slices
+    h, w = rgba.shape[:2]
+    strip_y = min(STRIP, h - top - bottom)
+    strip_x = min(STRIP, w - left - right)
+    mid_y = (top + h - bottom - strip_y) // 2
+    mid_x = (left + w - right - strip_x) // 2
+    rows = np.r_[0:top, mid_y:mid_y + strip_y, h - bottom:h]
+    cols = np.r_[0:left, mid_x:mid_x + strip_x, w - right:w]
+    return rgba[rows][:, cols]
+
+
+def extract(path: Path):
+    """Build the compact nine-slice source for one frame; returns its manifest entry."""
+    with Image.open(path) as img:
+        rgb = np.asarray(img.convert("RGB")).astype(np.int16)
+    alpha = key_backdrop(rgb)
+    bounds = content_bounds(alpha)
+    if bounds is None:
+        print(f"  [SKIP] {path.name}: nothing left after keying the backdrop")
+        return None
+    y0, y1, x0, x1 = bounds
+    rgba = np.dstack([rgb, alpha]).astype(np.uint8)[y0:y1, x0:x1]
+
+    slices = find_slices(rgba)
+    if slices is None:
+        print(f"  [SKIP] {path.name}: no stretchable band found")
+        return None
+    problem = inset_problem(rgba.shape, slices, FRAME_TARGETS.get(path.stem))
+    if problem:
+        print(f"  [SKIP] {path.name}: {problem}")
+        return None
+    top, right, bottom, left = slices
+    out_img = compact(rgba, slices)
+    out = OUTPUT_DIR / path.name
+    save_image_atomic(Image.fromarray(out_img, "RGBA"), out, optimize=True)
+
+    center = rgba[top:rgba.shape[0] - bottom, left:rgba.shape[1] - right, 3]
+    entry = {
+        "image": out.relative_to(PROJECT_ROOT).as_posix(),
+        "width": out_img.shape[1],
+        "height": out_img.shape[0],
+        "slice": [int(top), int(right), int(bottom), int(left)],
+        "fill": bool(center.size and center.mean() > 127),
+        "source": path.relative_to(PROJECT_ROOT).as_posix(),
+        "sourceBytes": path.stat().st_size,
+        "bytes": out.stat().st_size,
+    }
+    keyed = (alpha == 0).mean()
+    print(f"  [SLICED] {path.name}: {rgb.shape[1]}x{rgb.shape[0]} -> {entry['width']}x{entry['height']} "
+          f"slice {entry['slice']}{' fill' if entry['fill'] else ''}, backdrop keyed {keyed:.0%}, "
+          f"{entry['sourceBytes'] / 1024:.0f} KB -> {entry['bytes'] / 1024:.0f} KB")
+    return entry
+
+
+# ---------------------------------------------------------------------------
+# Outputs
+# ---------------------------------------------------------------------------
+
+def frame_css(name: str, entry: dict) -> str:
+    top, right, bottom, left = entry["slice"]
+    widths = " ".join(f"calc({v}px * var(--nine-scale, {CSS_SCALE}))" for v in (top, right, bottom, left))
+    fill = " fill" if entry["fill"] else ""
+    return (f".nine-{name} {{\n"
+            f"    border-style: solid;\n"
+            f"    border-width: {widths};\n"
+            f"    border-image: url('{Path(entry['image']).name}') {top} {right} {bottom} {left}{fill} stretch;\n"
+            f"}}\n")
+
+
+def remove_outputs() -> None:
+    """Delete a previous run's outputs so build.sh does not deploy them."""
+    if not OUTPUT_DIR.exists():
+        return
+    for path in sorted(OUTPUT_DIR.iterdir()):
+        print(f"  [DEL] {path.relative_to(PROJECT_ROOT)}")
+        path.unlink()
+    OUTPUT_DIR.rmdir()
+
+
+def extract_all(paths) -> dict:
+    manifest = {}
+    for path in paths:
+        entry = extract(path)
+        if entry:
+            manifest[path.stem] = entry
+    if not manifest:
+        remove_outputs()
+        return manifest
+    write_bytes_atomic(MANIFEST_PATH, (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+    css = "/* Generated by tools/nine_slice.py - do not edit */\n\n"
+    css += "\n".join(frame_css(name, entry) for name, entry in manifest.items())
+    write_bytes_atomic(CSS_PATH, css.encode("utf-8"))
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Cut UI frames into compact nine-slice sources")
+    parser.add_argument("frames", nargs="*", help="Frame PNGs (default: minimap, skill tree, slot, bars)")
+    args = parser.parse_args()
+
+    paths = [Path(p).resolve() for p in args.frames] or [UI_DIR / name for name in DEFAULT_FRAMES]
+    missing = [p for p in paths if not p.exists()]
+    for p in missing:
+        print(f"  [SKIP] {p.name}: not found")
+    paths = [p for p in paths if p.exists()]
+    if not paths:
+        return 1
+
+    print("=" * 60)
+    print("  Nine-Slice Extraction")
+    print("=" * 60)
+    manifest = extract_all(paths)
+    before = sum(e["sourceBytes"] for e in manifest.values())
+    after = sum(e["bytes"] for e in manifest.values())
+    print(f"\n  Sliced: {len(manifest)}/{len(paths)}  {before / 1024:.0f} KB -> {after / 1024:.0f} KB")
+    if manifest:
+        print(f"  Manifest: {MANIFEST_PATH.relative_to(PROJECT_ROOT)}")
+    else:
+        print("  No usable frames; nothing written")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
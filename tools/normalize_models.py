@@ -0,0 +1,163 @@
+"""
+Dragon Nest Lite - Model Normalization
+
+Used by optimize_models.py. ModelLoader used to do three things to every
+GLB on load: measure it with Box3.setFromObject, move it so it stands
+centred on y = 0, and clamp Meshy's PBR factors (metalness > 0.3 -> 0.1,
+roughness < 0.3 -> 0.5), all by traversing the scene. This step bakes the
+same result into the file:
+
+  - a new root node centres the model on x/z, puts its lowest point on
+    y = 0 and scales it to its targetHeight (read from ModelLoader.js's
+    CHARACTER_MODELS / ENVIRONMENT_MODELS, so the two tables cannot drift;
+    models not listed there are centred at their own size)
+  - metallicFactor / roughnessFactor are clamped like the runtime did;
+    primitives without a material get one, since glTF's default material
+    is fully metallic
+  - the resulting bounds are returned for the manifest, so the runtime
+    knows the model's height without measuring it
+
+Bounds follow Box3.setFromObject exactly: each primitive's bind-pose
+bounding box, its 8 corners transformed by the node's world matrix.
+
+Typical use:
+
+    clamp_materials(glb.gltf)
+    bounds = normalize_scene(glb, target_heights().get(source_path))
+"""
+
+import re
+from pathlib import Path
+
+import numpy as np
+import pygltflib
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+MODEL_LOADER_JS = PROJECT_ROOT / "js" / "utils" / "ModelLoader.js"
+
+# { path: '...', targetHeight: n } and { paths: ['...', ...], targetHeight: n }
+MODEL_DEF = re.compile(r"paths?:\s*(\[[^\]]*\]|'[^']*')\s*,\s*targetHeight:\s*([\d.]+)")
+
+ROOT_NAME = "Normalized"
+MIN_HEIGHT = 0.01            # same guard as ModelLoader._cloneCached
+
+# Meshy writes metallic PBR that looks black without an environment map
+METALNESS_MAX, METALNESS_CLAMPED = 0.3, 0.1
+ROUGHNESS_MIN, ROUGHNESS_CLAMPED = 0.3, 0.5
+
+
+# ---------------------------------------------------------------------------
+# Target heights
+# ---------------------------------------------------------------------------
+
+def target_heights() -> dict:
+    """Source GLB path (relative to the project) -> targetHeight, from ModelLoader.js."""
+    heights = {}
+    for paths, height in MODEL_DEF.findall(MODEL_LOADER_JS.read_text(encoding="utf-8")):
+        for path in re.findall(r"'([^']+)'", paths):
+            heights[path] = float(height)
+    return heights
+
+
+# ---------------------------------------------------------------------------
+# Materials
+# ---------------------------------------------------------------------------
+
+def clamp_materials(gltf: pygltflib.GLTF2) -> int:
+    """Clamp metallic/roughness factors and give bare primitives a material; returns materials changed."""
+    changed = 0
+    for mat in gltf.materials:
+        pbr = mat.pbrMetallicRoughness = mat.pbrMetallicRoughness or pygltflib.PbrMetallicRoughness()
+        metallic = 1.0 if pbr.metallicFactor is None else pbr.metallicFactor
+        roughness = 1.0 if pbr.roughnessFactor is None else pbr.roughnessFactor
+        if metallic > METALNESS_MAX or roughness < ROUGHNESS_MIN:
+            changed += 1
+        if metallic > METALNESS_MAX:
+            pbr.metallicFactor = METALNESS_CLAMPED
+        if roughness < ROUGHNESS_MIN:
+            pbr.roughnessFactor = ROUGHNESS_CLAMPED
+
+    bare = [prim for mesh in gltf.meshes for prim in mesh.primitives if prim.material is None]
+    if bare:
+        gltf.materials.append(pygltflib.Material(
+            pbrMetallicRoughness=pygltflib.PbrMetallicRoughness(metallicFactor=METALNESS_CLAMPED)))
+        for prim in bare:
+            prim.material = len(gltf.materials) - 1
+        changed += 1
+    return changed
+
+
+# ---------------------------------------------------------------------------
+# Transforms
+# ---------------------------------------------------------------------------
+
+def local_matrix(node: pygltflib.Node) -> np.ndarray:
+    """4x4 column-vector matrix of a node (matrix, or T * R * S)."""
+    if node.matrix is not None:
+        return np.array(node.matrix, dtype=np.float64).reshape(4, 4).T
+    x, y, z, w = node.rotation or [0.0, 0.0, 0.0, 1.0]
+    rotation = np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ])
+    out = np.eye(4)
+    out[:3, :3] = rotation * np.array(node.scale or [1.0, 1.0, 1.0])
+    out[:3, 3] = node.translation or [0.0, 0.0, 0.0]
+    return out
+
+
+def world_matrices(gltf: pygltflib.GLTF2) -> dict:
+    """node index -> 4x4 world matrix, for the nodes of the default scene."""
+    out = {}
+    stack = [(index, np.eye(4)) for index in gltf.scenes[gltf.scene or 0].nodes]
+    while stack:
+        index, parent = stack.pop()
+        node = gltf.nodes[index]
+        out[index] = parent @ local_matrix(node)
+        stack += [(child, out[index]) for child in node.children or []]
+    return out
+
+
+def world_bounds(glb) -> tuple:
+    """(min, max) of the default scene as Box3.setFromObject measures it."""
+    g = glb.gltf
+    lo, hi = np.full(3, np.inf), np.full(3, -np.inf)
+    for index, world in world_matrices(g).items():
+        node = g.nodes[index]
+        if node.mesh is None:
+            continue
+        for prim in g.meshes[node.mesh].primitives:
+            positions = glb.read_floats(prim.attributes.POSITION)
+            box = np.array([positions.min(axis=0), positions.max(axis=0)])
+            corners = np.array([[box[i, 0], box[j, 1], box[k, 2], 1.0]
+                                for i in (0, 1) for j in (0, 1) for k in (0, 1)])
+            points = (world @ corners.T).T[:, :3]
+            lo, hi = np.minimum(lo, points.min(axis=0)), np.maximum(hi, points.max(axis=0))
+    return lo, hi
+
+
+def normalize_scene(glb, target_height: float = None) -> dict:
+    """
+    Parent the default scene's roots to a node that stands the model on the
+    origin at ``target_height`` (its own height if None); returns the new
+    bounds as {min, max}.
+    """
+    g = glb.gltf
+    lo, hi = world_bounds(glb)
+    height = max(hi[1] - lo[1], MIN_HEIGHT)
+    scale = target_height / height if target_height else 1.0
+    offset = -np.array([(lo[0] + hi[0]) / 2, lo[1], (lo[2] + hi[2]) / 2]) * scale
+
+    scene = g.scenes[g.scene or 0]
+    g.nodes.append(pygltflib.Node(
+        name=ROOT_NAME, children=list(scene.nodes), translation=offset.tolist(), scale=[scale] * 3))
+    scene.nodes = [len(g.nodes) - 1]
+    return {
+        "min": [round(float(v), 5) for v in lo * scale + offset],
+        "max": [round(float(v), 5) for v in hi * scale + offset],
+    }
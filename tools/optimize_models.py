@@ -0,0 +1,870 @@
+#!/usr/bin/env python3
+"""
+Dragon Nest Lite - GLB Optimizer
+================================
+
+Meshy writes every model with float32 positions, normals, UVs and skin
+weights, 32-bit indices on small meshes and animation data scattered over
+shared buffer views. This stage writes two lighter copies of every GLB
+under assets/models, one per geometry codec, benchmarks them and records
+which codec ships:
+
+  assets/models/optimized/meshopt/<same relative path>.glb
+  assets/models/optimized/draco/<same relative path>.glb
+  assets/models/optimized/models.json
+    { codec, models: { source_path: { sourceBytes, sourceGeometryBytes, textures, bounds,
+                                      lods, animations, meshopt: variant, draco: variant } } }
+      variant = { path, bytes, geometryBytes, geometryGzipBytes, decodeMs,
+                  positionError, positionRms, normalError, uvError }
+  assets/models/optimized/benchmark.md        (the same numbers as a table)
+
+Both variants start the same way. Per file, the model is stood on the
+origin at its ModelLoader targetHeight and Meshy's metallic/roughness
+factors are clamped (normalize_models.py); ``bounds`` is the result, which
+ModelLoader uses instead of measuring the scene. Characters, NPCs and
+environment models then get an MSFT_lod chain (model_lods.py); ``lods`` is
+{ triangles, error } per level, error in metres (null without LODs).
+Animation clips lose redundant and constant keyframes and get int16
+rotations (model_animations.py); ``animations`` has each clip's keyframe
+bytes before / after and its largest error per bone. Per primitive, LOD
+levels included:
+  - vertices are reordered for the GPU post-transform cache and fetch
+    locality; vertices no triangle uses are dropped
+  - TEXCOORD_n / TANGENT are stripped when the primitive's material does not
+    sample them
+and per file, accessors with identical data are merged.
+
+meshopt: KHR_mesh_quantization (positions to uint16 with the dequantization
+folded into the node transform, static meshes only, since skinned positions
+must stay in bind space; normals to int8; UVs in [0, 1] to uint16; skin
+weights to uint8), then EXT_meshopt_compression on every geometry and
+animation bufferView. Every compressed view is decoded again before
+writing.
+
+draco: KHR_draco_mesh_compression per primitive (positions 14 bits,
+normals 10, UVs 12, joints and weights lossless); animation data is stored
+as is, the extension only covers mesh geometry.
+
+Embedded images are downscaled to the model category's budget and
+re-encoded as WebP (model_textures.py), identically in both variants; the
+manifest records each image under ``textures``. Benchmark columns:
+  textures       embedded image bytes before -> after
+  animation      keyframe bytes before -> after, largest bone error
+  geometryBytes  file bytes excluding embedded images
+  geometryGzip   the same after gzip -9, i.e. over an HTTP-compressed wire
+                 (meshopt output is designed to be gzipped; Draco barely is)
+  decodeMs       median time of the native decoder (meshoptimizer / Draco,
+                 the libraries three.js runs as JS/WASM) over all of the
+                 file's compressed data: a proxy for client decode cost
+  position*      vertex displacement as a fraction of the mesh's
+                 bounding-box diagonal (max and RMS)
+  normalError    largest normal deviation in degrees
+  uvError        largest UV deviation
+
+Variants (and manifest entries) of source GLBs that no longer exist are
+deleted on every run, so build.sh never ships an orphan.
+
+SHIP_CODEC (or --ship) selects the variant build.sh copies and ModelLoader
+loads; it is written to the manifest as ``codec``.
+
+Usage:
+  python optimize_models.py               # Build missing / outdated copies
+  python optimize_models.py --force
+  python optimize_models.py --ship draco
+  python optimize_models.py assets/models/boss_dragon.glb
+
+Requires:
+  pip install pygltflib numpy meshoptimizer DracoPy Pillow
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+try:
+    import DracoPy
+    import meshoptimizer
+    import numpy as np
+    import pygltflib
+except ImportError:
+    print("ERROR: Required packages not installed.")
+    print("Run: pip install pygltflib numpy meshoptimizer DracoPy Pillow")
+    sys.exit(1)
+
+from asset_io import write_bytes_atomic
+from glb import ARRAY_BUFFER, DTYPE_COMPONENTS, ELEMENT_ARRAY_BUFFER, SIZE_TYPES, Glb, to_float
+from model_animations import reduce_animations
+from model_lods import build_lods
+from model_textures import compress_textures, model_category, texture_budget
+from normalize_models import clamp_materials, normalize_scene, target_heights
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+MODELS_DIR = PROJECT_ROOT / "assets" / "models"
+OUT_DIR = MODELS_DIR / "optimized"
+MANIFEST_PATH = OUT_DIR / "models.json"
+BENCHMARK_PATH = OUT_DIR / "benchmark.md"
+
+# Globs under assets/models (_backup_unrigged/ only feeds rig_models.py)
+SOURCE_GLOBS = ["*.glb"]
+
+CODECS = ["meshopt", "draco"]
+# Shipped variant. Draco geometry is about half the gzipped bytes of meshopt
+# here (benchmark.md) and three.js decodes it in worker threads, so its
+# slower decode does not block the main thread.
+SHIP_CODEC = "draco"
+
+MESHOPT = "EXT_meshopt_compression"
+QUANTIZATION = "KHR_mesh_quantization"
+MESHOPT_VERTEX_VERSION = 0      # three.js r168 MeshoptDecoder reads v0 only
+MESHOPT_INDEX_VERSION = 1
+MAX_STRIDE = 256                # EXT_meshopt_compression limit
+
+DRACO = "KHR_draco_mesh_compression"
+DRACO_LEVEL = 7                 # gltf-pipeline's default
+DRACO_BITS = {"POSITION": 14, "NORMAL": 10, "TEXCOORD_0": 12}
+DRACO_SOURCE_ID = 127           # generic attribute carrying source vertex ids, error measurement only
+
+DECODE_RUNS = 5
+
+
+# ---------------------------------------------------------------------------
+# Vertex order
+# ---------------------------------------------------------------------------
+
+def reorder_vertices(indices: np.ndarray, attributes: dict):
+    """
+    Optimize triangle order for the vertex cache, then vertex order for fetch.
+
+    Returns (indices, attributes) with unreferenced vertices removed.
+    """
+    vertex_count = len(next(iter(attributes.values())))
+    source = indices.astype(np.uint32)
+    cached = np.empty_like(source)
+    meshoptimizer.optimize_vertex_cache(cached, source, len(source), vertex_count)
+
+    remap = np.empty(vertex_count, dtype=np.uint32)
+    unique = meshoptimizer.optimize_vertex_fetch_remap(remap, cached, len(cached), vertex_count)
+    keep = remap != np.iinfo(np.uint32).max
+    out = {}
+    for name, values in attributes.items():
+        moved = np.empty((unique,) + values.shape[1:], dtype=values.dtype)
+        moved[remap[keep]] = values[keep]
+        out[name] = moved
+    return remap[cached], out
+
+
+# ---------------------------------------------------------------------------
+# Quantization
+# ---------------------------------------------------------------------------
+
+def quantize_positions(positions: np.ndarray, lo: np.ndarray, scale: float) -> np.ndarray:
+    return np.clip(np.rint((positions - lo) / scale), 0, 65535).astype(np.uint16)
+
+
+def quantize_unit(values: np.ndarray, dtype) -> np.ndarray:
+    """Normalized-integer encoding of values in [-1, 1] (signed) or [0, 1] (unsigned)."""
+    info = np.iinfo(dtype)
+    return np.clip(np.rint(values * info.max), info.min, info.max).astype(dtype)
+
+
+def quantize_weights(weights: np.ndarray) -> np.ndarray:
+    """uint8 normalized skin weights; the rounding remainder goes to each vertex's largest weight."""
+    q = np.rint(np.clip(weights, 0.0, 1.0) * 255).astype(np.int32)
+    total = q.sum(axis=1)
+    rows = np.nonzero(total > 0)[0]
+    q[rows, weights[rows].argmax(axis=1)] += 255 - total[rows]
+    return np.clip(q, 0, 255).astype(np.uint8)
+
+
+def _rotate(q, v: np.ndarray) -> np.ndarray:
+    """Rotate ``v`` by the glTF quaternion ``q`` (x, y, z, w)."""
+    u, w = np.asarray(q[:3], dtype=np.float64), float(q[3])
+    t = 2.0 * np.cross(u, v)
+    return v + w * t + np.cross(u, t)
+
+
+def fold_dequantization(node: pygltflib.Node, offset: np.ndarray, scale: float) -> None:
+    """Make ``node`` map uint16 positions back to the original space (p * scale + offset)."""
+    if node.matrix:
+        m = np.asarray(node.matrix, dtype=np.float64).reshape(4, 4).T
+        d = np.diag([scale, scale, scale, 1.0])
+        d[:3, 3] = offset
+        node.matrix = (m @ d).T.flatten().tolist()
+        return
+    t = np.asarray(node.translation or [0.0, 0.0, 0.0], dtype=np.float64)
+    r = node.rotation or [0.0, 0.0, 0.0, 1.0]
+    s = np.asarray(node.scale or [1.0, 1.0, 1.0], dtype=np.float64)
+    node.translation = (t + _rotate(r, s * offset)).tolist()
+    node.scale = (s * scale).tolist()
+
+
+# ---------------------------------------------------------------------------
+# Error metrics
+# ---------------------------------------------------------------------------
+
+def new_errors() -> dict:
+    return {"position": [], "normal": [], "uv": []}
+
+
+def record_error(errors: dict, name: str, source: np.ndarray, decoded: np.ndarray, diagonal: float) -> None:
+    """Add per-vertex errors of one decoded attribute against its source values."""
+    source = source.astype(np.float64)
+    decoded = decoded.astype(np.float64)
+    if name == "POSITION":
+        errors["position"].append(np.linalg.norm(decoded - source, axis=1) / max(diagonal, 1e-12))
+    elif name == "NORMAL":
+        # Meshy leaves a few zero normals; they have no direction to lose
+        length = np.linalg.norm(source, axis=1, keepdims=True)
+        valid = length[:, 0] > 1e-6
+        a = source[valid] / length[valid]
+        b = decoded[valid] / np.maximum(np.linalg.norm(decoded[valid], axis=1, keepdims=True), 1e-12)
+        errors["normal"].append(np.degrees(np.arccos(np.clip((a * b).sum(axis=1), -1.0, 1.0))))
+    elif name.startswith("TEXCOORD_"):
+        errors["uv"].append(np.abs(decoded - source).max(axis=1))
+
+
+def summarize_errors(errors: dict) -> dict:
+    def joined(key):
+        return np.concatenate(errors[key]) if errors[key] else np.zeros(1)
+    position = joined("position")
+    return {
+        "positionError": float(f"{position.max():.3e}"),
+        "positionRms": float(f"{np.sqrt((position ** 2).mean()):.3e}"),
+        "normalError": round(float(joined("normal").max()), 3),
+        "uvError": float(f"{joined('uv').max():.3e}"),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Primitives
+# ---------------------------------------------------------------------------
+
+def used_texcoords(gltf: pygltflib.GLTF2, prim) -> set:
+    """TEXCOORD sets the primitive's material samples, or None to keep them all."""
+    if prim.material is None:
+        return None
+    mat = gltf.materials[prim.material]
+    pbr = mat.pbrMetallicRoughness
+    slots = [mat.normalTexture, mat.occlusionTexture, mat.emissiveTexture]
+    if pbr is not None:
+        slots += [pbr.baseColorTexture, pbr.metallicRoughnessTexture]
+    return {slot.texCoord or 0 for slot in slots if slot is not None}
+
+
+def quantizable_meshes(gltf: pygltflib.GLTF2) -> dict:
+    """mesh index -> node whose transform can absorb position dequantization."""
+    users = {}
+    for node in gltf.nodes:
+        if node.mesh is not None:
+            users.setdefault(node.mesh, []).append(node)
+    out = {}
+    for mesh_index, nodes in users.items():
+        node = nodes[0]
+        mesh = gltf.meshes[mesh_index]
+        if (len(nodes) == 1 and node.skin is None and not node.children
+                and not any(p.targets for p in mesh.primitives)):
+            out[mesh_index] = node
+    return out
+
+
+def prepare_mesh(glb: Glb, mesh) -> list:
+    """
+    Read, strip and reorder every primitive of a mesh.
+
+    Returns [(prim, {name: values}, {name: normalized}, indices or None)].
+    """
+    g = glb.gltf
+    primitives = []
+    for prim in mesh.primitives:
+        names = [n for n, v in vars(prim.attributes).items() if isinstance(v, int)]
+        keep_uv = used_texcoords(g, prim)
+        if keep_uv is not None:
+            names = [n for n in names if not (n.startswith("TEXCOORD_") and int(n[9:]) not in keep_uv)]
+            if g.materials[prim.material].normalTexture is None:
+                names = [n for n in names if n != "TANGENT"]
+        attributes = {n: glb.read_accessor(getattr(prim.attributes, n)) for n in names}
+        normalized = {n: bool(g.accessors[getattr(prim.attributes, n)].normalized) for n in names}
+        indices = glb.read_accessor(prim.indices) if prim.indices is not None else None
+        if indices is not None and prim.mode in (None, 4):
+            indices, attributes = reorder_vertices(indices, attributes)
+        primitives.append((prim, attributes, normalized, indices))
+    return primitives
+
+
+def _diagonal(primitives: list) -> float:
+    positions = np.vstack([a["POSITION"] for _, a, _, _ in primitives]).astype(np.float64)
+    return float(np.linalg.norm(positions.max(axis=0) - positions.min(axis=0)))
+
+
+def _index_accessor(glb: Glb, indices: np.ndarray, vertex_count: int) -> int:
+    dtype = np.uint16 if vertex_count <= 65535 else np.uint32
+    return glb.add_accessor(indices.astype(dtype), target=ELEMENT_ARRAY_BUFFER, acc_type="SCALAR")
+
+
+# ---------------------------------------------------------------------------
+# meshopt variant: quantization
+# ---------------------------------------------------------------------------
+
+def quantize_mesh(glb: Glb, primitives: list, node, errors: dict) -> None:
+    """Write quantized attributes for every prepared primitive of one mesh."""
+    diagonal = _diagonal(primitives)
+
+    # One dequantization transform per mesh, so it fits every primitive
+    fold = None
+    if node is not None:
+        all_positions = np.vstack([a["POSITION"] for _, a, _, _ in primitives]).astype(np.float64)
+        lo = all_positions.min(axis=0)
+        extent = float((all_positions.max(axis=0) - lo).max())
+        fold = (lo, extent / 65535 if extent > 0 else 1.0)
+        fold_dequantization(node, *fold)
+
+    for prim, attributes, normalized, indices in primitives:
+        prim.attributes = pygltflib.Attributes()
+        for name, values in attributes.items():
+            index = add_quantized(glb, name, values, normalized[name], fold)
+            record_error(errors, name, to_float(values, normalized[name]), _dequantized(glb, index, fold), diagonal)
+            setattr(prim.attributes, name, index)
+        if indices is not None:
+            prim.indices = _index_accessor(glb, indices, len(attributes["POSITION"]))
+
+
+def add_quantized(glb: Glb, name: str, values: np.ndarray, normalized: bool, fold) -> int:
+    """Append one vertex attribute, quantized where KHR_mesh_quantization allows."""
+    if name == "POSITION":
+        if fold is None:
+            return glb.add_accessor(values.astype(np.float32), target=ARRAY_BUFFER, bounds=True)
+        lo, scale = fold
+        return glb.add_accessor(quantize_positions(values.astype(np.float64), lo, scale),
+                                target=ARRAY_BUFFER, bounds=True)
+
+    if values.dtype != np.float32:
+        # Already integer (JOINTS_0, quantized input): keep as is
+        return glb.add_accessor(values, normalized=normalized, target=ARRAY_BUFFER)
+    if name == "NORMAL":
+        unit = values / np.maximum(np.linalg.norm(values, axis=1, keepdims=True), 1e-12)
+        return glb.add_accessor(quantize_unit(unit, np.int8), normalized=True, target=ARRAY_BUFFER)
+    if name == "TANGENT":
+        return glb.add_accessor(quantize_unit(values, np.int8), normalized=True, target=ARRAY_BUFFER)
+    if name.startswith("TEXCOORD_") and values.min() >= 0.0 and values.max() <= 1.0:
+        return glb.add_accessor(quantize_unit(values, np.uint16), normalized=True, target=ARRAY_BUFFER)
+    if name.startswith("WEIGHTS_"):
+        return glb.add_accessor(quantize_weights(values), normalized=True, target=ARRAY_BUFFER, acc_type="VEC4")
+    return glb.add_accessor(values, target=ARRAY_BUFFER)
+
+
+def _dequantized(glb: Glb, index: int, fold) -> np.ndarray:
+    """Attribute values as the client sees them, in the source space."""
+    values = glb.read_floats(index)
+    acc = glb.gltf.accessors[index]
+    if fold is not None and acc.componentType == DTYPE_COMPONENTS[np.dtype(np.uint16)] and not acc.normalized:
+        lo, scale = fold
+        return values * scale + lo
+    return values
+
+
+def is_quantized(glb: Glb) -> bool:
+    """True if any vertex attribute is stored in a type core glTF does not allow there."""
+    float_only = ("POSITION", "NORMAL", "TANGENT", "TEXCOORD_")
+    for mesh in glb.gltf.meshes:
+        for prim in mesh.primitives:
+            for name, index in vars(prim.attributes).items():
+                if (isinstance(index, int) and name.startswith(float_only)
+                        and glb.gltf.accessors[index].componentType != 5126):
+                    return True
+    return False
+
+
+# ---------------------------------------------------------------------------
+# draco variant
+# ---------------------------------------------------------------------------
+
+def draco_mesh(glb: Glb, primitives: list, errors: dict) -> None:
+    """Replace every prepared triangle primitive with a KHR_draco_mesh_compression one."""
+    diagonal = _diagonal(primitives)
+    for prim, attributes, normalized, indices in primitives:
+        if indices is None or prim.mode not in (None, 4):
+            prim.attributes = pygltflib.Attributes()
+            for name, values in attributes.items():
+                setattr(prim.attributes, name, glb.add_accessor(
+                    values, normalized=normalized[name], target=ARRAY_BUFFER, bounds=name == "POSITION"))
+            continue
+
+        floats = {n: to_float(v, normalized[n]) if normalized[n] else v for n, v in attributes.items()}
+        faces = indices.reshape(-1, 3).astype(np.uint32)
+        encoded = _draco_encode(floats, faces)
+        mesh = DracoPy.decode(encoded)
+        ids = _draco_ids(mesh, floats)
+
+        # Same quantization grid plus the source vertex id of every decoded vertex
+        measured = DracoPy.decode(_draco_encode(floats, faces, with_source_ids=True))
+        source = measured.get_attribute_by_unique_id(DRACO_SOURCE_ID)["data"][:, 0].astype(np.int64)
+        measured_ids = _draco_ids(measured, floats)
+        for name in floats:
+            decoded = _draco_values(measured, measured_ids[name])
+            record_error(errors, name, to_float(attributes[name], normalized[name])[source], decoded, diagonal)
+
+        vertex_count = len(mesh.points)
+        prim.attributes = pygltflib.Attributes()
+        for name, values in floats.items():
+            acc = pygltflib.Accessor(
+                componentType=DTYPE_COMPONENTS[np.dtype(np.float32) if values.dtype.kind == "f" else values.dtype],
+                count=vertex_count,
+                type=SIZE_TYPES[values.shape[1]],
+            )
+            if name == "POSITION":
+                acc.min = mesh.points.min(axis=0).tolist()
+                acc.max = mesh.points.max(axis=0).tolist()
+            glb.gltf.accessors.append(acc)
+            setattr(prim.attributes, name, len(glb.gltf.accessors) - 1)
+        glb.gltf.accessors.append(pygltflib.Accessor(
+            componentType=5123 if vertex_count <= 65535 else 5125,
+            count=len(mesh.faces) * 3,
+            type="SCALAR",
+        ))
+        prim.indices = len(glb.gltf.accessors) - 1
+        prim.extensions = {DRACO: {"bufferView": glb.add_view(encoded), "attributes": ids}}
+
+
+def _draco_encode(attributes: dict, faces: np.ndarray, with_source_ids: bool = False) -> bytes:
+    generic = {}
+    for index, name in enumerate(n for n in attributes if n not in DRACO_BITS):
+        generic[index] = attributes[name].reshape(len(attributes[name]), -1)
+    if with_source_ids:
+        generic[DRACO_SOURCE_ID] = np.arange(len(attributes["POSITION"]), dtype=np.uint32)[:, None]
+    normals = attributes.get("NORMAL")
+    uvs = attributes.get("TEXCOORD_0")
+    return DracoPy.encode(
+        attributes["POSITION"].astype(np.float32), faces,
+        quantization_bits=DRACO_BITS["POSITION"],
+        compression_level=DRACO_LEVEL,
+        normals=None if normals is None else normals.astype(np.float64),
+        normal_quantization_bits=DRACO_BITS["NORMAL"],
+        tex_coord=None if uvs is None else uvs.astype(np.float64),
+        tex_coord_quantization_bits=DRACO_BITS["TEXCOORD_0"],
+        generic_attributes=generic or None,
+    )
+
+
+# Draco attribute types (draco::GeometryAttribute::Type)
+_DRACO_TYPES = {"POSITION": 0, "NORMAL": 1, "TEXCOORD_0": 3}
+
+
+def _draco_ids(mesh, attributes: dict) -> dict:
+    """glTF attribute name -> Draco unique id, as the encoder assigned them."""
+    by_type = {a["attribute_type"]: a["unique_id"] for a in mesh.attributes}
+    generic = [n for n in attributes if n not in DRACO_BITS]
+    ids = {name: by_type[_DRACO_TYPES[name]] for name in attributes if name in DRACO_BITS}
+    ids.update({name: index for index, name in enumerate(generic)})
+    return ids
+
+
+def _draco_values(mesh, unique_id: int) -> np.ndarray:
+    return mesh.get_attribute_by_unique_id(unique_id)["data"]
+
+
+# ---------------------------------------------------------------------------
+# Accessors
+# ---------------------------------------------------------------------------
+
+def dedupe_accessors(glb: Glb) -> int:
+    """Point references to identical accessors at one copy; returns how many were merged."""
+    g = glb.gltf
+    first, remap = {}, {}
+    for index, acc in enumerate(g.accessors):
+        if acc.bufferView is None or acc.sparse is not None:
+            continue
+        key = (acc.componentType, acc.type, bool(acc.normalized), acc.count,
+               glb.read_accessor(index).tobytes())
+        remap[index] = first.setdefault(key, index)
+    for owner, name in list(glb.accessor_refs()):
+        index = Glb._get(owner, name)
+        Glb._set(owner, name, remap.get(index, index))
+    glb.prune()
+    return sum(1 for old, new in remap.items() if old != new)
+
+
+# ---------------------------------------------------------------------------
+# EXT_meshopt_compression
+# ---------------------------------------------------------------------------
+
+def _view_modes(glb: Glb) -> dict:
+    """bufferView -> (meshopt mode, accessor) for every view the codec can take."""
+    g = glb.gltf
+    triangles = {p.indices for m in g.meshes for p in m.primitives
+                 if p.indices is not None and p.mode in (None, 4)}
+    modes = {}
+    for index, acc in enumerate(g.accessors):
+        if acc.bufferView is None:
+            continue
+        if index in triangles and acc.count % 3 == 0:
+            modes[acc.bufferView] = ("TRIANGLES", acc)
+        else:
+            modes[acc.bufferView] = ("ATTRIBUTES", acc)
+    return modes
+
+
+def meshopt_compress(glb: Glb) -> None:
+    """
+    Compress every accessor bufferView in place. Compressed data lives in
+    buffer 0 (the GLB binary chunk); the views move to a fallback buffer 1
+    without data, as EXT_meshopt_compression specifies.
+    """
+    g = glb.gltf
+    glb.repack()
+    modes = _view_modes(glb)
+    blob, fallback = bytearray(), 0
+    compressed = False
+    for index, view in enumerate(g.bufferViews):
+        data = glb.view_bytes(index)
+        blob += b"\0" * (-len(blob) % 4)
+        encoded = None
+        if index in modes:
+            mode, acc = modes[index]
+            encoded, stride, count = _encode(mode, acc, view, data)
+        if encoded is None or len(encoded) >= len(data):
+            view.byteOffset = len(blob)
+            blob += data
+            continue
+
+        view.extensions = {MESHOPT: {
+            "buffer": 0, "byteOffset": len(blob), "byteLength": len(encoded),
+            "byteStride": stride, "count": count, "mode": mode,
+        }}
+        blob += encoded
+        fallback += -fallback % 4
+        view.buffer = 1
+        view.byteOffset = fallback
+        fallback += view.byteLength
+        compressed = True
+
+    glb.blob = bytes(blob)
+    if compressed:
+        g.buffers = [pygltflib.Buffer(byteLength=len(blob)),
+                     pygltflib.Buffer(byteLength=fallback, extensions={MESHOPT: {"fallback": True}})]
+        _require(g, MESHOPT)
+
+
+def _encode(mode: str, acc, view, data: bytes):
+    """(encoded bytes or None, byteStride, count), checked by decoding it again."""
+    if mode == "TRIANGLES":
+        if acc.componentType not in (5123, 5125):
+            return None, 0, 0
+        indices = np.frombuffer(data, dtype=np.uint16 if acc.componentType == 5123 else np.uint32)
+        stride = indices.itemsize
+        count = len(indices)
+        encoded = meshoptimizer.encode_index_buffer(indices.astype(np.uint32), count, int(indices.max()) + 1)
+        # The decoder writes packed stride-byte indices into its buffer
+        decoded = meshoptimizer.decode_index_buffer(count, stride, encoded).view(indices.dtype)[:count]
+        if not np.array_equal(_canonical_triangles(decoded), _canonical_triangles(indices)):
+            raise RuntimeError("meshopt index round trip mismatch")
+        return encoded, stride, count
+
+    stride = view.byteStride or len(data) // acc.count
+    if stride % 4 or stride > MAX_STRIDE or len(data) != stride * acc.count:
+        return None, 0, 0
+    encoded = meshoptimizer.encode_vertex_buffer(np.frombuffer(data, dtype=np.uint8), acc.count, stride)
+    # No dtype= here: that mode of the bindings allocates too small an output
+    decoded = meshoptimizer.decode_vertex_buffer(acc.count, stride, encoded)
+    if decoded.tobytes() != data:
+        raise RuntimeError("meshopt vertex round trip mismatch")
+    return encoded, stride, acc.count
+
+
+def _canonical_triangles(indices: np.ndarray) -> np.ndarray:
+    """Triangles rotated to start at their smallest index; the codec may rotate them, keeping winding."""
+    tris = indices.reshape(-1, 3)
+    shift = tris.argmin(axis=1)
+    cols = (shift[:, None] + np.arange(3)) % 3
+    return np.take_along_axis(tris, cols, axis=1)
+
+
+def _require(gltf: pygltflib.GLTF2, extension: str) -> None:
+    for names in (gltf.extensionsUsed, gltf.extensionsRequired):
+        if extension not in names:
+            names.append(extension)
+
+
+# ---------------------------------------------------------------------------
+# Decode cost
+# ---------------------------------------------------------------------------
+
+def decode_jobs(glb: Glb) -> list:
+    """One callable per compressed block in a written GLB, running the native decoder on it."""
+    jobs = []
+    for view in glb.gltf.bufferViews:
+        ext = (view.extensions or {}).get(MESHOPT)
+        if ext:
+            start = ext.get("byteOffset", 0)
+            data = glb.blob[start:start + ext["byteLength"]]
+            if ext["mode"] == "TRIANGLES":
+                jobs.append(lambda e=ext, d=data: meshoptimizer.decode_index_buffer(e["count"], e["byteStride"], d))
+            else:
+                jobs.append(lambda e=ext, d=data: meshoptimizer.decode_vertex_buffer(e["count"], e["byteStride"], d))
+    for mesh in glb.gltf.meshes:
+        for prim in mesh.primitives:
+            ext = (prim.extensions or {}).get(DRACO)
+            if ext:
+                jobs.append(lambda d=glb.view_bytes(ext["bufferView"]): DracoPy.decode(d))
+    return jobs
+
+
+def decode_ms(glb: Glb) -> float:
+    """Median wall time in ms to decode everything compressed in ``glb``."""
+    jobs = decode_jobs(glb)
+    times = []
+    for _ in range(DECODE_RUNS):
+        start = time.perf_counter()
+        for job in jobs:
+            job()
+        times.append(time.perf_counter() - start)
+    return round(float(np.median(times)) * 1000, 3)
+
+
+# ---------------------------------------------------------------------------
+# Files
+# ---------------------------------------------------------------------------
+
+def geometry_bytes(glb: Glb, total: int) -> int:
+    """File bytes excluding embedded images."""
+    g = glb.gltf
+    images = sum(g.bufferViews[i.bufferView].byteLength for i in g.images if i.bufferView is not None)
+    return total - images
+
+
+def geometry_gzip_bytes(glb: Glb, data: bytes) -> int:
+    """gzip -9 size of a written GLB with its embedded images cut out."""
+    g = glb.gltf
+    bin_start = 20 + int.from_bytes(data[12:16], "little") + 8
+    spans = sorted((g.bufferViews[i.bufferView].byteOffset or 0, g.bufferViews[i.bufferView].byteLength)
+                   for i in g.images if i.bufferView is not None)
+    parts, pos = [], 0
+    for offset, length in spans:
+        parts.append(data[pos:bin_start + offset])
+        pos = bin_start + offset + length
+    parts.append(data[pos:])
+    return len(gzip.compress(b"".join(parts), compresslevel=9, mtime=0))
+
+
+def optimize_file(src: Path, dst: Path, codec: str, target_height: float = None) -> dict:
+    """Write one codec's variant of one GLB; returns its manifest entry."""
+    glb = Glb.load(src)
+    g = glb.gltf
+    g.extensionsUsed = g.extensionsUsed or []
+    g.extensionsRequired = g.extensionsRequired or []
+    relative = src.relative_to(MODELS_DIR).as_posix()
+    clamp_materials(g)
+    bounds = normalize_scene(glb, target_height)
+    lods = build_lods(glb, bounds["max"][1] - bounds["min"][1], model_category(relative))
+    animations = reduce_animations(glb)
+
+    errors = new_errors()
+    folds = quantizable_meshes(g)
+    for mesh_index, mesh in enumerate(g.meshes):
+        primitives = prepare_mesh(glb, mesh)
+        if codec == "meshopt":
+            quantize_mesh(glb, primitives, folds.get(mesh_index), errors)
+        else:
+            draco_mesh(glb, primitives, errors)
+
+    if codec == "meshopt" and is_quantized(glb):
+        _require(g, QUANTIZATION)
+    if codec == "draco":
+        _require(g, DRACO)
+    textures = compress_textures(glb, texture_budget(relative))
+
+    glb.prune()
+    dedupe_accessors(glb)
+    if codec == "meshopt":
+        glb.split_views()
+        meshopt_compress(glb)
+        size = glb.save(dst, repack=False)
+    else:
+        size = glb.save(dst)
+
+    return {
+        "path": dst.relative_to(PROJECT_ROOT).as_posix(),
+        "bytes": size,
+        "geometryBytes": geometry_bytes(glb, size),
+        "geometryGzipBytes": geometry_gzip_bytes(glb, dst.read_bytes()),
+        "decodeMs": decode_ms(glb),
+        **summarize_errors(errors),
+        "textures": textures,
+        "bounds": bounds,
+        "lods": lods,
+        "animations": animations,
+    }
+
+
+def source_models() -> list[Path]:
+    paths = []
+    for pattern in SOURCE_GLOBS:
+        paths += sorted(MODELS_DIR.glob(pattern))
+    return paths
+
+
+def remove_orphans(sources: set) -> None:
+    """Delete variant GLBs under OUT_DIR whose source (path relative to MODELS_DIR) is gone."""
+    for codec in CODECS:
+        codec_dir = OUT_DIR / codec
+        for path in sorted(codec_dir.rglob("*.glb")):
+            if path.relative_to(codec_dir) not in sources:
+                path.unlink()
+                print(f"  [DEL] {path.relative_to(PROJECT_ROOT).as_posix()}: source removed")
+        for folder in sorted((d for d in codec_dir.rglob("*") if d.is_dir()), reverse=True):
+            if not any(folder.iterdir()):
+                folder.rmdir()
+
+
+def optimize_models(paths: list[Path] = None, force: bool = False, ship: str = SHIP_CODEC) -> dict:
+    """Build every codec variant of every source GLB (or ``paths``); returns the manifest."""
+    meshoptimizer.encode_vertex_version(MESHOPT_VERTEX_VERSION)
+    meshoptimizer.encode_index_version(MESHOPT_INDEX_VERSION)
+    models = {}
+    if MANIFEST_PATH.exists():
+        models = json.loads(MANIFEST_PATH.read_text(encoding="utf-8")).get("models", {})
+    heights = target_heights()
+    # Forget models that are no longer sources, and delete their variants
+    sources = {p.relative_to(PROJECT_ROOT).as_posix() for p in source_models()}
+    models = {key: entry for key, entry in models.items() if key in sources}
+    remove_orphans({Path(key).relative_to("assets/models") for key in sources})
+
+    for src in paths or source_models():
+        relative = src.relative_to(MODELS_DIR)
+        key = src.relative_to(PROJECT_ROOT).as_posix()
+        outputs = {codec: OUT_DIR / codec / relative for codec in CODECS}
+        if (not force and all(codec in models.get(key, {}) for codec in CODECS)
+                and all(p.exists() and p.stat().st_mtime >= src.stat().st_mtime for p in outputs.values())):
+            print(f"  [SKIP] {relative.as_posix()}: up to date")
+            continue
+
+        source = Glb.load(src)
+        entry = {"sourceBytes": src.stat().st_size}
+        entry["sourceGeometryBytes"] = geometry_bytes(source, entry["sourceBytes"])
+        for codec, dst in outputs.items():
+            entry[codec] = optimize_file(src, dst, codec, heights.get(key))
+            entry["textures"] = entry[codec].pop("textures")
+            entry["bounds"] = entry[codec].pop("bounds")
+            entry["lods"] = entry[codec].pop("lods")
+            entry["animations"] = entry[codec].pop("animations")
+        models[key] = entry
+        print(f"  [OPT] {relative.as_posix()}: geometry {entry['sourceGeometryBytes'] / 1024:.0f} KB -> "
+              + ", ".join(f"{c} {entry[c]['geometryBytes'] / 1024:.0f} KB ({entry[c]['decodeMs']:.2f} ms, "
+                          f"error {entry[c]['positionError']:.1e})" for c in CODECS)
+              + "".join(f", texture {t['before'] / 1024:.0f} -> {(t['after'] or t['before']) / 1024:.0f} KB"
+                        for t in entry["textures"])
+              + (f", LODs {'/'.join(str(t) for t in entry['lods']['triangles'])} tris" if entry["lods"] else "")
+              + (f", animation {sum(a['before'] for a in entry['animations'].values()) / 1024:.1f} -> "
+                 f"{sum(a['after'] for a in entry['animations'].values()) / 1024:.1f} KB"
+                 if entry["animations"] else ""))
+
+    manifest = {"codec": ship, "models": dict(sorted(models.items()))}
+    write_bytes_atomic(MANIFEST_PATH, (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+    write_bytes_atomic(BENCHMARK_PATH, benchmark_table(manifest).encode("utf-8"))
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def benchmark_table(manifest: dict) -> str:
+    """Markdown table of the per-model codec comparison in ``manifest``."""
+    columns = ["Model", "Source geometry KB", "Textures KB (source -> shipped)", "LOD triangles", "LOD error mm",
+               "Animation KB (source -> shipped)", "Animation err (° / mm)"]
+    for codec in CODECS:
+        columns += [f"{codec} KB", f"{codec} gzip KB", f"{codec} decode ms", f"{codec} pos err (max / rms)",
+                    f"{codec} normal err °", f"{codec} UV err"]
+    lines = [
+        "# Geometry codec benchmark",
+        "",
+        "Written by tools/optimize_models.py. Codec sizes exclude embedded images (identical in",
+        "both variants, WebP at the model category's budget) and include the LOD levels, whose",
+        "triangle counts and errors (metres at the model's target height) are listed, and the reduced",
+        "animation keyframes (largest bone error over all clips; per-bone errors are in models.json);",
+        "gzip is the size over an HTTP-compressed wire; decode ms is the median",
+        "native decoder time; position error is relative to the mesh's bounding-box diagonal.",
+        f"Shipped codec: **{manifest['codec']}**.",
+        "",
+        "| " + " | ".join(columns) + " |",
+        "|" + "|".join(["---"] + ["---:"] * (len(columns) - 1)) + "|",
+    ]
+    totals = {"source": 0, "textures": [0, 0], "animations": [0, 0], **{c: [0, 0, 0.0] for c in CODECS}}
+    for key, entry in manifest["models"].items():
+        before = sum(t["before"] for t in entry["textures"])
+        after = sum(t["after"] or t["before"] for t in entry["textures"])
+        row = [Path(key).relative_to("assets/models").as_posix(), f"{entry['sourceGeometryBytes'] / 1024:.1f}",
+               f"{before / 1024:.0f} -> {after / 1024:.0f}" if before else ""]
+        lods = entry["lods"]
+        row += [" / ".join(str(t) for t in lods["triangles"]), " / ".join(f"{e * 1000:.1f}" for e in lods["error"][1:])
+                ] if lods else ["", ""]
+        clips = entry["animations"].values()
+        row += [f"{sum(a['before'] for a in clips) / 1024:.1f} -> {sum(a['after'] for a in clips) / 1024:.1f}",
+                f"{max(a['rotationError'] for a in clips):.2f} / {max(a['translationError'] for a in clips) * 1000:.2f}"
+                ] if clips else ["", ""]
+        totals["animations"][0] += sum(a["before"] for a in clips)
+        totals["animations"][1] += sum(a["after"] for a in clips)
+        totals["source"] += entry["sourceGeometryBytes"]
+        totals["textures"][0] += before
+        totals["textures"][1] += after
+        for codec in CODECS:
+            v = entry[codec]
+            row += [f"{v['geometryBytes'] / 1024:.1f}", f"{v['geometryGzipBytes'] / 1024:.1f}", f"{v['decodeMs']:.2f}",
+                    f"{v['positionError']:.1e} / {v['positionRms']:.1e}",
+                    f"{v['normalError']:.2f}", f"{v['uvError']:.1e}"]
+            totals[codec][0] += v["geometryBytes"]
+            totals[codec][1] += v["geometryGzipBytes"]
+            totals[codec][2] += v["decodeMs"]
+        lines.append("| " + " | ".join(row) + " |")
+
+    total_row = ["**Total**", f"{totals['source'] / 1024:.1f}",
+                 f"{totals['textures'][0] / 1024:.0f} -> {totals['textures'][1] / 1024:.0f}", "", "",
+                 f"{totals['animations'][0] / 1024:.1f} -> {totals['animations'][1] / 1024:.1f}", ""]
+    for codec in CODECS:
+        total_row += [f"{totals[codec][0] / 1024:.1f}", f"{totals[codec][1] / 1024:.1f}",
+                      f"{totals[codec][2]:.2f}", "", "", ""]
+    lines.append("| " + " | ".join(total_row) + " |")
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Build meshopt and Draco variants of the GLB models")
+    parser.add_argument("models", nargs="*", help="GLB files under assets/models (default: all)")
+    parser.add_argument("--force", action="store_true", help="Rebuild variants that are up to date")
+    parser.add_argument("--ship", choices=CODECS, default=SHIP_CODEC,
+                        help=f"Codec the game loads and build.sh copies (default {SHIP_CODEC})")
+    args = parser.parse_args()
+
+    paths = [Path(p).resolve() for p in args.models]
+    if not (paths or source_models()):
+        print(f"No models found in {MODELS_DIR}")
+        return 1
+
+    print("=" * 60)
+    print("  GLB Optimizer")
+    print("=" * 60)
+    manifest = optimize_models(paths, args.force, args.ship)
+    before = sum(m["sourceBytes"] for m in manifest["models"].values())
+    print(f"\n  Models: {len(manifest['models'])}  Source: {before / 1_000_000:.2f} MB")
+    for codec in CODECS:
+        after = sum(m[codec]["bytes"] for m in manifest["models"].values())
+        wire = sum(m[codec]["geometryGzipBytes"] for m in manifest["models"].values())
+        ms = sum(m[codec]["decodeMs"] for m in manifest["models"].values())
+        print(f"  {codec:8s} {after / 1_000_000:.2f} MB, geometry gzipped {wire / 1024:.0f} KB, decode {ms:.1f} ms"
+              f"{'  <- shipped' if codec == manifest['codec'] else ''}")
+    print(f"  Benchmark: {BENCHMARK_PATH.relative_to(PROJECT_ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+Dragon Nest Lite - Generated Output Checks
+
+Fast acceptance checks that run inside the generation loops, before an
+output is written, so a bad result is regenerated immediately instead of
+being found later by hand:
+
+  - images: content coverage, sprite-sheet cell occupancy and separation,
+    real transparency (vs. a painted checkerboard / opaque background)
+  - audio: duration vs. the requested length, clipping, silence ratio
+
+Every check returns ``(ok, reason)``; ``reason`` is empty when accepted.
+Image checks take a PIL image; pixel work is vectorized with NumPy.
+
+MP3 duration is read from the frame headers and needs nothing extra.
+Clipping and silence need decoded PCM, which uses the optional ``miniaudio``
+package (pip install miniaudio); without it those two checks are skipped.
+"""
+
+import struct
+
+import numpy as np
+
+try:
+    import miniaudio
+except ImportError:
+    miniaudio = None
+
+# ---------------------------------------------------------------------------
+# Thresholds
+# ---------------------------------------------------------------------------
+
+# Images
+CONTENT_CONTRAST = 32            # luminance difference from the border median
+ICON_MIN_COVERAGE = 0.04         # fraction of an icon that must be content
+ICON_CELL_MAX_OFFSET = 0.12      # content centroid distance from centre (fraction of cell)
+ICON_CELL_MAX_EDGE = 0.20        # content fraction allowed along any one cell edge
+ICON_GRID_MAX_ASPECT = 1.05      # long/short side of a grid sheet that can be squared by resizing
+ICON_GRID_MIN_CELL = 256         # px per cell; the largest icon variant (resize_icons.ICON_SIZES)
+
+SHEET_CONTRAST = 12              # effect frames fade out, so dim content still counts
+SHEET_MAX_BACKGROUND = 48        # border luminance; sheets are requested on pure black
+SHEET_CELL_MIN_COVERAGE = 0.005  # a cell below this is empty
+SHEET_MIN_OCCUPIED = 12          # of 16; the last frames of a fade-out may be empty
+SHEET_MAX_GUTTER = 0.15          # content fraction allowed on the lines between cells
+
+ALPHA_MIN_TRANSPARENT = 0.05     # fraction of pixels with alpha < 128
+ADDITIVE_MAX_BACKGROUND = 24     # opaque textures are fine on black (additive blending)
+
+# Audio
+AUDIO_MIN_DURATION_RATIO = 0.85  # of the requested duration
+AUDIO_MAX_CLIPPED = 0.005        # fraction of frames at full scale
+AUDIO_MAX_SILENCE = 0.90         # fraction of 20 ms windows below SILENCE_DBFS
+SILENCE_DBFS = -50.0
+SILENCE_WINDOW = 0.02
+
+
+# ---------------------------------------------------------------------------
+# Image helpers
+# ---------------------------------------------------------------------------
+
+def _luma(img) -> np.ndarray:
+    return np.asarray(img.convert("L"), dtype=np.int16)
+
+
+def _border_width(gray: np.ndarray) -> int:
+    return max(2, min(gray.shape) // 32)
+
+
+def _border_median(gray: np.ndarray) -> float:
+    b = _border_width(gray)
+    ring = np.concatenate([gray[:b].ravel(), gray[-b:].ravel(),
+                           gray[:, :b].ravel(), gray[:, -b:].ravel()])
+    return float(np.median(ring))
+
+
+def content_mask(img, contrast: int = CONTENT_CONTRAST):
+    """
+    Boolean mask of pixels that differ from the background.
+
+    Returns:
+        (mask, background_luminance)
+    """
+    gray = _luma(img)
+    bg = _border_median(gray)
+    return np.abs(gray - bg) > contrast, bg
+
+
+# ---------------------------------------------------------------------------
+# Image checks
+# ---------------------------------------------------------------------------
+
+def check_icon(img, min_coverage: float = ICON_MIN_COVERAGE):
+    """Reject icons that are (almost) all background."""
+    mask, _ = content_mask(img)
+    coverage = mask.mean()
+    if coverage < min_coverage:
+        return False, f"mostly background (coverage {coverage:.1%})"
+    return True, ""
+
+
+def check_icon_cell(img):
+    """Validate one icon sliced from a grid sheet: present, centred, not cut by the grid."""
+    mask, _ = content_mask(img)
+    h, w = mask.shape
+    coverage = mask.mean()
+    if coverage < ICON_MIN_COVERAGE:
+        return False, f"empty cell (coverage {coverage:.1%})"
+
+    # Icons cut by a misaligned grid spill across the cell edges
+    b = _border_width(mask)
+    edge = max(mask[:b].mean(), mask[-b:].mean(), mask[:, :b].mean(), mask[:, -b:].mean())
+    if edge > ICON_CELL_MAX_EDGE:
+        return False, f"content runs off the cell edge ({edge:.0%} of one side)"
+
+    # Content centroid relative to the cell centre
+    ys, xs = np.nonzero(mask)
+    cx = xs.mean() / w - 0.5
+    cy = ys.mean() / h - 0.5
+    offset = max(abs(cx), abs(cy))
+    if offset > ICON_CELL_MAX_OFFSET:
+        return False, f"off-centre by {offset:.0%} of the cell"
+
+    return True, ""
+
+
+def check_icon_grid(img, grid: int, min_cell: int = ICON_GRID_MIN_CELL):
+    """Check that an icon grid sheet is (close to) square with cells of at least ``min_cell`` px."""
+    w, h = img.size
+    aspect = max(w, h) / min(w, h)
+    if aspect > ICON_GRID_MAX_ASPECT:
+        return False, f"sheet is {w}x{h}, not square"
+    cell = min(w, h) // grid
+    if cell < min_cell:
+        return False, f"{cell} px cells are smaller than {min_cell} px"
+    return True, ""
+
+
+def check_sprite_sheet(img, rows: int = 4, cols: int = 4):
+    """Check that a flipbook sheet is on black, with separated, mostly occupied cells."""
+    gray = _luma(img)
+    bg = _border_median(gray)
+    mask = np.abs(gray - bg) > SHEET_CONTRAST
+    if bg > SHEET_MAX_BACKGROUND:
+        return False, f"background is not black (luminance {bg:.0f})"
+
+    h, w = mask.shape
+    ys = np.linspace(0, h, rows + 1).round().astype(int)
+    xs = np.linspace(0, w, cols + 1).round().astype(int)
+
+    # Per-cell coverage in one pass: sum the mask over row bands, then column bands
+    row_sums = np.add.reduceat(mask, ys[:-1], axis=0)
+    cell_sums = np.add.reduceat(row_sums, xs[:-1], axis=1)
+    cell_area = np.outer(np.diff(ys), np.diff(xs))
+    occupied = int(((cell_sums / cell_area) >= SHEET_CELL_MIN_COVERAGE).sum())
+    if occupied < SHEET_MIN_OCCUPIED:
+        return False, f"only {occupied}/{rows * cols} cells have content"
+
+    # Frames that touch or overlap leave solid content on the lines between
+    # cells (faint glow bleeding across a boundary is tolerated)
+    solid = np.abs(gray - bg) > CONTENT_CONTRAST
+    band = max(2, min(h, w) // 128)
+    gutters = [solid[:, x - band:x + band].mean() for x in xs[1:-1]]
+    gutters += [solid[y - band:y + band].mean() for y in ys[1:-1]]
+    worst = max(gutters, default=0.0)
+    if worst > SHEET_MAX_GUTTER:
+        return False, f"cells are not separated ({worst:.0%} content on a cell boundary)"
+
+    return True, ""
+
+
+def check_transparency(img):
+    """
+    Accept real alpha, or an opaque texture on black (usable with additive
+    blending). Opaque grey/white/checkerboard backgrounds are rejected.
+    """
+    if "A" in img.getbands():
+        alpha = np.asarray(img.getchannel("A"))
+        transparent = (alpha < 128).mean()
+        if transparent >= ALPHA_MIN_TRANSPARENT:
+            return True, ""
+
+    bg = _border_median(_luma(img))
+    if bg <= ADDITIVE_MAX_BACKGROUND:
+        return True, ""
+    return False, f"no transparency and an opaque background (luminance {bg:.0f})"
+
+
+# ---------------------------------------------------------------------------
+# Audio
+# ---------------------------------------------------------------------------
+
+# MPEG audio header tables: bitrate (kbps) by [version is MPEG-1][index],
+# sample rate by version id and index
+_MP3_BITRATES = {
+    True: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0),
+    False: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0),
+}
+_MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),   # MPEG-2.5
+}
+
+
+def mp3_duration(data) -> float:
+    """
+    Approximate duration in seconds from the Layer III frame headers (no
+    decoding). Encoder delay/padding is included, so it can read a few tens
+    of milliseconds long.
+    """
+    view = memoryview(data)
+    size = view.nbytes
+    pos = 0
+    if size >= 10 and bytes(view[:3]) == b"ID3":
+        tag = view[6:10]
+        pos = 10 + ((tag[0] << 21) | (tag[1] << 14) | (tag[2] << 7) | tag[3])
+
+    seconds = 0.0
+    first = True
+    while pos + 4 <= size:
+        header, = struct.unpack(">I", view[pos:pos + 4])
+        version = (header >> 19) & 3
+        layer = (header >> 17) & 3
+        bitrate_index = (header >> 12) & 15
+        rate_index = (header >> 10) & 3
+        if ((header >> 21) & 0x7FF) != 0x7FF or version == 1 or layer != 1 \
+                or bitrate_index in (0, 15) or rate_index == 3:
+            pos += 1  # not a frame header; resync
+            continue
+        mpeg1 = version == 3
+        bitrate = _MP3_BITRATES[mpeg1][bitrate_index] * 1000
+        sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+        samples = 1152 if mpeg1 else 576
+        padding = (header >> 9) & 1
+        frame_size = samples // 8 * bitrate // sample_rate + padding
+        # A leading Xing/Info frame carries encoder metadata, not audio
+        frame = bytes(view[pos:pos + min(frame_size, 64)])
+        if not (first and (b"Xing" in frame or b"Info" in frame)):
+            seconds += samples / sample_rate
+        first = False
+        pos += frame_size
+    return seconds
+
+
+def decode_pcm(data):
+    """Decode MP3 bytes to a float32 (frames, channels) array, or None without miniaudio."""
+    if miniaudio is None:
+        return None, 0
+    decoded = miniaudio.decode(bytes(data), output_format=miniaudio.SampleFormat.FLOAT32)
+    samples = np.asarray(decoded.samples, dtype=np.float32).reshape(-1, decoded.nchannels)
+    return samples, decoded.sample_rate
+
+
+def check_audio(data, expected_seconds=None):
+    """Check an MP3 payload for truncation, clipping and silence."""
+    duration = mp3_duration(data)
+    if duration <= 0:
+        return False, "no MP3 frames in response"
+    if expected_seconds and duration < expected_seconds * AUDIO_MIN_DURATION_RATIO:
+        return False, f"too short ({duration:.2f}s, requested {expected_seconds}s)"
+
+    samples, sample_rate = decode_pcm(data)
+    if samples is None or not len(samples):
+        return True, ""
+
+    peaks = np.abs(samples).max(axis=1)
+    clipped = (peaks >= 0.999).mean()
+    if clipped > AUDIO_MAX_CLIPPED:
+        return False, f"clipping ({clipped:.2%} of samples at full scale)"
+
+    window = max(1, int(sample_rate * SILENCE_WINDOW))
+    count = len(samples) // window
+    if count:
+        power = (samples[:count * window] ** 2).mean(axis=1).reshape(count, window).mean(axis=1)
+        silent = (power < 10 ** (SILENCE_DBFS / 10)).mean()
+        if silent > AUDIO_MAX_SILENCE:
+            return False, f"mostly silent ({silent:.0%} below {SILENCE_DBFS:.0f} dBFS)"
+
+    return True, ""
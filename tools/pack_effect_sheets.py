@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Dragon Nest Lite - Effect Sheet Trimmer / Packer
+================================================
+
+EffectManager used to assume every sheet is a 4x4 grid of full cells and
+drew the whole cell every frame, although most cells are largely empty
+(transparent once un-matted by unmatte_effects.py). This stage crops each
+frame to its content bounds, shelf-packs the crops into a smaller sheet and
+records where each frame went:
+
+  assets/textures/effects/packed/fx_xxx_sheet.png
+  assets/textures/effects/packed/sheets.json
+
+sheets.json is keyed by the path of the sheet that was packed (the
+premultiplied copy, which is what EffectManager lists). Per frame it stores the
+packed rect (x, y, w, h in px, y down), the size of the crop relative to the
+original cell (so the quad shrinks with it) and a pivot in THREE.Sprite.center
+convention that keeps the original cell centre at the sprite position.
+Frames with no content are null (the sprite is hidden for that frame).
+EffectManager falls back to the grid sheet for sheets not listed.
+
+Only sheets with an alpha channel are packed: the premultiplied copies from
+unmatte_effects.py (sheet_sources()), so run that first.
+generate_images.py --effects runs both stages automatically.
+
+Usage:
+  python pack_effect_sheets.py
+  python pack_effect_sheets.py --cols 4 --rows 4
+
+Requires:
+  pip install Pillow numpy
+"""
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:
+    print("ERROR: Required packages not installed.")
+    print("Run: pip install Pillow numpy")
+    sys.exit(1)
+
+from asset_io import save_image_atomic, write_bytes_atomic
+from unmatte_effects import sheet_sources
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+EFFECTS_DIR = PROJECT_ROOT / "assets" / "textures" / "effects"
+PACKED_DIR = EFFECTS_DIR / "packed"
+MANIFEST_PATH = PACKED_DIR / "sheets.json"
+
+GRID = (4, 4)             # cols, rows of the generated sheets
+ALPHA_THRESHOLD = 8       # alpha at or below this counts as empty (< 3% emission)
+TRIM_MARGIN = 1           # px kept around the content (bilinear footprint)
+GUTTER = 2                # transparent px between packed frames
+BLOCK = 4                 # sheet dimensions are rounded up to this (KTX2 blocks)
+MAX_ASPECT = 2            # keep sheets roughly square (texture size limits, cache locality)
+
+
+# ---------------------------------------------------------------------------
+# Trimming
+# ---------------------------------------------------------------------------
+
+def content_box(alpha: np.ndarray):
+    """(x0, y0, x1, y1) of texels above ALPHA_THRESHOLD plus TRIM_MARGIN, or None."""
+    mask = alpha > ALPHA_THRESHOLD
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if rows.size == 0:
+        return None
+    h, w = alpha.shape
+    return (max(cols[0] - TRIM_MARGIN, 0), max(rows[0] - TRIM_MARGIN, 0),
+            min(cols[-1] + 1 + TRIM_MARGIN, w), min(rows[-1] + 1 + TRIM_MARGIN, h))
+
+
+def trim_frames(sheet: np.ndarray, cols: int, rows: int):
+    """Split an HxWx4 sheet into cells and crop each; yields (crop or None, box)."""
+    cell_h, cell_w = sheet.shape[0] // rows, sheet.shape[1] // cols
+    for index in range(cols * rows):
+        row, col = divmod(index, cols)
+        cell = sheet[row * cell_h:(row + 1) * cell_h, col * cell_w:(col + 1) * cell_w]
+        box = content_box(cell[..., 3])
+        if box is None:
+            yield None, None
+        else:
+            x0, y0, x1, y1 = box
+            yield cell[y0:y1, x0:x1], box
+
+
+# ---------------------------------------------------------------------------
+# Packing
+# ---------------------------------------------------------------------------
+
+def shelf_pack(sizes, width: int):
+    """
+    Place (w, h) rects on shelves of a sheet ``width`` px wide, tallest first.
+
+    Returns:
+        (positions by input index, total height)
+    """
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+    positions = [None] * len(sizes)
+    x = y = shelf_h = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > width and x > 0:
+            y += shelf_h + GUTTER
+            x = shelf_h = 0
+        positions[i] = (x, y)
+        x += w + GUTTER
+        shelf_h = max(shelf_h, h)
+    return positions, y + shelf_h
+
+
+def round_up(value: int, step: int = BLOCK) -> int:
+    return -(-value // step) * step
+
+
+def best_layout(sizes):
+    """Try a range of sheet widths and keep the squarish one with the smallest area."""
+    widest = max(w for w, _ in sizes)
+    area = sum((w + GUTTER) * (h + GUTTER) for w, h in sizes)
+    candidates = []
+    for width in range(widest, max(widest, int(math.sqrt(area) * 2)) + 1, BLOCK):
+        positions, height = shelf_pack(sizes, width)
+        candidates.append((round_up(width), round_up(height), positions))
+    squarish = [c for c in candidates if max(c[0], c[1]) <= MAX_ASPECT * min(c[0], c[1])]
+    return min(squarish or candidates, key=lambda c: c[0] * c[1])
+
+
+def pack_sheet(path: Path, cols: int, rows: int):
+    """
+    Trim and pack one sheet.
+
+    Returns:
+        The sheets.json entry, or None if the sheet has no alpha channel.
+    """
+    with Image.open(path) as img:
+        if "A" not in img.getbands():
+            print(f"  [SKIP] {path.name}: no alpha channel (run unmatte_effects.py first)")
+            return None
+        sheet = np.asarray(img.convert("RGBA"))
+    cell_h, cell_w = sheet.shape[0] // rows, sheet.shape[1] // cols
+
+    frames = list(trim_frames(sheet, cols, rows))
+    crops = [(i, crop) for i, (crop, _) in enumerate(frames) if crop is not None]
+    if not crops:
+        print(f"  [SKIP] {path.name}: every frame is empty")
+        return None
+    sheet_w, sheet_h, positions = best_layout([(c.shape[1], c.shape[0]) for _, c in crops])
+
+    canvas = np.zeros((sheet_h, sheet_w, 4), dtype=np.uint8)
+    frame_entries = [None] * len(frames)
+    for (index, crop), (x, y) in zip(crops, positions):
+        h, w = crop.shape[:2]
+        canvas[y:y + h, x:x + w] = crop
+        x0, y0, _, _ = frames[index][1]
+        frame_entries[index] = {
+            "x": x, "y": y, "w": w, "h": h,
+            # Crop size relative to the original cell: the sprite quad scale
+            "scale": [round(w / cell_w, 5), round(h / cell_h, 5)],
+            # Where the original cell centre lies in the crop (0..1, y up)
+            "pivot": [round((cell_w / 2 - x0) / w, 5), round(1 - (cell_h / 2 - y0) / h, 5)],
+        }
+
+    out = PACKED_DIR / path.name
+    save_image_atomic(Image.fromarray(canvas, "RGBA"), out, optimize=True)
+    fill = sum(c.shape[0] * c.shape[1] for _, c in crops) / (cell_w * cell_h * len(frames))
+    print(f"  [PACKED] {path.name}: {sheet.shape[1]}x{sheet.shape[0]} -> {sheet_w}x{sheet_h} "
+          f"({sheet_w * sheet_h / (sheet.shape[0] * sheet.shape[1]):.0%} of the texels), "
+          f"quads cover {fill:.0%} of the old cells, {len(crops)}/{len(frames)} frames non-empty")
+    return {
+        "image": out.relative_to(PROJECT_ROOT).as_posix(),
+        "width": sheet_w,
+        "height": sheet_h,
+        "frames": frame_entries,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def pack_all_sheets(cols: int = GRID[0], rows: int = GRID[1]) -> dict:
+    """Pack every sheet (premultiplied copy where there is one) and rewrite sheets.json."""
+    manifest = {}
+    for path in sheet_sources():
+        entry = pack_sheet(path, cols, rows)
+        if entry:
+            manifest[path.relative_to(PROJECT_ROOT).as_posix()] = entry
+    write_bytes_atomic(MANIFEST_PATH, (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trim and repack effect sprite sheets")
+    parser.add_argument("--cols", type=int, default=GRID[0], help="Columns in the source sheets")
+    parser.add_argument("--rows", type=int, default=GRID[1], help="Rows in the source sheets")
+    args = parser.parse_args()
+
+    sheets = sheet_sources()
+    if not sheets:
+        print(f"No sheets found in {EFFECTS_DIR}")
+        return 1
+
+    print("=" * 60)
+    print("  Effect Sheet Packing")
+    print("=" * 60)
+    manifest = pack_all_sheets(args.cols, args.rows)
+    print(f"\n  Packed: {len(manifest)}/{len(sheets)}  Manifest: {MANIFEST_PATH.relative_to(PROJECT_ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Dragon Nest Lite - Gemini Prompt Style Preambles
+
+Many Gemini prompts wrap a short task-specific description in the same
+style text (ICON_PREFIX/ICON_SUFFIX, EFFECT_SHEET_SUFFIX, the character
+conversion preamble). A StylePreamble names that shared text once; a prompt
+mode turns a description into the request to send:
+
+  - InlinePrompts (the default) rebuilds the full prompt string locally
+    (prefix + description + suffix), exactly as the scripts did before
+    preambles existed.
+  - SystemInstructionPrompts (--style-instruction) sends only the
+    description, with the preamble as the request's system instruction.
+    The model sees the same prompt either way.
+
+Gemini only caches content of at least a few thousand tokens (explicitly
+via cached contents, or implicitly for repeated prefixes), and every
+preamble here is under 100 tokens, so neither mode saves input tokens.
+
+Typical use:
+
+    prompts = SystemInstructionPrompts()
+    text, config = prompts.prepare(SKILL_ICON_STYLE, description)
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+# ---------------------------------------------------------------------------
+# Style preambles
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class StylePreamble:
+    """Style text shared by every prompt of one category."""
+    name: str
+    prefix: str = ""
+    suffix: str = ""
+
+    def inline(self, description: str) -> str:
+        """The full prompt as one string."""
+        return self.prefix + description + self.suffix
+
+    def instruction(self) -> str:
+        """System instruction telling the model how to wrap each description."""
+        return (
+            "Each request contains only the subject description. "
+            f"Render every request exactly as: {self.prefix}<subject description>{self.suffix}"
+        )
+
+
+# ---------------------------------------------------------------------------
+# Prompt modes
+# ---------------------------------------------------------------------------
+
+class InlinePrompts:
+    """Default: prompts are composed locally and sent whole."""
+
+    def prepare(self, preamble: Optional[StylePreamble], description: str):
+        """
+        Returns:
+            (text, config) - config holds extra GenerateContentConfig fields
+            (always empty here).
+        """
+        if preamble is None:
+            return description, {}
+        return preamble.inline(description), {}
+
+
+class SystemInstructionPrompts(InlinePrompts):
+    """Sends the style preamble as a system instruction and only the description as the prompt."""
+
+    def prepare(self, preamble: Optional[StylePreamble], description: str):
+        if preamble is None:
+            return description, {}
+        return description, {"system_instruction": preamble.instruction()}
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Dragon Nest Lite - UI Palette Quantization
+==========================================
+
+Most UI art (bar fills, slot borders, tabs, buttons, nine-slice frames) is
+flat-shaded but saved as 24/32-bit PNG of up to 1.5 MB. This stage writes
+an 8-bit palettized copy of each file to assets/ui/palettized/ (same
+relative path) when the result stays close enough to the original, and
+reports the bytes saved per file. The truecolour masters are never
+modified: they stay the source for nine_slice.py and encode_images.py, and
+a copy that no longer passes is removed.
+
+No page loads the ui_*.png art yet, so build.sh does not deploy the copies
+and assets/ui/palettized/ is git-ignored; wire both up together once the
+UI uses the images.
+
+Palette: median cut (Pillow) seeds a vectorized k-means over a pixel sample
+in RGBA space, colour premultiplied by alpha so transparent texels do not
+pull centres. Every pixel is then mapped to its nearest centre; with
+--dither, opaque images that miss the threshold are retried with
+Floyd-Steinberg error diffusion.
+
+A file is converted only if all of these hold:
+  - luma SSIM (and alpha SSIM, for RGBA) >= SSIM_THRESHOLD
+  - PSNR over all channels >= PSNR_THRESHOLD
+  - the palettized PNG is smaller than the original
+
+Run it after nine_slice.py so the nine-slice sources are palettized too;
+inputs that are already palettized are skipped.
+
+Usage:
+  python quantize_ui.py                    # ui_*.png and nineslice/*.png
+  python quantize_ui.py --dry-run          # Report only
+  python quantize_ui.py --dither           # Retry failures with dithering
+  python quantize_ui.py assets/ui/ui_tab_active.png
+
+Requires:
+  pip install Pillow numpy
+"""
+
+import argparse
+import io
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:
+    print("ERROR: Required packages not installed.")
+    print("Run: pip install Pillow numpy")
+    sys.exit(1)
+
+from asset_io import write_bytes_atomic
+from encode_images import ssim
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+UI_DIR = PROJECT_ROOT / "assets" / "ui"
+OUTPUT_DIR = UI_DIR / "palettized"
+DEFAULT_GLOBS = ["ui_*.png", "nineslice/*.png"]
+
+COLORS = 256
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE = 200_000      # pixels used to fit the palette
+ASSIGN_CHUNK = 65_536        # pixels per nearest-centre batch
+SSIM_THRESHOLD = 0.98
+PSNR_THRESHOLD = 40.0        # dB
+
+
+# ---------------------------------------------------------------------------
+# Palette
+# ---------------------------------------------------------------------------
+
+def _to_features(pixels: np.ndarray) -> np.ndarray:
+    """Nx4 uint8 RGBA -> float32 features with colour premultiplied by alpha."""
+    f = pixels.astype(np.float32)
+    f[:, :3] *= f[:, 3:] / 255.0
+    return f
+
+
+def nearest(features: np.ndarray, centres: np.ndarray) -> np.ndarray:
+    """Index of the nearest centre for every feature row, in batches."""
+    c_norm = (centres ** 2).sum(axis=1)
+    out = np.empty(len(features), dtype=np.int32)
+    for start in range(0, len(features), ASSIGN_CHUNK):
+        batch = features[start:start + ASSIGN_CHUNK]
+        # |x - c|^2 without the |x|^2 term, which does not change the argmin
+        out[start:start + ASSIGN_CHUNK] = np.argmin(c_norm[None, :] - 2.0 * batch @ centres.T, axis=1)
+    return out
+
+
+def fit_palette(img: Image.Image, colors: int = COLORS) -> np.ndarray:
+    """K-means palette (colors x 4, premultiplied features) seeded by median cut."""
+    rgba = np.asarray(img.convert("RGBA")).reshape(-1, 4)
+    seed = img.convert("RGB").quantize(colors, method=Image.Quantize.MEDIANCUT)
+    seed_rgb = np.asarray(seed.getpalette()[:colors * 3], dtype=np.float32).reshape(-1, 3)
+    centres = np.hstack([seed_rgb, np.full((len(seed_rgb), 1), 255.0, dtype=np.float32)])
+    if img.mode == "RGBA":
+        # Give transparency a centre of its own; k-means spreads the rest
+        centres[-1] = 0.0
+
+    rng = np.random.default_rng(0)
+    sample = rgba[rng.choice(len(rgba), min(KMEANS_SAMPLE, len(rgba)), replace=False)]
+    features = _to_features(sample)
+    for _ in range(KMEANS_ITERATIONS):
+        labels = nearest(features, centres)
+        sums = np.zeros_like(centres)
+        np.add.at(sums, labels, features)
+        counts = np.bincount(labels, minlength=len(centres)).astype(np.float32)
+        used = counts > 0
+        centres[used] = sums[used] / counts[used, None]
+    return centres
+
+
+def palette_image(img: Image.Image, centres: np.ndarray, dither: bool) -> Image.Image:
+    """Map ``img`` onto the palette as a mode P image (with palette alpha for RGBA)."""
+    alpha = np.clip(centres[:, 3:], 1e-3, 255.0)
+    straight = np.where(centres[:, 3:] > 0, centres[:, :3] * 255.0 / alpha, 0.0)
+    pal_rgb = np.clip(np.rint(straight), 0, 255).astype(np.uint8)
+    pal_a = np.clip(np.rint(centres[:, 3]), 0, 255).astype(np.uint8)
+
+    if dither and img.mode == "RGB":
+        pal = Image.new("P", (1, 1))
+        pal.putpalette(pal_rgb.flatten().tolist())
+        return img.quantize(palette=pal, dither=Image.Dither.FLOYDSTEINBERG)
+
+    labels = nearest(_to_features(np.asarray(img.convert("RGBA")).reshape(-1, 4)), centres)
+    out = Image.fromarray(labels.reshape(img.height, img.width).astype(np.uint8), "P")
+    if img.mode == "RGBA":
+        out.putpalette(np.hstack([pal_rgb, pal_a[:, None]]).flatten().tolist(), rawmode="RGBA")
+    else:
+        out.putpalette(pal_rgb.flatten().tolist())
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+
+def _planes(img: Image.Image):
+    """(premultiplied RGBA float64, luma over mid-grey) for scoring."""
+    rgba = img.convert("RGBA")
+    grey = Image.new("RGBA", rgba.size, (128, 128, 128, 255))
+    luma = np.asarray(Image.alpha_composite(grey, rgba).convert("L"), dtype=np.float64)
+    return _to_features(np.asarray(rgba).reshape(-1, 4)).astype(np.float64), luma
+
+
+def fidelity(original: Image.Image, candidate: Image.Image):
+    """(SSIM, PSNR) of a palettized candidate against the original."""
+    ref, ref_luma = _planes(original)
+    got, luma = _planes(candidate)
+    channels = 4 if original.mode == "RGBA" else 3
+    mse = ((ref[:, :channels] - got[:, :channels]) ** 2).mean()
+    psnr = 99.0 if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+    score = ssim(ref_luma, luma)
+    if original.mode == "RGBA":
+        shape = (original.height, original.width)
+        score = min(score, ssim(ref[:, 3].reshape(shape), got[:, 3].reshape(shape)))
+    return score, psnr
+
+
+def png_bytes(img: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Conversion
+# ---------------------------------------------------------------------------
+
+def output_path(path: Path) -> Path:
+    """Where the palettized copy of ``path`` goes (mirrors its place under UI_DIR)."""
+    try:
+        return OUTPUT_DIR / path.relative_to(UI_DIR)
+    except ValueError:
+        return OUTPUT_DIR / path.name
+
+
+def _discard(out: Path, dry_run: bool) -> None:
+    """Remove a previous run's copy that the current master no longer earns."""
+    if out.exists() and not dry_run:
+        out.unlink()
+        print(f"  [DEL] {out.relative_to(PROJECT_ROOT)}")
+
+
+def quantize_file(path: Path, dither: bool = False, dry_run: bool = False) -> int:
+    """
+    Write a palettized copy of one PNG to OUTPUT_DIR if it passes the thresholds.
+
+    Returns:
+        Bytes saved (0 if skipped or rejected).
+    """
+    with Image.open(path) as img:
+        img.load()
+    if img.mode in ("P", "L", "1"):
+        print(f"  [SKIP] {path.name}: already {img.mode}")
+        return 0
+    img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+    before = path.stat().st_size
+    out = output_path(path)
+
+    centres = fit_palette(img)
+    attempts = [False, True] if dither and img.mode == "RGB" else [False]
+    for dithered in attempts:
+        candidate = palette_image(img, centres, dithered)
+        score, psnr = fidelity(img, candidate)
+        label = "dithered" if dithered else "plain"
+        if score < SSIM_THRESHOLD or psnr < PSNR_THRESHOLD:
+            print(f"  [REJECT] {path.name} ({label}): SSIM {score:.4f}, PSNR {psnr:.1f} dB")
+            continue
+        data = png_bytes(candidate)
+        if len(data) >= before:
+            print(f"  [SKIP] {path.name}: palettized PNG is not smaller")
+            _discard(out, dry_run)
+            return 0
+        if not dry_run:
+            out.parent.mkdir(parents=True, exist_ok=True)
+            write_bytes_atomic(out, data)
+        print(f"  [QUANT] {path.name} ({label}): {before / 1024:.0f} KB -> {len(data) / 1024:.0f} KB "
+              f"(-{(before - len(data)) / 1024:.0f} KB), SSIM {score:.4f}, PSNR {psnr:.1f} dB")
+        return before - len(data)
+    _discard(out, dry_run)
+    return 0
+
+
+def default_inputs() -> list[Path]:
+    paths = []
+    for pattern in DEFAULT_GLOBS:
+        paths += sorted(UI_DIR.glob(pattern))
+    return paths
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert flat UI art to 8-bit palettized PNG")
+    parser.add_argument("images", nargs="*", help="PNG files (default: assets/ui/ui_*.png, nineslice/*.png)")
+    parser.add_argument("--dither", action="store_true",
+                        help="Retry opaque images that miss the threshold with Floyd-Steinberg dithering")
+    parser.add_argument("--dry-run", action="store_true", help="Report savings without writing")
+    args = parser.parse_args()
+
+    paths = [Path(p).resolve() for p in args.images] or default_inputs()
+    if not paths:
+        print(f"No images found in {UI_DIR}")
+        return 1
+
+    print("=" * 60)
+    print(f"  UI Palette Quantization{' (dry run)' if args.dry_run else ''}")
+    print("=" * 60)
+    saved = [quantize_file(p, args.dither, args.dry_run) for p in paths]
+    converted = sum(1 for s in saved if s > 0)
+    print(f"\n  Converted: {converted}/{len(paths)}  Saved: {sum(saved) / 1_000_000:.2f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Dragon Nest Lite - Icon Variant Builder
+=======================================
+
+Skill and potion icons are generated as 1024x1024 masters (assets/ui/icon_*.png)
+but shown in 40-52 CSS px slots. This stage writes display-sized variants plus
+a manifest that SkillSystem.getIconPath() reads to pick the smallest variant
+that covers the slot at the current devicePixelRatio:
+
+  assets/ui/icons/64/icon_xxx.png
+  assets/ui/icons/128/icon_xxx.png
+  assets/ui/icons/256/icon_xxx.png
+  assets/ui/icons/manifest.json
+
+build.sh deploys the variants instead of the masters when the manifest exists.
+generate_images.py runs this stage automatically after --icons / --potions.
+
+Usage:
+  python resize_icons.py              # Build missing / outdated variants
+  python resize_icons.py --force      # Rebuild everything
+  python resize_icons.py --sizes 64 128
+
+Requires:
+  pip install Pillow
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+try:
+    from PIL import Image, ImageFilter
+except ImportError:
+    print("ERROR: Required packages not installed.")
+    print("Run: pip install Pillow")
+    sys.exit(1)
+
+from asset_io import save_image_atomic, write_bytes_atomic
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+UI_DIR = PROJECT_ROOT / "assets" / "ui"
+ICON_VARIANTS_DIR = UI_DIR / "icons"
+MANIFEST_PATH = ICON_VARIANTS_DIR / "manifest.json"
+
+ICON_SIZES = (64, 128, 256)
+
+# Lanczos alone rings and softens at 1/16 scale; reduce in box steps to within
+# REDUCING_GAP of the target first, then restore edge contrast lost to the
+# filter with a light unsharp mask (stronger for the smallest sizes).
+REDUCING_GAP = 3.0
+UNSHARP = {
+    64: ImageFilter.UnsharpMask(radius=0.8, percent=80, threshold=2),
+    128: ImageFilter.UnsharpMask(radius=0.7, percent=60, threshold=2),
+    256: ImageFilter.UnsharpMask(radius=0.6, percent=40, threshold=2),
+}
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def icon_masters() -> list[Path]:
+    """All full-size icon masters in assets/ui."""
+    return sorted(UI_DIR.glob("icon_*.png"))
+
+
+def variant_path(name: str, size: int) -> Path:
+    return ICON_VARIANTS_DIR / str(size) / f"{name}.png"
+
+
+def downscale(img: Image.Image, size: int) -> Image.Image:
+    """Square-fit ``img`` to ``size`` px with Lanczos and a light sharpen."""
+    mode = "RGBA" if "A" in img.getbands() else "RGB"
+    img = img.convert(mode)
+    # Non-square masters (e.g. 1408x768) are centre-cropped to a square first
+    side = min(img.size)
+    if img.width != img.height:
+        left = (img.width - side) // 2
+        top = (img.height - side) // 2
+        img = img.crop((left, top, left + side, top + side))
+    small = img.resize((size, size), Image.LANCZOS, reducing_gap=REDUCING_GAP)
+    sharpen = UNSHARP.get(size, UNSHARP[max(UNSHARP)])
+    if mode == "RGBA":
+        # Sharpen colour only; alpha edges would gain halos
+        rgb, alpha = small.convert("RGB").filter(sharpen), small.getchannel("A")
+        rgb.putalpha(alpha)
+        return rgb
+    return small.filter(sharpen)
+
+
+def write_manifest(names: list[str], sizes) -> None:
+    manifest = {
+        "sizes": sorted(sizes),
+        "path": "assets/ui/icons/{size}/{name}.png",
+        "icons": sorted(names),
+    }
+    write_bytes_atomic(MANIFEST_PATH, (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def build_icon_variants(sizes=ICON_SIZES, force=False) -> dict:
+    """
+    Write downscaled variants for every icon master and refresh the manifest.
+
+    A variant is rebuilt when missing, older than its master, or with --force.
+
+    Returns:
+        {"icons": n, "written": n, "master_bytes": n, "variant_bytes": {size: n}}
+    """
+    masters = icon_masters()
+    stats = {"icons": len(masters), "written": 0, "master_bytes": 0,
+             "variant_bytes": {size: 0 for size in sizes}}
+
+    for master in masters:
+        stats["master_bytes"] += master.stat().st_size
+        stale = [size for size in sizes
+                 if force or not variant_path(master.stem, size).exists()
+                 or variant_path(master.stem, size).stat().st_mtime < master.stat().st_mtime]
+        if stale:
+            with Image.open(master) as img:
+                img.load()
+                for size in stale:
+                    save_image_atomic(downscale(img, size), variant_path(master.stem, size),
+                                      optimize=True)
+                    stats["written"] += 1
+            print(f"  [RESIZED] {master.name} -> {', '.join(str(s) for s in stale)}")
+        for size in sizes:
+            stats["variant_bytes"][size] += variant_path(master.stem, size).stat().st_size
+
+    write_manifest([m.stem for m in masters], sizes)
+    return stats
+
+
+def print_summary(stats: dict) -> None:
+    """Per-size payload: a client downloads only the one size its slots need."""
+    master_bytes = max(stats["master_bytes"], 1)
+    print(f"  Icons: {stats['icons']}  variants written: {stats['written']}")
+    print(f"  Masters: {stats['master_bytes'] / 1_000_000:.1f} MB")
+    for size, total in sorted(stats["variant_bytes"].items()):
+        print(f"  {size:>4}px set: {total / 1_000_000:5.2f} MB ({1 - total / master_bytes:.1%} smaller)")
+    print(f"  Manifest: {MANIFEST_PATH.relative_to(PROJECT_ROOT)}")
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Build display-sized skill icon variants")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(ICON_SIZES),
+                        help=f"Variant sizes in px (default: {' '.join(map(str, ICON_SIZES))})")
+    parser.add_argument("--force", action="store_true", help="Rebuild variants that are up to date")
+    args = parser.parse_args()
+
+    if not icon_masters():
+        print(f"No icon masters found in {UI_DIR}")
+        return 1
+
+    print("=" * 60)
+    print("  Icon Variants")
+    print("=" * 60)
+    stats = build_icon_variants(args.sizes, force=args.force)
+    print_summary(stats)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
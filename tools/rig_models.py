@@ -5,24 +5,38 @@ Dragon Nest Lite - Meshy Rigging Script
 Rigs existing GLB models using Meshy's Auto-Rigging API.
 Downloads rigged GLB files (with skeleton bones) to replace the originals.
 
+Meshy returns rigged models without materials. The unrigged original is kept
+in _backup_unrigged/ and its textured materials (with their embedded images)
+are copied into the rigged GLB, so the game loads one self-contained file.
+Every basic animation Meshy returns alongside (walking, running, ...) is
+downloaded in parallel and merged into that file as a named clip
+(merge_animations.py) instead of being kept as a GLB of its own.
+
 Usage:
     python rig_models.py                    # Rig all character models
     python rig_models.py --model fighter    # Rig a specific model
     python rig_models.py --dry-run          # Preview only
+    python rig_models.py --restore-textures # Re-copy materials from the backups, no API calls
 """
 
 import argparse
 import base64
+import copy
 import json
-import os
 import shutil
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import requests
 from dotenv import load_dotenv
 
+from asset_io import write_stream_atomic
+from glb import Glb
+from key_pool import KeyPool, KeyPoolExhausted
+from merge_animations import merge_files
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -38,6 +52,11 @@ PROJECT_ROOT = SCRIPT_DIR.parent
 MODELS_DIR = PROJECT_ROOT / "assets" / "models"
 BACKUP_DIR = MODELS_DIR / "_backup_unrigged"
 
+# Animation downloads run in parallel; Meshy's CDN serves them independently
+ANIMATION_WORKERS = 4
+# basic_animations key prefix -> clip name in the merged GLB (others keep the prefix)
+CLIP_NAMES = {"walking": "walk", "running": "run"}
+
 # Base URL for deployed models (Cloudflare Workers)
 DEPLOYED_BASE_URL = "https://testai3d.eteandran.workers.dev/assets/models"
 
@@ -72,10 +91,114 @@ MODELS_TO_RIG = {
 }
 
 
-def poll_rigging(session, task_id):
-    """Poll a rigging task until completion."""
+def transplant_materials(rigged_path, unrigged_path):
+    """
+    Copy the unrigged model's textured materials into the rigged GLB in place.
+
+    Rigging keeps the UV layout, so the materials apply as they are; they are
+    assigned to the rigged primitives in order, repeating if there are more
+    primitives than materials. Returns the number of materials copied (0 if
+    the rigged model already has materials or the backup has none).
+    """
+    rigged, unrigged = Glb.load(rigged_path), Glb.load(unrigged_path)
+    g, u = rigged.gltf, unrigged.gltf
+    if g.materials:
+        return 0
+    textured = [mat for mat in u.materials if _texture_slots(mat)]
+    if not textured:
+        return 0
+
+    image_base, sampler_base, texture_base = len(g.images), len(g.samplers), len(g.textures)
+    for image in u.images:
+        image = copy.deepcopy(image)
+        if image.bufferView is not None:
+            image.bufferView = rigged.add_view(unrigged.view_bytes(image.bufferView))
+        g.images.append(image)
+    g.samplers += copy.deepcopy(u.samplers)
+    for texture in copy.deepcopy(u.textures):
+        if texture.source is not None:
+            texture.source += image_base
+        if texture.sampler is not None:
+            texture.sampler += sampler_base
+        for ext in (texture.extensions or {}).values():
+            if isinstance(ext, dict) and "source" in ext:
+                ext["source"] += image_base
+        g.textures.append(texture)
+
+    materials = copy.deepcopy(textured)
+    for mat in materials:
+        for info in _texture_slots(mat):
+            info.index += texture_base
+    g.materials += materials
+    primitives = [prim for mesh in g.meshes for prim in mesh.primitives]
+    for n, prim in enumerate(primitives):
+        prim.material = n % len(materials)
+    for name in u.extensionsUsed or []:
+        if name not in (g.extensionsUsed or []):
+            g.extensionsUsed = (g.extensionsUsed or []) + [name]
+
+    rigged.prune()
+    rigged.save(rigged_path)
+    return len(materials)
+
+
+def _texture_slots(mat):
+    """The material's textureInfo objects that are set."""
+    pbr = mat.pbrMetallicRoughness
+    slots = [mat.normalTexture, mat.occlusionTexture, mat.emissiveTexture]
+    if pbr is not None:
+        slots += [pbr.baseColorTexture, pbr.metallicRoughnessTexture]
+    return [slot for slot in slots if slot is not None]
+
+
+def animation_urls(basic_anims):
+    """
+    Clip name -> GLB URL for every animation of a rigging result.
+
+    Meshy offers each animation as a full GLB (<anim>_glb_url) and, for
+    some, an armature-only one (<anim>_armature_glb_url); the latter is
+    preferred since only its keyframes are merged anyway.
+    """
+    urls = {}
+    for key, url in basic_anims.items():
+        if not url or not key.endswith("_glb_url"):
+            continue
+        prefix = key[:-len("_glb_url")]
+        armature = prefix.endswith("_armature")
+        prefix = prefix.removesuffix("_armature")
+        clip = CLIP_NAMES.get(prefix, prefix)
+        if armature or clip not in urls:
+            urls[clip] = url
+    return urls
+
+
+def download_animations(session, name, urls):
+    """Fetch animation GLBs concurrently to <name>_<clip>.glb; returns clip name -> path of each download."""
+    def fetch(clip, url):
+        path = MODELS_DIR / f"{name}_{clip}.glb"
+        resp = session.get(url, stream=True)
+        if resp.status_code != 200:
+            raise RuntimeError(f"HTTP {resp.status_code}")
+        write_stream_atomic(path, resp.iter_content(chunk_size=8192))
+        return path
+
+    print(f"  Downloading {len(urls)} animation(s): {', '.join(urls)}")
+    paths = {}
+    with ThreadPoolExecutor(max_workers=ANIMATION_WORKERS) as pool:
+        futures = {clip: pool.submit(fetch, clip, url) for clip, url in urls.items()}
+        for clip, future in futures.items():
+            try:
+                paths[clip] = future.result()
+            except Exception as e:
+                print(f"  Warning: Failed to download {clip} animation: {e}")
+    return paths
+
+
+def poll_rigging(session, task_id, api_key):
+    """Poll a rigging task until completion (using the key that created it)."""
+    headers = {"Authorization": f"Bearer {api_key}"}
     for attempt in range(1, MAX_POLL_ATTEMPTS + 1):
-        resp = session.get(f"{RIGGING_URL}/{task_id}")
+        resp = session.get(f"{RIGGING_URL}/{task_id}", headers=headers)
         if resp.status_code != 200:
             print(f"    Poll error: HTTP {resp.status_code}")
             time.sleep(POLL_INTERVAL)
@@ -100,7 +223,7 @@ def poll_rigging(session, task_id):
     raise TimeoutError(f"Rigging task {task_id} timed out")
 
 
-def rig_model(session, name, config, use_local=False, dry_run=False):
+def rig_model(session, key_pool, name, config, use_local=False, dry_run=False):
     """Rig a single model."""
     filename = config["filename"]
     height = config["height_meters"]
@@ -137,11 +260,25 @@ def rig_model(session, name, config, use_local=False, dry_run=False):
         "height_meters": height,
     }
 
-    # Create rigging task
+    # Create rigging task on the least-loaded key; evicted keys hand over
+    # to the next one
     print(f"  Creating rigging task...")
-    resp = session.post(RIGGING_URL, json=payload)
-    if resp.status_code not in (200, 201, 202):
+    while True:
+        try:
+            api_key = key_pool.acquire()
+        except KeyPoolExhausted as e:
+            print(f"  ERROR: {e}")
+            return False
+        try:
+            resp = session.post(RIGGING_URL, json=payload,
+                                headers={"Authorization": f"Bearer {api_key}"})
+        finally:
+            key_pool.release(api_key)
+        if resp.status_code in (200, 201, 202):
+            break
         print(f"  ERROR: HTTP {resp.status_code} - {resp.text[:200]}")
+        if key_pool.report_failure(api_key, resp.status_code, resp.text) and key_pool:
+            continue
         return False
 
     task_id = resp.json().get("result")
@@ -153,7 +290,7 @@ def rig_model(session, name, config, use_local=False, dry_run=False):
 
     # Poll for completion
     try:
-        result = poll_rigging(session, task_id)
+        result = poll_rigging(session, task_id, api_key)
     except (RuntimeError, TimeoutError) as e:
         print(f"  ERROR: {e}")
         return False
@@ -188,52 +325,69 @@ def rig_model(session, name, config, use_local=False, dry_run=False):
         print(f"  ERROR: Download failed: HTTP {dl_resp.status_code}")
         return False
 
-    with open(local_path, "wb") as f:
-        for chunk in dl_resp.iter_content(chunk_size=8192):
-            f.write(chunk)
-
-    file_size = local_path.stat().st_size
+    # Written atomically: a failed download must not clobber the unrigged original
+    file_size = write_stream_atomic(local_path, dl_resp.iter_content(chunk_size=8192))
     print(f"  Downloaded rigged model: {local_path} ({file_size:,} bytes)")
 
-    # Also download walking animation GLB if available
-    walking_url = basic_anims.get("walking_glb_url")
-    if walking_url:
-        anim_path = MODELS_DIR / f"{name}_walk.glb"
+    copied = transplant_materials(local_path, backup_path)
+    if copied:
+        print(f"  Copied {copied} textured material(s) from {backup_path.name}")
+
+    # Merge every basic animation into the rigged model as a named clip
+    urls = animation_urls(basic_anims)
+    if urls:
+        clips = download_animations(session, name, urls)
         try:
-            dl2 = session.get(walking_url, stream=True)
-            if dl2.status_code == 200:
-                with open(anim_path, "wb") as f:
-                    for chunk in dl2.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                print(f"  Downloaded walk animation: {anim_path}")
-        except Exception as e:
-            print(f"  Warning: Failed to download walk animation: {e}")
+            index = merge_files(local_path, clips) if clips else {}
+            print(f"  Merged {len(clips)} animation(s) into {filename}: {', '.join(index)}")
+        except ValueError as e:
+            print(f"  Warning: Failed to merge animations (kept as {name}_<clip>.glb): {e}")
 
     print(f"  SUCCESS: {name} rigged!")
     return True
 
 
+def restore_textures(names):
+    """Copy textured materials from the unrigged backups into already-rigged models."""
+    for name in names:
+        filename = MODELS_TO_RIG[name]["filename"]
+        rigged, backup = MODELS_DIR / filename, BACKUP_DIR / filename
+        if not (rigged.exists() and backup.exists()):
+            print(f"  SKIP: {filename} (no rigged model or no backup)")
+            continue
+        copied = transplant_materials(rigged, backup)
+        if copied:
+            print(f"  {filename}: copied {copied} textured material(s) ({rigged.stat().st_size:,} bytes)")
+        else:
+            print(f"  {filename}: already has materials")
+    return 0
+
+
 def main():
     parser = argparse.ArgumentParser(description="Rig GLB models using Meshy API")
     parser.add_argument("--model", nargs="+", help="Specific model(s) to rig")
     parser.add_argument("--dry-run", action="store_true", help="Preview only")
     parser.add_argument("--use-local", action="store_true",
                         help="Upload local files via base64 instead of using deployed URLs")
+    parser.add_argument("--restore-textures", action="store_true",
+                        help="Only copy materials from _backup_unrigged into the rigged models")
     args = parser.parse_args()
 
-    # Load API key
+    if args.restore_textures:
+        return restore_textures(args.model or list(MODELS_TO_RIG))
+
+    # Load API keys
     env_path = PROJECT_ROOT / ".env"
     if env_path.exists():
         load_dotenv(env_path)
-    api_key = os.environ.get("MESHY_API_KEY")
-    if not api_key:
-        print("ERROR: MESHY_API_KEY not found")
+    key_pool = KeyPool.from_env("MESHY_API_KEY")
+    if not key_pool:
+        print("ERROR: MESHY_API_KEY (or MESHY_API_KEYS) not found")
         return 1
 
-    # Setup session
+    # Setup session (Authorization is set per request from the key pool)
     session = requests.Session()
     session.headers.update({
-        "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     })
 
@@ -251,6 +405,7 @@ def main():
     print("Dragon Nest Lite - Model Rigging")
     print("="*50)
     print(f"Models to rig: {list(models.keys())}")
+    print(key_pool.describe())
     if args.dry_run:
         print("[DRY RUN MODE]")
 
@@ -258,7 +413,7 @@ def main():
     failed = []
 
     for name, config in models.items():
-        ok = rig_model(session, name, config, use_local=args.use_local, dry_run=args.dry_run)
+        ok = rig_model(session, key_pool, name, config, use_local=args.use_local, dry_run=args.dry_run)
         if ok:
             succeeded.append(name)
         else:
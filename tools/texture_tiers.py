@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Dragon Nest Lite - Texture Resolution Tiers
+===========================================
+
+Every ground texture, backdrop and effect ships as one full-size master, so a
+low-end laptop pays the same download, decode and VRAM as a desktop. This
+stage writes reduced tiers next to a manifest that js/utils/TextureTiers.js
+reads; the game probes the device once at startup and loads one tier:
+
+  high    the master itself (1024px)
+  medium  1/2  -> assets/textures/tiers/medium/<same relative path>
+  low     1/4  -> assets/textures/tiers/low/<same relative path>
+
+Downsampling happens in linear light: sRGB is decoded, colour is
+premultiplied by alpha (unless the file already is, like the un-matted effect
+sheets), filtered with Lanczos, then re-encoded. Averaging sRGB values
+directly would darken bright-on-dark detail such as sparks and grass
+highlights. Tiling textures are filtered with wrap-around padding so the
+reduced tiers still tile without seams.
+
+Usage:
+  python texture_tiers.py              # Build missing / outdated tiers
+  python texture_tiers.py --force
+
+Requires:
+  pip install Pillow numpy
+"""
+
+import argparse
+import fnmatch
+import json
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:
+    print("ERROR: Required packages not installed.")
+    print("Run: pip install Pillow numpy")
+    sys.exit(1)
+
+from asset_io import save_image_atomic, write_bytes_atomic
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TEXTURES_DIR = PROJECT_ROOT / "assets" / "textures"
+TIERS_DIR = TEXTURES_DIR / "tiers"
+MANIFEST_PATH = TIERS_DIR / "manifest.json"
+
+# Scale of each reduced tier relative to the master ("high" is the master)
+TIERS = {"medium": 0.5, "low": 0.25}
+
+# Globs under assets/textures
+SOURCE_GLOBS = ["tex_*.png", "bg_*.png", "effects/fx_*.png", "effects/premultiplied/fx_*.png",
+                "effects/packed/fx_*.png"]
+TILING_GLOBS = ["tex_*.png"]                          # RepeatWrapping in ModelLoader
+PREMULTIPLIED_GLOBS = ["effects/premultiplied/fx_*_sheet.png", "effects/packed/fx_*_sheet.png"]
+
+WRAP_PAD = 16          # source px of wrap-around context for tiling textures
+REDUCING_GAP = 2.0
+
+
+# ---------------------------------------------------------------------------
+# Colour space
+# ---------------------------------------------------------------------------
+
+_SRGB_TO_LINEAR = np.array(
+    [c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+     for c in (i / 255.0 for i in range(256))],
+    dtype=np.float32,
+)
+
+
+def srgb_to_linear(values: np.ndarray) -> np.ndarray:
+    return _SRGB_TO_LINEAR[values]
+
+
+def linear_to_srgb(linear: np.ndarray) -> np.ndarray:
+    linear = np.clip(linear, 0.0, 1.0)
+    srgb = np.where(linear <= 0.0031308, linear * 12.92, 1.055 * np.power(linear, 1 / 2.4) - 0.055)
+    return np.clip(np.rint(srgb * 255.0), 0, 255).astype(np.uint8)
+
+
+# ---------------------------------------------------------------------------
+# Resampling
+# ---------------------------------------------------------------------------
+
+def _resize_plane(plane: np.ndarray, width: int, height: int) -> np.ndarray:
+    img = Image.fromarray(plane, "F")
+    return np.asarray(img.resize((width, height), Image.LANCZOS, reducing_gap=REDUCING_GAP))
+
+
+def downsample(pixels: np.ndarray, scale: float, tiling: bool, premultiplied: bool) -> np.ndarray:
+    """sRGB-correct downscale of an HxWx3/4 uint8 array by ``scale``."""
+    h, w = pixels.shape[:2]
+    out_w, out_h = max(1, round(w * scale)), max(1, round(h * scale))
+    has_alpha = pixels.shape[2] == 4
+
+    rgb = srgb_to_linear(pixels[..., :3])
+    alpha = pixels[..., 3].astype(np.float32) / 255.0 if has_alpha else None
+    if has_alpha and not premultiplied:
+        rgb = rgb * alpha[..., None]
+
+    planes = [rgb[..., i] for i in range(3)] + ([alpha] if has_alpha else [])
+    pad = WRAP_PAD if tiling else 0
+    if pad:
+        planes = [np.pad(p, pad, mode="wrap") for p in planes]
+        # Resize the padded plane by the same factor and crop the context away
+        pad_out = round(pad * scale)
+        size = (out_w + 2 * pad_out, out_h + 2 * pad_out)
+        planes = [_resize_plane(p, *size)[pad_out:pad_out + out_h, pad_out:pad_out + out_w] for p in planes]
+    else:
+        planes = [_resize_plane(p, out_w, out_h) for p in planes]
+
+    rgb = np.stack(planes[:3], axis=-1)
+    if not has_alpha:
+        return linear_to_srgb(rgb)
+    alpha = np.clip(planes[3], 0.0, 1.0)
+    if not premultiplied:
+        rgb = np.divide(rgb, alpha[..., None], out=np.zeros_like(rgb), where=alpha[..., None] > 1e-4)
+    return np.dstack([linear_to_srgb(rgb), np.clip(np.rint(alpha * 255.0), 0, 255).astype(np.uint8)])
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def _matches(rel: str, globs) -> bool:
+    return any(fnmatch.fnmatch(rel, g) for g in globs)
+
+
+def source_textures() -> list[Path]:
+    seen = {}
+    for pattern in SOURCE_GLOBS:
+        for path in sorted(TEXTURES_DIR.glob(pattern)):
+            seen[path] = None
+    return list(seen)
+
+
+def tier_path(source: Path, tier: str) -> Path:
+    return TIERS_DIR / tier / source.relative_to(TEXTURES_DIR)
+
+
+def build_tiers(force: bool = False) -> dict:
+    """Write every reduced tier and the manifest; returns the manifest."""
+    manifest = {"tiers": {"high": 1.0, **TIERS}, "textures": {}}
+    totals = {tier: 0 for tier in ["high", *TIERS]}
+
+    for source in source_textures():
+        rel = source.relative_to(TEXTURES_DIR).as_posix()
+        entry = {"high": source.relative_to(PROJECT_ROOT).as_posix()}
+        totals["high"] += source.stat().st_size
+        stale = [t for t in TIERS if force or not tier_path(source, t).exists()
+                 or tier_path(source, t).stat().st_mtime < source.stat().st_mtime]
+        if stale:
+            with Image.open(source) as img:
+                mode = "RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB"
+                pixels = np.asarray(img.convert(mode))
+            for tier in stale:
+                small = downsample(pixels, TIERS[tier], _matches(rel, TILING_GLOBS),
+                                   _matches(rel, PREMULTIPLIED_GLOBS))
+                save_image_atomic(Image.fromarray(small, mode), tier_path(source, tier), optimize=True)
+            print(f"  [TIER] {rel} -> {', '.join(stale)}")
+        for tier in TIERS:
+            entry[tier] = tier_path(source, tier).relative_to(PROJECT_ROOT).as_posix()
+            totals[tier] += tier_path(source, tier).stat().st_size
+        manifest["textures"][entry["high"]] = entry
+
+    write_bytes_atomic(MANIFEST_PATH, (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+    print(f"\n  Textures: {len(manifest['textures'])}")
+    for tier, total in totals.items():
+        print(f"  {tier:>6}: {total / 1_000_000:6.2f} MB")
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Build low/medium texture tiers with sRGB-correct downsampling")
+    parser.add_argument("--force", action="store_true", help="Rebuild tiers that are up to date")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  Texture Tiers")
+    print("=" * 60)
+    build_tiers(force=args.force)
+    print(f"  Manifest: {MANIFEST_PATH.relative_to(PROJECT_ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
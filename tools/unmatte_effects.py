@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Dragon Nest Lite - Effect Sheet Un-matting (black -> premultiplied alpha)
+=========================================================================
+
+Effect sprite sheets are generated as opaque RGB on pure black, so the game
+could only draw them additively over full opaque quads. This stage treats
+each pixel as emission composited over black (C = alpha * F) and recovers
+the layer itself:
+
+  alpha = brightest channel, with the black level lifted to 0
+  rgb   = C rescaled to that alpha (premultiplied, so rgb <= alpha)
+
+The brightest channel is the smallest alpha that keeps the un-blended colour
+F = C / alpha within [0, 1], so saturated flame colours survive intact.
+The premultiplied RGBA copy goes to assets/textures/effects/premultiplied/
+under the same name; the grid master stays as generated, since the 8-bit
+premultiply and the black-level clip are lossy. EffectManager draws the
+copies with normal premultiplied blending (out = rgb + (1 - alpha) * dst),
+which matches the old additive look on bright pixels and lets smoke occlude.
+pack_effect_sheets.py and flipbook_motion.py read the copy where one exists
+(sheet_sources()).
+
+generate_images.py --effects runs this automatically after each sheet.
+Sheets that already carry alpha, or whose background is not black, get no
+copy (a stale one is removed).
+
+Usage:
+  python unmatte_effects.py                        # All fx_*_sheet.png
+  python unmatte_effects.py path/to/fx_x_sheet.png
+  python unmatte_effects.py --black-level 10       # Treat darker noise as background
+
+Requires:
+  pip install Pillow numpy
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:
+    print("ERROR: Required packages not installed.")
+    print("Run: pip install Pillow numpy")
+    sys.exit(1)
+
+from asset_io import save_image_atomic
+from output_checks import check_transparency
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+EFFECTS_DIR = PROJECT_ROOT / "assets" / "textures" / "effects"
+PREMULTIPLIED_DIR = EFFECTS_DIR / "premultiplied"
+SHEET_GLOB = "fx_*_sheet.png"
+
+# Channel values at or below this are background noise from the generator
+BLACK_LEVEL = 6
+
+
+# ---------------------------------------------------------------------------
+# Conversion
+# ---------------------------------------------------------------------------
+
+def unmatte_black(rgb: np.ndarray, black_level: int = BLACK_LEVEL,
+                  premultiplied: bool = True) -> np.ndarray:
+    """
+    RGBA (uint8, HxWx4) from an HxWx3 image composited on black.
+
+    Premultiplied by default; ``premultiplied=False`` returns straight alpha
+    (the un-blended colour F) for textures premultiplied at upload instead.
+    """
+    c = rgb.astype(np.float32)
+    peak = c.max(axis=2, keepdims=True)
+    alpha = np.clip((peak - black_level) / (255.0 - black_level), 0.0, 1.0)
+    # Premultiplied: rescale colour by the same factor as alpha so rgb/alpha
+    # stays the un-blended colour. Straight: F = C / peak at full range.
+    # Pixels at the black level become fully transparent either way.
+    target = alpha * 255.0 if premultiplied else np.where(alpha > 0, 255.0, 0.0)
+    scale = np.divide(target, peak, out=np.zeros_like(peak), where=peak > 0)
+    out = np.concatenate([c * scale, alpha * 255.0], axis=2)
+    return np.clip(np.rint(out), 0, 255).astype(np.uint8)
+
+
+def premultiply_sheet(path: Path, black_level: int = BLACK_LEVEL) -> bool:
+    """
+    Write a premultiplied RGBA copy of a black-matted sheet to PREMULTIPLIED_DIR.
+
+    Returns:
+        True if the copy was written, False if the sheet was skipped.
+    """
+    out = PREMULTIPLIED_DIR / path.name
+    with Image.open(path) as img:
+        img.load()
+    if "A" in img.getbands():
+        reason = "already has alpha"
+    else:
+        ok, reason = check_transparency(img)
+        reason = None if ok else f"not on black ({reason})"
+    if reason:
+        print(f"  [SKIP] {path.name}: {reason}")
+        out.unlink(missing_ok=True)
+        return False
+
+    rgba = unmatte_black(np.asarray(img.convert("RGB")), black_level)
+    save_image_atomic(Image.fromarray(rgba, "RGBA"), out, optimize=True)
+    transparent = (rgba[..., 3] == 0).mean()
+    print(f"  [PMA] {out.relative_to(PROJECT_ROOT)} ({transparent:.0%} fully transparent)")
+    return True
+
+
+def sheet_sources() -> list[Path]:
+    """Each grid sheet's premultiplied copy if it has one, else the grid master."""
+    sources = []
+    for path in sorted(EFFECTS_DIR.glob(SHEET_GLOB)):
+        copy = PREMULTIPLIED_DIR / path.name
+        sources.append(copy if copy.exists() else path)
+    return sources
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert black-background effect sheets to premultiplied alpha")
+    parser.add_argument("sheets", nargs="*", help=f"Sheet PNGs (default: {SHEET_GLOB} in assets/textures/effects)")
+    parser.add_argument("--black-level", type=int, default=BLACK_LEVEL,
+                        help=f"Channel value treated as background (default {BLACK_LEVEL})")
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.sheets] or sorted(EFFECTS_DIR.glob(SHEET_GLOB))
+    if not paths:
+        print(f"No sheets found in {EFFECTS_DIR}")
+        return 1
+
+    converted = sum(premultiply_sheet(path, args.black_level) for path in paths)
+    print(f"\n  Converted: {converted}/{len(paths)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())